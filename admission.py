@@ -0,0 +1,338 @@
+# /ollama-ui/admission.py
+#!/usr/bin/env python3
+"""Fair, priority-aware admission queue in front of Ollama.
+
+Inference requests (/api/chat, /api/generate, /api/embeddings) are admitted
+per model up to a concurrency limit. Waiting requests are ordered by
+priority class (interactive before batch), then by weighted fair queuing
+across users identified from the login JWT. Batch requests never take a model's last
+slot, so interactive time to first token stays bounded under batch load.
+When a queue is full the request is rejected with 429 and a Retry-After
+estimate. Queue wait is measured separately from inference time.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import heapq
+import hmac
+import itertools
+import json
+import math
+import os
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+import numpy as np
+from aiohttp import web
+
+from ollama_proxy import UpstreamProxy, forwarded_headers, relay, upstream_unavailable
+
+INFERENCE_ROUTES = ("/api/chat", "/api/generate", "/api/embeddings", "/api/embed")
+BATCH_ROUTES = ("/api/embeddings", "/api/embed")
+PRIORITIES = {"interactive": 0, "batch": 1}
+# JWT claims checked, in order, for the user identity
+IDENTITY_CLAIMS = ("userId", "sub", "username", "email")
+
+@dataclass(order=True)
+class Ticket:
+    """A queued request, ordered by priority class and then by fair-queuing finish tag."""
+    priority: int
+    finish: float
+    seq: int
+    user: str = field(compare=False)
+    klass: str = field(compare=False)
+    enqueued: float = field(compare=False)
+    granted: asyncio.Future = field(compare=False)
+
+class ModelQueue:
+    """Admission state for one model: running slots plus a weighted fair queue per class."""
+
+    def __init__(self, limit: int, batch_limit: int):
+        self.limit = limit
+        self.batch_limit = batch_limit
+        self.heap: list[Ticket] = []
+        self.running = {klass: 0 for klass in PRIORITIES}
+        self.queued = {klass: 0 for klass in PRIORITIES}
+        self.queued_by_user: dict[str, int] = defaultdict(int)
+        self.virtual = {klass: 0.0 for klass in PRIORITIES}
+        self.last_finish: dict[tuple[str, str], float] = {}
+
+    def push(self, ticket: Ticket, weight: float):
+        key = (ticket.klass, ticket.user)
+        # Start-time fair queuing: each user's requests are spaced 1/weight apart in virtual time
+        ticket.finish = max(self.virtual[ticket.klass], self.last_finish.get(key, 0.0)) + 1.0 / weight
+        self.last_finish[key] = ticket.finish
+        self.queued[ticket.klass] += 1
+        self.queued_by_user[ticket.user] += 1
+        heapq.heappush(self.heap, ticket)
+
+    def can_start(self, klass: str) -> bool:
+        total = sum(self.running.values())
+        if klass == "batch":
+            return total < self.limit and self.running["batch"] < self.batch_limit
+        return total < self.limit
+
+    def dispatch(self):
+        """Grant slots to the best waiting tickets while capacity allows."""
+        while self.heap:
+            ticket = self.heap[0]
+            if ticket.granted.done():
+                # The client went away while queued and its handler has not caught up yet
+                self.remove(ticket)
+                continue
+            if not self.can_start(ticket.klass):
+                # An interactive ticket may still start while batch work is held back
+                if ticket.klass == "interactive" or not self.can_start("interactive"):
+                    break
+                waiting = [t for t in self.heap if t.klass == "interactive" and not t.granted.done()]
+                if not waiting:
+                    break
+                ticket = min(waiting)
+            self.remove(ticket)
+            self.virtual[ticket.klass] = ticket.finish
+            self.running[ticket.klass] += 1
+            ticket.granted.set_result(time.monotonic())
+        if len(self.last_finish) > 10000:
+            self.last_finish = {k: v for k, v in self.last_finish.items() if v > self.virtual[k[0]]}
+
+    def remove(self, ticket: Ticket):
+        """Take a ticket out of the queue, whether it is being granted or abandoned."""
+        index = next((i for i, queued in enumerate(self.heap) if queued is ticket), None)
+        if index is None:
+            # Already discarded by dispatch() after its client went away
+            return
+        if index == 0:
+            heapq.heappop(self.heap)
+        else:
+            self.heap.pop(index)
+            heapq.heapify(self.heap)
+        self.queued[ticket.klass] -= 1
+        self.queued_by_user[ticket.user] -= 1
+        if not self.queued_by_user[ticket.user]:
+            del self.queued_by_user[ticket.user]
+
+    def release(self, klass: str):
+        self.running[klass] -= 1
+        self.dispatch()
+
+def b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+def jwt_identity(authorization: str, secret: Optional[str]) -> Optional[str]:
+    """Return the user from a Bearer JWT, checking the HS256 signature and expiry when a secret is set."""
+    if not authorization.lower().startswith("bearer "):
+        return None
+    try:
+        header, payload, signature = authorization[7:].strip().split(".")
+        claims = json.loads(b64decode(payload))
+        if secret:
+            if json.loads(b64decode(header)).get("alg") != "HS256":
+                return None
+            expected = hmac.new(secret.encode(), f"{header}.{payload}".encode(), hashlib.sha256).digest()
+            if not hmac.compare_digest(expected, b64decode(signature)):
+                return None
+        if claims.get("exp") and claims["exp"] < time.time():
+            return None
+    except (ValueError, AttributeError, TypeError):
+        return None
+    return next((str(claims[c]) for c in IDENTITY_CLAIMS if claims.get(c)), None)
+
+def summarize(samples: deque) -> dict:
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+    values = np.array(samples) * 1000
+    return {"count": len(values), "p50_ms": float(np.percentile(values, 50)),
+            "p95_ms": float(np.percentile(values, 95)), "p99_ms": float(np.percentile(values, 99))}
+
+class AdmissionController(UpstreamProxy):
+    """aiohttp proxy that queues inference requests before forwarding them to Ollama."""
+
+    def __init__(self, upstream: str, concurrency: int = 4, model_limits: Optional[dict[str, int]] = None,
+                 batch_slots: Optional[int] = None, max_queue: int = 64, max_user_queue: int = 16,
+                 weights: Optional[dict[str, float]] = None, jwt_secret: Optional[str] = None):
+        super().__init__(upstream)
+        self.concurrency = concurrency
+        self.model_limits = model_limits or {}
+        self.batch_slots = batch_slots
+        self.max_queue = max_queue
+        self.max_user_queue = max_user_queue
+        self.weights = weights or {}
+        self.jwt_secret = jwt_secret
+        self.queues: dict[str, ModelQueue] = {}
+        self.seq = itertools.count()
+        self.inference_ewma: dict[str, float] = {}
+        self.metrics = {klass: {"wait": deque(maxlen=5000), "ttft": deque(maxlen=5000),
+                                "inference": deque(maxlen=5000), "admitted": 0, "rejected": 0, "cancelled": 0}
+                        for klass in PRIORITIES}
+
+    def queue_for(self, model: str) -> ModelQueue:
+        if model not in self.queues:
+            limit = self.model_limits.get(model, self.concurrency)
+            # Keep one slot free of batch work unless told otherwise
+            batch_limit = self.batch_slots if self.batch_slots is not None else max(limit - 1, 1)
+            self.queues[model] = ModelQueue(limit, min(batch_limit, limit))
+        return self.queues[model]
+
+    def classify(self, request: web.Request) -> str:
+        """Class by route; `X-Priority: batch` may demote a request, but nothing promotes one."""
+        if request.path in BATCH_ROUTES or request.headers.get("X-Priority", "").lower() == "batch":
+            return "batch"
+        return "interactive"
+
+    def identify(self, request: web.Request) -> str:
+        authorization = request.headers.get("Authorization", "")
+        if not authorization and request.cookies.get("token"):
+            # Browsers talking to the queue directly carry the UI's login cookie instead
+            authorization = f"Bearer {request.cookies['token']}"
+        user = jwt_identity(authorization, self.jwt_secret)
+        return user or f"anonymous@{request.remote}"
+
+    def retry_after(self, model: str, queue: ModelQueue, klass: str) -> int:
+        """Estimate seconds until the queue ahead of a new request drains."""
+        ahead = queue.queued["interactive"] + (queue.queued["batch"] if klass == "batch" else 0)
+        per_request = self.inference_ewma.get(model, 5.0)
+        slots = queue.batch_limit if klass == "batch" else queue.limit
+        return max(1, math.ceil((ahead + 1) * per_request / slots))
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        try:
+            model = json.loads(body).get("model")
+        except (ValueError, AttributeError):
+            return web.json_response({"error": "invalid request body"}, status=400)
+        if not isinstance(model, str):
+            return web.json_response({"error": "model must be a string"}, status=400)
+        model = model if ":" in model else f"{model}:latest"
+        klass = self.classify(request)
+        user = self.identify(request)
+        queue = self.queue_for(model)
+        metrics = self.metrics[klass]
+
+        if queue.queued[klass] >= self.max_queue or queue.queued_by_user[user] >= self.max_user_queue:
+            metrics["rejected"] += 1
+            retry = self.retry_after(model, queue, klass)
+            return web.json_response({"error": f"too many queued requests for {model}; retry in {retry}s"},
+                                     status=429, headers={"Retry-After": str(retry)})
+
+        enqueued = time.monotonic()
+        ticket = Ticket(PRIORITIES[klass], 0.0, next(self.seq), user, klass, enqueued,
+                        asyncio.get_running_loop().create_future())
+        queue.push(ticket, self.weights.get(user, 1.0))
+        queue.dispatch()
+        try:
+            started = await ticket.granted
+        except asyncio.CancelledError:
+            # The client went away while queued; give the slot back if it was granted meanwhile
+            if ticket.granted.done() and not ticket.granted.cancelled():
+                queue.release(klass)
+            else:
+                queue.remove(ticket)
+            metrics["cancelled"] += 1
+            raise
+
+        metrics["admitted"] += 1
+        metrics["wait"].append(started - enqueued)
+        try:
+            return await self.forward(request, body, model, klass, enqueued, started)
+        finally:
+            queue.release(klass)
+
+    async def forward(self, request: web.Request, body: bytes, model: str, klass: str,
+                      enqueued: float, started: float) -> web.StreamResponse:
+        metrics = self.metrics[klass]
+        try:
+            upstream = await self.open_upstream(request, body, forwarded_headers(request, ("content-type", "accept")))
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return upstream_unavailable(e)
+        first_chunk = True
+
+        def record_ttft(chunk: bytes):
+            nonlocal first_chunk
+            if first_chunk:
+                # TTFT as the user sees it, queue wait included
+                metrics["ttft"].append(time.monotonic() - enqueued)
+                first_chunk = False
+
+        async with upstream:
+            response, _ = await relay(request, upstream, {"X-Queue-Wait-Ms": f"{(started - enqueued) * 1000:.1f}"},
+                                      record_ttft)
+        elapsed = time.monotonic() - started
+        metrics["inference"].append(elapsed)
+        previous = self.inference_ewma.get(model)
+        self.inference_ewma[model] = elapsed if previous is None else 0.8 * previous + 0.2 * elapsed
+        return response
+
+    def status(self) -> dict:
+        return {
+            "classes": {klass: {
+                "admitted": m["admitted"], "rejected": m["rejected"], "cancelled": m["cancelled"],
+                "queue_wait": summarize(m["wait"]), "ttft": summarize(m["ttft"]),
+                "inference": summarize(m["inference"]),
+            } for klass, m in self.metrics.items()},
+            "models": {model: {
+                "limit": q.limit, "batch_limit": q.batch_limit, "running": dict(q.running),
+                "queued": dict(q.queued), "queued_by_user": dict(q.queued_by_user),
+                "avg_inference_seconds": self.inference_ewma.get(model),
+            } for model, q in self.queues.items()},
+        }
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.status())
+
+def create_app(controller: AdmissionController) -> web.Application:
+    app = web.Application(client_max_size=1024 ** 3)
+    app.on_startup.append(controller.on_startup)
+    app.on_cleanup.append(controller.on_cleanup)
+    app.router.add_get("/admission/status", controller.handle_status)
+    for path in INFERENCE_ROUTES:
+        app.router.add_post(path, controller.handle)
+    app.router.add_route("*", "/{path:.*}", controller.handle_passthrough)
+    return app
+
+def parse_pairs(values: list[str], cast) -> dict:
+    """Parse repeated NAME=VALUE options."""
+    pairs = {}
+    for value in values:
+        name, _, number = value.rpartition("=")
+        if not name:
+            raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {value!r}")
+        pairs[name] = cast(number)
+    return pairs
+
+def main():
+    parser = argparse.ArgumentParser(description="Fair, priority-aware admission queue for Ollama")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=11438, help="Port to listen on")
+    parser.add_argument("--upstream", default="http://localhost:11434", help="Ollama host to forward to")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Requests running per model (match OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--model-limit", action="append", default=[], metavar="MODEL=N",
+                        help="Per-model concurrency override (repeatable)")
+    parser.add_argument("--batch-slots", type=int, help="Slots per model batch work may use (default: limit - 1)")
+    parser.add_argument("--max-queue", type=int, default=64, help="Queued requests per model and class before 429")
+    parser.add_argument("--max-user-queue", type=int, default=16, help="Queued requests per user and model before 429")
+    parser.add_argument("--weight", action="append", default=[], metavar="USER=W",
+                        help="Fair-queuing weight for a user (default 1, repeatable)")
+    parser.add_argument("--jwt-secret", default=os.environ.get("JWT_SECRET"),
+                        help="Secret used to verify login tokens (default: $JWT_SECRET)")
+    args = parser.parse_args()
+
+    try:
+        model_limits = parse_pairs(args.model_limit, int)
+        weights = parse_pairs(args.weight, float)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+    model_limits = {m if ":" in m else f"{m}:latest": n for m, n in model_limits.items()}
+
+    controller = AdmissionController(args.upstream, args.concurrency, model_limits, args.batch_slots,
+                                     args.max_queue, args.max_user_queue, weights, args.jwt_secret)
+    print(f"Admission queue for {args.upstream} on http://{args.host}:{args.port}; status at /admission/status")
+    web.run_app(create_app(controller), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+# /ollama-ui/bench_matrix.py
+#!/usr/bin/env python3
+"""Benchmark a grid of models and sampling options over a fixed prompt suite.
+
+Each cell of the matrix (model x option set) runs every prompt of the suite
+through `/api/chat` one request at a time and records Ollama's own timing
+fields from the final stream frame (`load_duration`, `prompt_eval_count`,
+`prompt_eval_duration`, `eval_count`, `eval_duration`) next to the measured
+time to first token and wall time. The result is a comparison table and a
+JSON baseline that later runs can be compared against.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+import numpy as np
+import requests
+
+from test_offline import MODEL_NAME
+
+# The knobs AdvancedParameters.tsx exposes, with its slider ranges
+PARAMETER_RANGES = {
+    "temperature": (0.0, 2.0),
+    "num_predict": (128, 4096),
+    "top_k": (1, 100),
+    "top_p": (0.0, 1.0),
+    "repeat_penalty": (1.0, 2.0),
+    "presence_penalty": (0.0, 1.0),
+}
+INTEGER_PARAMETERS = ("num_predict", "top_k")
+
+# Short answer, long answer, and long prompt with a short answer
+PROMPT_SUITE = [
+    "What is the capital of France? Answer in one word.",
+    "Explain how a hash map works, with an example, in about 200 words.",
+    "Summarize the following notes in two sentences:\n" + " ".join(
+        f"Note {i}: the deployment on node {i % 7} finished in {30 + i % 11} seconds with no errors." for i in range(60)),
+]
+
+@dataclass
+class RunResult:
+    """One prompt through one matrix cell."""
+    prompt: int
+    ok: bool
+    error: Optional[str] = None
+    ttft: Optional[float] = None
+    wall: float = 0.0
+    load_duration: float = 0.0
+    prompt_eval_count: int = 0
+    prompt_eval_duration: float = 0.0
+    eval_count: int = 0
+    eval_duration: float = 0.0
+
+    @property
+    def prompt_rate(self) -> Optional[float]:
+        return self.prompt_eval_count / self.prompt_eval_duration if self.prompt_eval_duration > 0 else None
+
+    @property
+    def eval_rate(self) -> Optional[float]:
+        return self.eval_count / self.eval_duration if self.eval_duration > 0 else None
+
+@dataclass
+class Cell:
+    """A model and option set with the runs made against it."""
+    model: str
+    options: dict
+    runs: list[RunResult] = field(default_factory=list)
+
+    @property
+    def key(self) -> str:
+        return f"{self.model} {json.dumps(self.options, sort_keys=True)}"
+
+    def summary(self) -> dict:
+        ok = [r for r in self.runs if r.ok]
+
+        def median(values: list) -> Optional[float]:
+            values = [v for v in values if v is not None]
+            return float(np.median(values)) if values else None
+
+        return {
+            "runs": len(self.runs),
+            "errors": len(self.runs) - len(ok),
+            "load_ms": median([r.load_duration * 1000 for r in ok]),
+            "ttft_ms": median([r.ttft * 1000 for r in ok if r.ttft is not None]),
+            "wall_ms": median([r.wall * 1000 for r in ok]),
+            "prompt_tokens": median([r.prompt_eval_count for r in ok]),
+            "prompt_tokens_per_second": median([r.prompt_rate for r in ok]),
+            "eval_tokens": median([r.eval_count for r in ok]),
+            "eval_tokens_per_second": median([r.eval_rate for r in ok]),
+        }
+
+def parse_value(key: str, text: str):
+    value = int(text) if key in INTEGER_PARAMETERS else float(text)
+    low, high = PARAMETER_RANGES[key]
+    if not low <= value <= high:
+        raise ValueError(f"{key}={value} is outside the UI's range {low}-{high}")
+    return value
+
+def parse_option(spec: str) -> tuple[str, list]:
+    """Parse KEY=V1,V2,... into a parameter name and its values."""
+    key, _, values = spec.partition("=")
+    if key not in PARAMETER_RANGES:
+        raise ValueError(f"unknown parameter {key!r}; expected one of {', '.join(PARAMETER_RANGES)}")
+    return key, [parse_value(key, v) for v in values.split(",") if v]
+
+def option_grid(axes: dict[str, list]) -> list[dict]:
+    """Expand parameter axes into every combination, in a stable order."""
+    if not axes:
+        return [{}]
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*(axes[k] for k in keys))]
+
+def load_prompts(path: str) -> list[str]:
+    """Read a JSON list of prompts, or a text file with prompts separated by blank lines."""
+    with open(path) as f:
+        content = f.read()
+    if path.endswith(".json"):
+        return list(json.loads(content))
+    return [block.strip() for block in content.split("\n\n") if block.strip()]
+
+def run_prompt(host: str, model: str, options: dict, prompt: str, index: int, timeout: float) -> RunResult:
+    """Stream one chat request and read the timing fields from its final frame."""
+    result = RunResult(prompt=index, ok=False)
+    payload = {"model": model, "messages": [{"role": "user", "content": prompt}], "options": options, "stream": True}
+    started = time.perf_counter()
+    try:
+        with requests.post(f"{host}/api/chat", json=payload, stream=True, timeout=timeout) as response:
+            if response.status_code != 200:
+                result.error = f"HTTP {response.status_code}: {response.text.strip()[:80]}"
+                return result
+            final = None
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                frame = json.loads(line)
+                if frame.get("error"):
+                    result.error = frame["error"]
+                    return result
+                if result.ttft is None and (frame.get("message") or {}).get("content"):
+                    result.ttft = time.perf_counter() - started
+                if frame.get("done"):
+                    final = frame
+            if final is None:
+                result.error = "stream ended without a final frame"
+                return result
+    except (requests.RequestException, ValueError) as e:
+        result.error = str(e) or type(e).__name__
+        return result
+    finally:
+        result.wall = time.perf_counter() - started
+    result.ok = True
+    result.load_duration = final.get("load_duration", 0) / 1e9
+    result.prompt_eval_count = final.get("prompt_eval_count", 0)
+    result.prompt_eval_duration = final.get("prompt_eval_duration", 0) / 1e9
+    result.eval_count = final.get("eval_count", 0)
+    result.eval_duration = final.get("eval_duration", 0) / 1e9
+    return result
+
+def warm_up(host: str, model: str, timeout: float) -> Optional[float]:
+    """Load the model with an empty generate request; return Ollama's load time in seconds."""
+    try:
+        response = requests.post(f"{host}/api/generate", json={"model": model, "prompt": "", "stream": False},
+                                 timeout=timeout)
+        response.raise_for_status()
+        return response.json().get("load_duration", 0) / 1e9
+    except (requests.RequestException, ValueError) as e:
+        print(f"{model}: warm-up failed: {e}")
+        return None
+
+def run_matrix(host: str, models: list[str], grid: list[dict], prompts: list[str], repeats: int,
+               seed: Optional[int], timeout: float) -> tuple[list[Cell], dict[str, Optional[float]]]:
+    """Run every cell sequentially so cells do not compete for the GPU."""
+    cells = []
+    cold_loads = {}
+    total = len(models) * len(grid)
+    for model in models:
+        # The first request pays for loading the model; keep it out of the cells
+        cold_loads[model] = warm_up(host, model, timeout)
+        for options in grid:
+            cell = Cell(model, {**options, **({"seed": seed} if seed is not None else {})})
+            for _ in range(repeats):
+                for index, prompt in enumerate(prompts):
+                    cell.runs.append(run_prompt(host, model, cell.options, prompt, index, timeout))
+            cells.append(cell)
+            summary = cell.summary()
+            rate = summary["eval_tokens_per_second"]
+            print(f"[{len(cells)}/{total}] {cell.key}: "
+                  f"{'-' if rate is None else f'{rate:.1f}'} tokens/s, {summary['errors']} errors")
+    return cells, cold_loads
+
+def format_value(value: Optional[float], digits: int = 1) -> str:
+    return "-" if value is None else f"{value:.{digits}f}"
+
+def print_table(cells: list[Cell], baseline: Optional[dict] = None):
+    """Print one row per cell; with a baseline, add the change in generation speed."""
+    previous = {c["key"]: c["summary"] for c in (baseline or {}).get("cells", [])}
+    width = max([len(c.key) for c in cells] + [10]) + 2
+    header = (f"{'model / options':<{width}}{'load ms':>9}{'TTFT ms':>9}{'wall ms':>10}{'prompt t/s':>12}"
+              f"{'gen t/s':>9}{'gen tok':>9}{'errors':>8}")
+    if baseline:
+        header += f"{'vs base':>9}"
+    print(f"\n{header}")
+    print("-" * len(header))
+    for cell in cells:
+        s = cell.summary()
+        row = (f"{cell.key:<{width}}{format_value(s['load_ms']):>9}{format_value(s['ttft_ms']):>9}"
+               f"{format_value(s['wall_ms']):>10}{format_value(s['prompt_tokens_per_second']):>12}"
+               f"{format_value(s['eval_tokens_per_second']):>9}{format_value(s['eval_tokens'], 0):>9}{s['errors']:>8}")
+        if baseline:
+            old = (previous.get(cell.key) or {}).get("eval_tokens_per_second")
+            new = s["eval_tokens_per_second"]
+            row += f"{(f'{(new / old - 1) * 100:+.1f}%' if old and new else '-'):>9}"
+        print(row)
+    print("-" * len(header))
+
+def build_baseline(host: str, cells: list[Cell], cold_loads: dict, prompts: list[str], repeats: int) -> dict:
+    try:
+        version = requests.get(f"{host}/api/version", timeout=5).json().get("version")
+    except (requests.RequestException, ValueError):
+        version = None
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": host,
+        "ollama_version": version,
+        "machine": platform.platform(),
+        "prompts": prompts,
+        "repeats": repeats,
+        "cold_load_seconds": cold_loads,
+        "cells": [{"key": c.key, "model": c.model, "options": c.options, "summary": c.summary(),
+                   "runs": [asdict(r) for r in c.runs]} for c in cells],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark models x sampling options using Ollama's timing fields")
+    parser.add_argument("--host", default=os.environ.get("OLLAMA_API_HOST", "http://localhost:11434"),
+                        help="Ollama host")
+    parser.add_argument("--models", default=MODEL_NAME, help="Comma-separated models")
+    parser.add_argument("--option", action="append", default=[], metavar="KEY=V1,V2",
+                        help=f"Parameter axis, repeatable; one of {', '.join(PARAMETER_RANGES)}")
+    parser.add_argument("--prompts", help="JSON list of prompts, or text with prompts separated by blank lines")
+    parser.add_argument("--repeats", type=int, default=3, help="Runs of the prompt suite per cell")
+    parser.add_argument("--seed", type=int, default=42, help="Sampling seed sent with every request (-1 to omit)")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-request timeout in seconds")
+    parser.add_argument("--output", default="bench-matrix.json", help="Write the baseline JSON here")
+    parser.add_argument("--compare", metavar="FILE", help="Earlier baseline to compare generation speed against")
+    args = parser.parse_args()
+
+    try:
+        axes = dict(parse_option(spec) for spec in args.option)
+    except ValueError as e:
+        parser.error(str(e))
+    grid = option_grid(axes)
+    models = [m for m in args.models.split(",") if m]
+    prompts = load_prompts(args.prompts) if args.prompts else PROMPT_SUITE
+    host = args.host.rstrip("/")
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print(f"Benchmarking {len(models)} models x {len(grid)} option sets x {len(prompts)} prompts "
+          f"x {args.repeats} repeats against {host}")
+    cells, cold_loads = run_matrix(host, models, grid, prompts, args.repeats,
+                                   None if args.seed < 0 else args.seed, args.timeout)
+    print_table(cells, baseline)
+    for model, seconds in cold_loads.items():
+        print(f"Cold load {model}: {format_value(seconds * 1000 if seconds is not None else None)} ms")
+
+    with open(args.output, "w") as f:
+        json.dump(build_baseline(host, cells, cold_loads, prompts, args.repeats), f, indent=2)
+    print(f"Baseline written to {args.output}")
+    if all(s["errors"] == s["runs"] for s in (c.summary() for c in cells)):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# /ollama-ui/build_cache.py
+#!/usr/bin/env python3
+"""Content-hash build cache for the Next.js standalone server.
+
+The sources, config files, package-lock.json, the `.env` files and the
+environment variables next.config.mjs inlines are fingerprinted. When a
+stored artifact matches the fingerprint, `.next/standalone` and
+`.next/static` are restored from it instead of running lint and
+`npm run build`; `npm ci` is skipped while package-lock.json is unchanged.
+The last N artifacts are kept, keyed by fingerprint, so switching back to a
+previous tree is instant.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+CACHE_DIR = ".build-cache"
+# Inputs that change the build output
+SOURCE_PATHS = ("src", "public", "middleware.ts")
+CONFIG_FILES = ("package.json", "package-lock.json", "next.config.mjs", "next.config.ts", "tsconfig.json",
+                "tailwind.config.ts", "postcss.config.mjs", "eslint.config.js", "components.json")
+# Read by `next build`; their values end up in the output
+ENV_FILES = (".env", ".env.local", ".env.production")
+# Inlined through the `env:` block of next.config.mjs
+BUILD_ENV = ("OLLAMA_API_HOST", "AUTH_ENABLED", "IS_DOCKER")
+# Paths under SOURCE_PATHS that do not affect the build or are written by it
+IGNORED = ("src/__tests__", "public/sw.js", "public/swe-worker")
+ARTIFACTS = {"standalone": os.path.join(".next", "standalone"), "static": os.path.join(".next", "static")}
+DEPS_STAMP = os.path.join("node_modules", ".lock-fingerprint")
+
+@dataclass
+class BuildResult:
+    """What ensure_build did and how long each step took."""
+    fingerprint: str
+    cached: bool = False
+    ok: bool = True
+    steps: dict[str, float] = field(default_factory=dict)
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.steps.values())
+
+def hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def input_files(root: str) -> list[str]:
+    """List build inputs relative to root, sorted for a stable fingerprint."""
+    files = [name for name in CONFIG_FILES + ENV_FILES + SOURCE_PATHS if os.path.isfile(os.path.join(root, name))]
+    for top in SOURCE_PATHS:
+        for directory, dirs, names in os.walk(os.path.join(root, top)):
+            dirs.sort()
+            for name in names:
+                relative = os.path.relpath(os.path.join(directory, name), root).replace(os.sep, "/")
+                if not relative.startswith(IGNORED):
+                    files.append(relative)
+    return sorted(files)
+
+def fingerprint(root: str = ".", env: Optional[dict] = None) -> str:
+    """Hash every build input's path and contents, and the build-time environment."""
+    env = os.environ if env is None else env
+    digest = hashlib.sha256()
+    for relative in input_files(root):
+        digest.update(f"{relative}\0{hash_file(os.path.join(root, relative))}\n".encode())
+    for name in BUILD_ENV:
+        # repr() keeps unset (None) apart from empty, which next.config.mjs inlines differently
+        digest.update(f"${name}={env.get(name)!r}\n".encode())
+    return digest.hexdigest()[:16]
+
+def copy_tree(source: str, destination: str):
+    """Copy a directory using hard links where possible."""
+    try:
+        shutil.copytree(source, destination, symlinks=True, copy_function=os.link)
+    except (OSError, shutil.Error):
+        shutil.rmtree(destination, ignore_errors=True)
+        shutil.copytree(source, destination, symlinks=True)
+
+class BuildCache:
+    """Artifacts stored as `<directory>/<fingerprint>/{standalone,static}` with a meta.json each."""
+
+    def __init__(self, root: str = ".", directory: str = CACHE_DIR, keep: int = 3):
+        self.root = root
+        self.directory = os.path.join(root, directory)
+        self.keep = keep
+
+    def _entry(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def has(self, key: str) -> bool:
+        return os.path.exists(os.path.join(self._entry(key), "meta.json"))
+
+    def clear_outputs(self):
+        # Outputs are hard-linked to cached copies, so remove them rather than letting a build overwrite them
+        for target in ARTIFACTS.values():
+            shutil.rmtree(os.path.join(self.root, target), ignore_errors=True)
+
+    def restore(self, key: str):
+        self.clear_outputs()
+        for name, target in ARTIFACTS.items():
+            source = os.path.join(self._entry(key), name)
+            if os.path.isdir(source):
+                copy_tree(source, os.path.join(self.root, target))
+        os.utime(os.path.join(self._entry(key), "meta.json"))
+
+    def store(self, key: str, build_seconds: float):
+        entry = self._entry(key)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.makedirs(entry)
+        for name, target in ARTIFACTS.items():
+            source = os.path.join(self.root, target)
+            if os.path.isdir(source):
+                copy_tree(source, os.path.join(entry, name))
+        with open(os.path.join(entry, "meta.json"), "w") as f:
+            json.dump({"fingerprint": key, "created": time.time(), "build_seconds": build_seconds}, f)
+        self.prune()
+
+    def entries(self) -> list[tuple[float, str]]:
+        """Return (last used, fingerprint) for stored artifacts, most recent first."""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for key in os.listdir(self.directory):
+            meta = os.path.join(self._entry(key), "meta.json")
+            if os.path.exists(meta):
+                found.append((os.path.getmtime(meta), key))
+        return sorted(found, reverse=True)
+
+    def prune(self):
+        """Keep only the `keep` most recently used artifacts."""
+        for _, key in self.entries()[self.keep:]:
+            shutil.rmtree(self._entry(key), ignore_errors=True)
+
+def run_shell(cmd: str) -> bool:
+    return subprocess.run(cmd, shell=True).returncode == 0
+
+def install_matches_lock(root: str = ".") -> bool:
+    """Check npm's record of node_modules (.package-lock.json) against every locked package version."""
+    try:
+        with open(os.path.join(root, "package-lock.json")) as f:
+            locked = json.load(f).get("packages", {})
+        with open(os.path.join(root, "node_modules", ".package-lock.json")) as f:
+            installed = json.load(f).get("packages", {})
+    except (OSError, ValueError, AttributeError):
+        return False
+    for path, package in locked.items():
+        # The root entry is not installed, and optional packages may be skipped on this platform
+        if not path or package.get("optional"):
+            continue
+        if installed.get(path, {}).get("version") != package.get("version"):
+            return False
+    return True
+
+def ensure_dependencies(root: str = ".", run: Callable[[str], bool] = run_shell) -> Optional[float]:
+    """Run `npm ci` only when package-lock.json changed since the last install; return its duration."""
+    lock = os.path.join(root, "package-lock.json")
+    stamp = os.path.join(root, DEPS_STAMP)
+    lock_hash = hash_file(lock) if os.path.exists(lock) else ""
+    if os.path.isdir(os.path.join(root, "node_modules")):
+        if not os.path.exists(stamp):
+            # Adopt an install made before stamps existed (or by hand) only if npm recorded exactly the locked tree
+            if install_matches_lock(root):
+                with open(stamp, "w") as f:
+                    f.write(lock_hash)
+                return None
+        else:
+            with open(stamp) as f:
+                if f.read().strip() == lock_hash:
+                    return None
+    started = time.monotonic()
+    if not run("npm ci"):
+        raise RuntimeError("npm ci failed")
+    if os.path.isdir(os.path.join(root, "node_modules")):
+        with open(stamp, "w") as f:
+            f.write(lock_hash)
+    return time.monotonic() - started
+
+def ensure_build(root: str = ".", keep: int = 3, lint: bool = False, install: bool = True,
+                 run: Callable[[str], bool] = run_shell) -> BuildResult:
+    """Make `.next/standalone` match the current sources, from the cache when possible."""
+    started = time.monotonic()
+    key = fingerprint(root)
+    result = BuildResult(key, steps={"fingerprint": time.monotonic() - started})
+    cache = BuildCache(root, keep=keep)
+
+    def restore() -> BuildResult:
+        started = time.monotonic()
+        cache.restore(key)
+        result.cached = True
+        result.steps["restore"] = time.monotonic() - started
+        return result
+
+    if cache.has(key):
+        return restore()
+
+    if install:
+        try:
+            seconds = ensure_dependencies(root, run)
+        except RuntimeError:
+            result.ok = False
+            return result
+        if seconds is not None:
+            result.steps["npm ci"] = seconds
+    if lint:
+        started = time.monotonic()
+        run("npm run lint -- --fix")
+        result.steps["lint"] = time.monotonic() - started
+        # Lint fixes may have changed the sources
+        key = result.fingerprint = fingerprint(root)
+        if cache.has(key):
+            return restore()
+
+    cache.clear_outputs()
+    started = time.monotonic()
+    result.ok = run("npm run build") and os.path.exists(os.path.join(root, ARTIFACTS["standalone"], "server.js"))
+    result.steps["build"] = time.monotonic() - started
+    if result.ok:
+        started = time.monotonic()
+        cache.store(key, result.steps["build"])
+        result.steps["store"] = time.monotonic() - started
+    return result
+
+def print_build_result(result: BuildResult):
+    kind = "Warm start (cached build)" if result.cached else "Cold start (full build)"
+    steps = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in result.steps.items())
+    print(f"{kind} {result.fingerprint}: {result.seconds:.2f}s ({steps})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the standalone server, reusing cached builds of unchanged sources")
+    parser.add_argument("--keep", type=int, default=3, help="Number of cached builds to keep")
+    parser.add_argument("--lint", action="store_true", help="Run 'npm run lint -- --fix' before a full build")
+    parser.add_argument("--no-install", action="store_true", help="Never run 'npm ci'")
+    parser.add_argument("--fingerprint", action="store_true", help="Print the source fingerprint and exit")
+    parser.add_argument("--list", action="store_true", help="List cached builds and exit")
+    args = parser.parse_args()
+
+    if args.fingerprint:
+        print(fingerprint())
+        return
+    if args.list:
+        current = fingerprint()
+        for used, key in BuildCache(keep=args.keep).entries():
+            marker = " (current)" if key == current else ""
+            print(f"{key}  last used {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(used))}{marker}")
+        return
+
+    result = ensure_build(keep=args.keep, lint=args.lint, install=not args.no_install)
+    print_build_result(result)
+    if not result.ok:
+        print("Error: build failed")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,18 @@ import secrets
 import string
 import requests
 import argparse
-from typing import Optional
+from typing import Callable, Optional
 import socket
+import asyncio
+import aiohttp
+import re
+from build_cache import ensure_build, print_build_result
+from supervisor import run_supervisor
+from metrics_exporter import start_background as start_metrics_exporter
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 def check_command(cmd: str) -> bool:
     """Check if a command exists."""
@@ -76,6 +86,9 @@ def create_env_file(environment: str):
     """Create .env file if it doesn't exist."""
     env_path = Path(".env")
     if not env_path.exists():
+        if not Path(".env.example").exists():
+            print("Warning: .env.example not found, skipping .env creation")
+            return
         print("Creating .env file...")
         shutil.copy(".env.example", ".env")
         
@@ -107,54 +120,340 @@ def is_port_in_use(port: int) -> bool:
         except socket.error:
             return True
 
-def check_service_health(max_attempts: int = 60, interval: int = 5) -> bool:
+async def wait_for_port(port: int, deadline: float, host: str = '127.0.0.1',
+                        initial_delay: float = 0.05, max_delay: float = 0.5) -> bool:
+    """Wait until a TCP port accepts connections, backing off exponentially."""
+    delay = initial_delay
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=1)
+            writer.close()
+            await writer.wait_closed()
+            return True
+        except (OSError, asyncio.TimeoutError):
+            pass
+        if loop.time() + delay > deadline:
+            return False
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+async def wait_for_http(session: aiohttp.ClientSession, url: str, deadline: float,
+                        is_ready: Callable[[int, dict], bool] = lambda status, data: status == 200,
+                        initial_delay: float = 0.05, max_delay: float = 0.5) -> Optional[dict]:
+    """Poll a JSON endpoint until `is_ready` accepts it, backing off exponentially.
+
+    Returns the last response body once ready, or None when the deadline passes.
+    """
+    delay = initial_delay
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            async with session.get(url) as response:
+                try:
+                    data = await response.json(content_type=None)
+                except (json.JSONDecodeError, aiohttp.ContentTypeError):
+                    data = {}
+                if is_ready(response.status, data if isinstance(data, dict) else {}):
+                    return data
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        if loop.time() + delay > deadline:
+            return None
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+async def probe_readiness(port: int, ollama_host: str, timeout: float) -> dict[str, dict]:
+    """Probe the Next.js port, /api/health and Ollama concurrently.
+
+    Returns a mapping of component name to {'ready', 'seconds', 'data'}. Ollama is
+    optional: its probe is abandoned once the application itself is ready.
+    """
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    deadline = started + timeout
+    readiness = {name: {'ready': False, 'seconds': None, 'data': None}
+                 for name in ('nextjs_port', 'app_health', 'ollama')}
+
+    async def timed(name: str, probe):
+        result = await probe
+        if result:
+            readiness[name] = {
+                'ready': True,
+                'seconds': loop.time() - started,
+                'data': result if isinstance(result, dict) else None,
+            }
+
+    connector = aiohttp.TCPConnector(limit=8)
+    client_timeout = aiohttp.ClientTimeout(total=5)
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        app_healthy = lambda status, data: status == 200 and data.get('status') == 'healthy'
+        ollama = asyncio.create_task(
+            timed('ollama', wait_for_http(session, f"{ollama_host}/api/version", deadline)))
+        await asyncio.gather(
+            timed('nextjs_port', wait_for_port(port, deadline)),
+            timed('app_health', wait_for_http(session, f"http://127.0.0.1:{port}/api/health", deadline, app_healthy)),
+        )
+        if not ollama.done():
+            ollama.cancel()
+        await asyncio.gather(ollama, return_exceptions=True)
+    return readiness
+
+def print_readiness(readiness: dict[str, dict]):
+    """Print how long each component took to become ready."""
+    print("Readiness timings:")
+    for name, result in readiness.items():
+        timing = f"{result['seconds']:.2f}s" if result['ready'] else "not ready"
+        print(f"  {name:<12} {timing}")
+
+class ProcessLogs:
+    """Drain a process's stdout and stderr concurrently into a bounded ring buffer.
+
+    Each line is echoed as it arrives and kept as a (timestamp, stream, line)
+    tuple. `ready` is set once a line contains `ready_marker`.
+    """
+
+    def __init__(self, process: subprocess.Popen, maxlen: int = 1000, ready_marker: str = "Ready in"):
+        self.process = process
+        self.lines: deque[tuple[float, str, str]] = deque(maxlen=maxlen)
+        self.ready_marker = ready_marker
+        self.ready = threading.Event()
+        self.started = time.monotonic()
+        self.startup_seconds: Optional[float] = None
+        self.reported_startup: Optional[float] = None
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._drain, args=(process.stdout, 'stdout', sys.stdout), daemon=True),
+            threading.Thread(target=self._drain, args=(process.stderr, 'stderr', sys.stderr), daemon=True),
+        ]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def join(self, timeout: float = 5.0):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _drain(self, stream, name: str, echo):
+        for raw in iter(stream.readline, ''):
+            line = raw.rstrip()
+            with self._lock:
+                self.lines.append((time.time(), name, line))
+                print(line, file=echo, flush=True)
+            if not self.ready.is_set() and self.ready_marker in line:
+                self.startup_seconds = time.monotonic() - self.started
+                self.reported_startup = parse_ready_time(line)
+                self.ready.set()
+        stream.close()
+
+    def recent(self, stream: Optional[str] = None, count: Optional[int] = None) -> list[tuple[float, str, str]]:
+        """Return buffered lines, optionally for one stream and limited to the last `count`."""
+        with self._lock:
+            lines = [entry for entry in self.lines if stream is None or entry[1] == stream]
+        return lines[-count:] if count else lines
+
+def parse_ready_time(line: str) -> Optional[float]:
+    """Extract the startup time in seconds from a Next.js 'Ready in 1.2s' / 'Ready in 850ms' line."""
+    match = re.search(r'Ready in\s+([\d.]+)\s*(ms|s)', line)
+    if not match:
+        return None
+    value = float(match.group(1))
+    return value / 1000 if match.group(2) == 'ms' else value
+
+def check_service_health(timeout: float = 300.0, ollama_host: Optional[str] = None) -> bool:
     """Check if services are healthy."""
     # For testing: skip health check if SKIP_HEALTH_CHECK is set
     if os.environ.get('SKIP_HEALTH_CHECK') == 'true':
         return True
 
-    print("Waiting for services to be healthy...")
-    
-    # First wait for the port to be in use (Next.js is listening)
-    print("Waiting for Next.js to start listening...")
-    port_attempts = 0
     port = int(os.environ.get('PORT', '3000'))
-    
-    while not is_port_in_use(port) and port_attempts < 30:
-        print(f"Port check attempt {port_attempts + 1}/30 for port {port}...")
-        time.sleep(1)
-        port_attempts += 1
-    
-    if not is_port_in_use(port):
+    ollama_host = ollama_host or os.environ.get('OLLAMA_API_HOST', 'http://localhost:11434')
+    print(f"Waiting for Next.js on port {port} and Ollama at {ollama_host}...")
+
+    readiness = asyncio.run(probe_readiness(port, ollama_host, timeout))
+    print_readiness(readiness)
+
+    if not readiness['nextjs_port']['ready']:
         print(f"Warning: Next.js did not start listening on port {port}")
         return False
-    
-    print(f"Port {port} is now in use, checking application health...")
-    
-    # Now try the health check
-    for attempt in range(max_attempts):
-        try:
-            response = requests.get(f"http://127.0.0.1:{port}/api/health", timeout=5)
-            data = response.json()
-            
-            if response.status_code == 200 and data.get("status") == "healthy":
-                print("Application is healthy!")
-                print(f"Environment: {data.get('environment', {})}")
-                print(f"Ollama Status: {data.get('ollama', {}).get('status', 'unknown')}")
-                return True
+    if not readiness['app_health']['ready']:
+        print("Error: Application failed to become healthy within timeout period")
+        return False
+
+    data = readiness['app_health']['data'] or {}
+    print("Application is healthy!")
+    print(f"Environment: {data.get('environment', {})}")
+    if readiness['ollama']['ready']:
+        print(f"Ollama Status: running (version {readiness['ollama']['data'].get('version', 'unknown')})")
+    else:
+        print("Ollama Status: unreachable")
+    return True
+
+def check_deep_health(models: list[str], max_ollama_ms: float, max_load_ms: float,
+                      max_ttft_ms: float, timeout: float = 600.0) -> bool:
+    """Run the deep /api/health check and enforce latency budgets."""
+    if os.environ.get('SKIP_HEALTH_CHECK') == 'true':
+        return True
+
+    port = int(os.environ.get('PORT', '3000'))
+    params = {'deep': '1'}
+    if models:
+        params['models'] = ','.join(models)
+    print(f"Running deep health check{' with warm-up of ' + ', '.join(models) if models else ''}...")
+    try:
+        response = requests.get(f"http://127.0.0.1:{port}/api/health", params=params, timeout=timeout)
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error: Deep health check failed: {e}")
+        return False
+
+    ollama = data.get('ollama', {})
+    if ollama.get('status') != 'running':
+        print(f"Error: Ollama is {ollama.get('status', 'unknown')}: {ollama.get('error', 'no details')}")
+        return False
+
+    failures = []
+    for endpoint, latency in ollama.get('latencyMs', {}).items():
+        print(f"Ollama /api/{endpoint}: {latency:.1f} ms")
+        if latency > max_ollama_ms:
+            failures.append(f"Ollama /api/{endpoint} took {latency:.1f} ms (budget {max_ollama_ms:.0f} ms)")
+    print(f"Loaded models: {', '.join(ollama.get('loadedModels', [])) or 'none'}")
+
+    for model in data.get('models', []):
+        if model.get('error'):
+            failures.append(f"{model['name']}: {model['error']}")
+            continue
+        load_ms = model.get('loadMs') or 0.0
+        ttft_ms = model.get('ttftMs') or 0.0
+        print(f"Model {model['name']}: load {load_ms:.1f} ms, TTFT {ttft_ms:.1f} ms")
+        if load_ms > max_load_ms:
+            failures.append(f"{model['name']} load took {load_ms:.1f} ms (budget {max_load_ms:.0f} ms)")
+        if ttft_ms > max_ttft_ms:
+            failures.append(f"{model['name']} TTFT was {ttft_ms:.1f} ms (budget {max_ttft_ms:.0f} ms)")
+
+    for failure in failures:
+        print(f"Error: {failure}")
+    return response.status_code == 200 and not failures
+
+def parse_expires_at(value: str) -> Optional[float]:
+    """Parse an /api/ps expires_at timestamp into a Unix time."""
+    if not value:
+        return None
+    # Ollama reports nanosecond precision, which datetime cannot parse
+    value = re.sub(r'(\.\d{6})\d+', r'\1', value).replace('Z', '+00:00')
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+async def prewarm_model(session: aiohttp.ClientSession, host: str, model: str, keep_alive: str) -> dict:
+    """Load a model into memory with an empty generate request."""
+    started = time.monotonic()
+    try:
+        async with session.post(f"{host}/api/generate",
+                                json={'model': model, 'keep_alive': keep_alive, 'stream': False}) as response:
+            data = await response.json(content_type=None)
+            if response.status != 200:
+                raise RuntimeError(data.get('error', f"HTTP {response.status}"))
+        return {
+            'model': model,
+            'ok': True,
+            'seconds': time.monotonic() - started,
+            'load_seconds': data.get('load_duration', 0) / 1e9,
+        }
+    except (aiohttp.ClientError, asyncio.TimeoutError, RuntimeError, ValueError) as e:
+        return {'model': model, 'ok': False, 'seconds': time.monotonic() - started, 'error': str(e) or type(e).__name__}
+
+async def prewarm_models_async(host: str, models: list[str], keep_alive: str) -> list[dict]:
+    """Load all models in parallel, reporting each one as it finishes."""
+    timeout = aiohttp.ClientTimeout(total=600)
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+        results = []
+        for done in asyncio.as_completed([prewarm_model(session, host, m, keep_alive) for m in models]):
+            result = await done
+            results.append(result)
+            if result['ok']:
+                print(f"[{len(results)}/{len(models)}] {result['model']} warm in {result['seconds']:.2f}s "
+                      f"(load {result['load_seconds']:.2f}s)")
             else:
-                print(f"Health check attempt {attempt + 1}/{max_attempts}: Unhealthy response")
-                print(f"Status code: {response.status_code}")
-                print(f"Response data: {data}")
-        except requests.RequestException as e:
-            print(f"Health check attempt {attempt + 1}/{max_attempts}: {str(e)}")
-        
-        time.sleep(interval)
-    
-    print("Error: Application failed to become healthy within timeout period")
-    return False
+                print(f"[{len(results)}/{len(models)}] {result['model']} failed: {result['error']}")
+        return results
+
+def prewarm_models(models: list[str], keep_alive: str, ollama_host: Optional[str] = None) -> bool:
+    """Pre-warm models so the first user request doesn't pay the cold load."""
+    if os.environ.get('MOCK_SERVER_RESPONSE') == 'true':
+        return True
+
+    ollama_host = ollama_host or os.environ.get('OLLAMA_API_HOST', 'http://localhost:11434')
+    print(f"Pre-warming {len(models)} model(s) with keep_alive={keep_alive}...")
+    started = time.monotonic()
+    results = asyncio.run(prewarm_models_async(ollama_host, models, keep_alive))
+    print(f"Pre-warm finished in {time.monotonic() - started:.2f}s")
+    return all(result['ok'] for result in results)
+
+def next_keep_alive_refresh(models: list[str], ps_models: list[dict], warmed_at: dict[str, float],
+                            now: float, max_interval: float = 300.0) -> tuple[list[str], float]:
+    """Decide which models need refreshing now and how long to sleep afterwards.
+
+    A model is refreshed once less than a quarter of its keep-alive window (the
+    time between its last warm-up and the expires_at reported by /api/ps) remains.
+    """
+    expires = {}
+    for entry in ps_models:
+        expires_at = parse_expires_at(entry.get('expires_at', ''))
+        if expires_at is not None:
+            expires[entry.get('name')] = expires_at
 
-def check_ollama_running(host: str = "http://localhost:11434") -> bool:
+    due = []
+    sleep = max_interval
+    for model in models:
+        name = model if ':' in model else f"{model}:latest"
+        expires_at = expires.get(name, expires.get(model))
+        if expires_at is None:
+            due.append(model)
+            continue
+        window = max(expires_at - warmed_at.get(model, now), 1.0)
+        refresh_at = expires_at - window / 4
+        if refresh_at <= now:
+            due.append(model)
+        else:
+            sleep = min(sleep, refresh_at - now)
+    return due, max(sleep, 1.0)
+
+def start_keep_alive_refresher(models: list[str], keep_alive: str, stop: threading.Event,
+                               ollama_host: Optional[str] = None) -> threading.Thread:
+    """Keep pre-warmed models resident by re-warming them before they expire."""
+    ollama_host = ollama_host or os.environ.get('OLLAMA_API_HOST', 'http://localhost:11434')
+    warmed_at = {model: time.time() for model in models}
+
+    def refresh_loop():
+        with requests.Session() as session:
+            while not stop.is_set():
+                try:
+                    ps_models = session.get(f"{ollama_host}/api/ps", timeout=5).json().get('models', [])
+                except (requests.RequestException, ValueError) as e:
+                    print(f"Keep-alive: could not read /api/ps: {e}")
+                    stop.wait(30)
+                    continue
+                due, sleep = next_keep_alive_refresh(models, ps_models, warmed_at, time.time())
+                for model in due:
+                    try:
+                        session.post(f"{ollama_host}/api/generate",
+                                     json={'model': model, 'keep_alive': keep_alive, 'stream': False},
+                                     timeout=600).raise_for_status()
+                        warmed_at[model] = time.time()
+                        print(f"Keep-alive: refreshed {model}")
+                    except requests.RequestException as e:
+                        print(f"Keep-alive: failed to refresh {model}: {e}")
+                # Re-read /api/ps right after a refresh to pick up the new expiry
+                stop.wait(1.0 if due else sleep)
+
+    thread = threading.Thread(target=refresh_loop, name="keep-alive-refresher", daemon=True)
+    thread.start()
+    return thread
+
+def check_ollama_running(host: str = "http://localhost:11434", timeout: float = 5.0) -> bool:
     """Check if Ollama is running locally."""
     print("Verifying Ollama is running locally...")
     
@@ -163,7 +462,7 @@ def check_ollama_running(host: str = "http://localhost:11434") -> bool:
         return True
 
     try:
-        response = requests.get(f"{host}/api/version")
+        response = requests.get(f"{host}/api/version", timeout=timeout)
         return response.status_code == 200
     except requests.RequestException:
         return False
@@ -202,52 +501,264 @@ def setup_docker_environment():
         print("Error: Failed to build Docker image")
         sys.exit(1)
 
+    # BuildKit is needed for the npm cache mounts in the Dockerfile
+    os.environ['DOCKER_BUILDKIT'] = '1'
+    os.environ['COMPOSE_DOCKER_CLI_BUILD'] = '1'
+
+def timed_command(cmd: str, shell: bool = False) -> tuple[int, str, str, float]:
+    """Run a command and also return how long it took."""
+    started = time.monotonic()
+    code, stdout, stderr = run_command(cmd, shell=shell)
+    return code, stdout, stderr, time.monotonic() - started
+
+def get_container_state(service: str) -> str:
+    """Return '<status>/<health>' for a docker-compose service's container."""
+    code, container_id, _ = run_command(f"docker-compose ps -q {service}")
+    container_id = container_id.strip()
+    if code != 0 or not container_id:
+        return "missing/"
+    code, state, _ = run_command(
+        f"docker inspect --format '{{{{.State.Status}}}}/{{{{if .State.Health}}}}{{{{.State.Health.Status}}}}{{{{end}}}}' {container_id}",
+        shell=True)
+    return state.strip() if code == 0 else "missing/"
+
+def wait_for_containers(services: list[str], timeout: float = 300.0) -> dict[str, Optional[float]]:
+    """Wait for each service's container healthcheck to report healthy.
+
+    Returns the seconds each service took to become healthy (None if it never did).
+    """
+    if os.environ.get('SKIP_HEALTH_CHECK') == 'true':
+        return {service: 0.0 for service in services}
+
+    started = time.monotonic()
+    healthy: dict[str, Optional[float]] = {service: None for service in services}
+    delay = 0.25
+    while time.monotonic() - started < timeout:
+        for service in services:
+            if healthy[service] is not None:
+                continue
+            status, _, health = get_container_state(service).partition('/')
+            if health == 'healthy' or (status == 'running' and not health):
+                healthy[service] = time.monotonic() - started
+                print(f"{service} is healthy after {healthy[service]:.1f}s")
+            elif health == 'unhealthy' or status in ('exited', 'dead'):
+                print(f"Error: {service} container is {status}/{health or 'no healthcheck'}")
+                return healthy
+        if all(seconds is not None for seconds in healthy.values()):
+            break
+        time.sleep(delay)
+        delay = min(delay * 2, 5.0)
+    return healthy
+
+def deploy_docker() -> bool:
+    """Build, pull and start the docker-compose services, recording phase timings."""
+    check_required_commands('docker')
+    create_env_file('docker')
+    setup_docker_environment()
+
+    timings: dict[str, float] = {}
+    print("Building ollama-ui image and pulling ollama/ollama in parallel...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        build = pool.submit(timed_command, "docker-compose build ollama-ui")
+        pull = pool.submit(timed_command, "docker-compose pull ollama")
+        build_code, _, build_err, timings['build'] = build.result()
+        pull_code, _, pull_err, timings['pull'] = pull.result()
+    if build_code != 0:
+        print("Error: Failed to build Docker image")
+        print(build_err)
+        return False
+    if pull_code != 0:
+        print("Error: Failed to pull ollama/ollama image")
+        print(pull_err)
+        return False
+
+    print("Starting services...")
+    code, _, stderr, timings['start'] = timed_command("docker-compose up -d --no-build")
+    if code != 0:
+        print("Error: Failed to start services")
+        print(stderr)
+        return False
+
+    print("Waiting for container healthchecks...")
+    healthy = wait_for_containers(['ollama', 'ollama-ui'])
+    for service, seconds in healthy.items():
+        if seconds is not None:
+            timings[f'healthy ({service})'] = seconds
+
+    print("Docker deployment timings:")
+    for phase, seconds in timings.items():
+        print(f"  {phase:<22} {seconds:.1f}s")
+    if any(seconds is None for seconds in healthy.values()):
+        print("Error: Services failed to become healthy")
+        return False
+    print("Docker deployment completed successfully!")
+    return True
+
+def run_build_step(cmd: str) -> bool:
+    """Run an npm step of the build, printing what it wrote if it fails."""
+    code, stdout, stderr = run_command(cmd)
+    if code != 0:
+        print(f"Error: '{cmd}' exited with code {code}")
+        for output in (stdout, stderr):
+            if output.strip():
+                print(output.rstrip())
+    return code == 0
+
+def build_standalone(keep: int = 3) -> bool:
+    """Build the standalone server, restoring a cached build when the sources are unchanged."""
+    print("Building Next.js standalone server...")
+    result = ensure_build(keep=keep, run=run_build_step)
+    print_build_result(result)
+    if not result.ok:
+        print("Error: Failed to build the standalone server")
+    return result.ok
+
+def run_workers(workers: int, status_port: Optional[int], on_ready: Callable[[], bool]) -> int:
+    """Build the standalone server if needed and run it under the multi-worker supervisor."""
+    server_js = os.path.join(".next", "standalone", "server.js")
+    if not build_standalone():
+        return 1
+
+    port = int(os.environ.get('PORT', '3000'))
+    print(f"Starting {workers} workers behind port {port}...")
+    return run_supervisor(workers, port, status_port=status_port, server_js=server_js, on_ready=on_ready)
+
+def start_metrics(host: str, port: int, proxy_port: int) -> str:
+    """Put the metrics exporter between the UI and Ollama and return the proxy URL for the UI to use."""
+    upstream = os.environ.get('OLLAMA_API_HOST', 'http://localhost:11434')
+    start_metrics_exporter(upstream, proxy_port, port, host)
+    print(f"Metrics for {upstream} at http://{host}:{port}/metrics (proxy on 127.0.0.1:{proxy_port})")
+    return f"http://127.0.0.1:{proxy_port}"
+
 def main():
     parser = argparse.ArgumentParser(description="Deploy Ollama UI")
     parser.add_argument("--environment", choices=["local", "docker"], default="local",
                       help="Deployment environment (local or docker)")
+    parser.add_argument("--deep-health", action="store_true",
+                      help="Time the Ollama round-trip and fail the deploy when latency budgets are exceeded")
+    parser.add_argument("--health-models", default="",
+                      help="Comma-separated models to warm up with a one-token generate during the deep health check")
+    parser.add_argument("--max-ollama-latency-ms", type=float, default=1000.0,
+                      help="Budget for Ollama /api/version and /api/ps round-trips")
+    parser.add_argument("--max-load-ms", type=float, default=10000.0,
+                      help="Budget for each model's load time")
+    parser.add_argument("--max-ttft-ms", type=float, default=15000.0,
+                      help="Budget for each model's time to first token")
+    parser.add_argument("--prewarm", default="",
+                      help="Comma-separated models to load into Ollama once the server is healthy")
+    parser.add_argument("--keep-alive", default="30m",
+                      help="keep_alive sent with pre-warm requests; models are refreshed before it expires")
+    parser.add_argument("--workers", type=int, default=0,
+                      help="Run N standalone server workers behind one port under a supervisor (local only)")
+    parser.add_argument("--status-port", type=int,
+                      help="Serve supervisor uptime and restart metrics at /status on this port")
+    parser.add_argument("--standalone", action="store_true",
+                      help="Run the cached standalone build instead of 'npm run dev' (local only)")
+    parser.add_argument("--metrics-port", type=int,
+                      help="Route the UI's Ollama traffic through an exporter serving /metrics on this port (local only)")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                      help="Address /metrics listens on; use 0.0.0.0 to let Prometheus scrape remotely")
+    parser.add_argument("--metrics-proxy-port", type=int, default=11441,
+                      help="Port of the exporter's Ollama proxy, which only ever listens on 127.0.0.1")
     args = parser.parse_args()
+    prewarm = [m for m in args.prewarm.split(',') if m]
+    keep_alive_stop = threading.Event()
+
+    def post_start_checks() -> bool:
+        """Deep health and pre-warm steps shared by the single and multi-worker modes."""
+        if args.deep_health and not check_deep_health(
+                [m for m in args.health_models.split(',') if m],
+                args.max_ollama_latency_ms, args.max_load_ms, args.max_ttft_ms):
+            print("Error: Application failed deep health checks")
+            return False
+        if prewarm:
+            if not prewarm_models(prewarm, args.keep_alive):
+                print("Error: Failed to pre-warm models")
+                return False
+            if not args.keep_alive.startswith('-'):
+                start_keep_alive_refresher(prewarm, args.keep_alive, keep_alive_stop)
+        return True
+
+    if args.metrics_port:
+        if args.environment == "local":
+            # next.config.mjs inlines OLLAMA_API_HOST, so set it before any build. It is part of the build
+            # fingerprint, so a build made for the proxy is never restored without it, and vice versa
+            os.environ['OLLAMA_API_HOST'] = start_metrics(args.metrics_host, args.metrics_port,
+                                                          args.metrics_proxy_port)
+        else:
+            print("Warning: --metrics-port is ignored for docker deployments; run metrics_exporter.py next to Ollama")
+
+    if args.environment == "local" and args.workers > 0:
+        sys.exit(run_workers(args.workers, args.status_port, post_start_checks))
 
     # For local development, just start Next.js directly
     if args.environment == "local":
-        print("Starting Next.js in development mode...")
+        if args.standalone:
+            if not build_standalone():
+                sys.exit(1)
+            print("Starting Next.js standalone server...")
+            command = "node .next/standalone/server.js"
+        else:
+            print("Starting Next.js in development mode...")
+            command = "npm run dev"
         process = subprocess.Popen(
-            "npm run dev",
+            command,
             shell=True,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True
         )
-        
-        # Print output in real-time and monitor health
-        server_ready = False
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
+
+        # Drain stdout and stderr on background threads so neither pipe can fill up
+        logs = ProcessLogs(process)
+        logs.start()
+
+        # Wait for the ready message before starting health checks
+        while not logs.ready.wait(0.2):
+            if process.poll() is not None:
                 break
-            if output:
-                print(output.strip())
-                
-                # Wait for the ready message before starting health checks
-                if "Ready in" in output:
-                    server_ready = True
-                    print("\nServer is ready, starting health checks...")
-                    if not check_service_health():
-                        print("Error: Application failed health checks")
-                        process.terminate()
-                        sys.exit(1)
-                    print("Health checks passed successfully!")
-        
-        # If process ended, check for errors
-        if process.poll() is not None:
-            _, stderr = process.communicate()
-            if stderr:
-                print("Error starting Next.js:")
-                print(stderr)
+
+        if logs.ready.is_set():
+            reported = f", Next.js reported {logs.reported_startup:.2f}s" if logs.reported_startup is not None else ""
+            print(f"\nServer is ready after {logs.startup_seconds:.2f}s{reported}, starting health checks...")
+            if not check_service_health():
+                print("Error: Application failed health checks")
+                process.terminate()
+                sys.exit(1)
+            print("Health checks passed successfully!")
+            if not post_start_checks():
+                process.terminate()
                 sys.exit(1)
+
+        interrupted = False
+        try:
+            process.wait()
+        except KeyboardInterrupt:
+            interrupted = True
+            process.terminate()
+            process.wait()
+        keep_alive_stop.set()
+        logs.join()
+
+        # Its output has already been echoed, so only say how it ended
+        if not logs.ready.is_set():
+            print(f"Error: Next.js exited with code {process.returncode} before it was ready; see its output above")
+            sys.exit(1)
+        if not interrupted and process.returncode:
+            print(f"Error: Next.js exited with code {process.returncode}")
+            sys.exit(1)
     else:
-        print("Docker deployment not implemented yet")
-        sys.exit(1)
+        if not deploy_docker():
+            sys.exit(1)
+        if args.deep_health and not check_deep_health(
+                [m for m in args.health_models.split(',') if m],
+                args.max_ollama_latency_ms, args.max_load_ms, args.max_ttft_ms):
+            print("Error: Application failed deep health checks")
+            sys.exit(1)
+        # The deploy exits after this, so models are loaded once without a refresher
+        if prewarm and not prewarm_models(prewarm, args.keep_alive):
+            print("Error: Failed to pre-warm models")
+            sys.exit(1)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,261 @@
+# /ollama-ui/embed_corpus.py
+#!/usr/bin/env python3
+"""Batch-embed a JSONL or text corpus into an on-disk vector store.
+
+Records are streamed from the input and embedded with bounded asyncio
+concurrency, either through the UI's /api/embeddings route or directly
+against Ollama. Vectors land in a memory-mapped float32 matrix
+(`vectors.f32`) with a parallel ID index (`ids.jsonl`) and a `meta.json`
+checkpoint, so an interrupted run resumes where it stopped.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Iterator, Optional
+
+import aiohttp
+import numpy as np
+
+VECTORS_FILE = "vectors.f32"
+IDS_FILE = "ids.jsonl"
+META_FILE = "meta.json"
+
+class VectorStore:
+    """Append-only float32 matrix on disk, grown by doubling and read through np.memmap."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.meta = {"model": None, "dim": None, "count": 0}
+        self.vectors: Optional[np.memmap] = None
+        self.capacity = 0
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta.update(json.load(f))
+        self._truncate_ids(self.count)
+        if self.dim:
+            self._open(max(self.count, 1))
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"]
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.meta["dim"]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _truncate_ids(self, count: int):
+        """Drop ID lines written after the last checkpoint."""
+        path = self._path(IDS_FILE)
+        if not os.path.exists(path):
+            open(path, "w").close()
+            return
+        with open(path, "rb+") as f:
+            for _ in range(count):
+                if not f.readline():
+                    break
+            f.truncate()
+
+    def _open(self, capacity: int):
+        path = self._path(VECTORS_FILE)
+        with open(path, "ab") as f:
+            f.truncate(max(os.path.getsize(path), capacity * self.dim * 4))
+        self.capacity = os.path.getsize(path) // (self.dim * 4)
+        self.vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(self.capacity, self.dim))
+
+    def ensure_capacity(self, rows: int, dim: int):
+        """Make room for `rows` rows, allocating the file once the dimension is known."""
+        if self.dim is None:
+            self.meta["dim"] = dim
+        elif dim != self.dim:
+            raise ValueError(f"embedding dimension changed from {self.dim} to {dim}")
+        if rows > self.capacity:
+            if self.vectors is not None:
+                self.vectors.flush()
+                del self.vectors
+            self._open(max(rows, self.capacity * 2, 1024))
+
+    def write(self, row: int, vector: list[float]):
+        self.ensure_capacity(row + 1, len(vector))
+        self.vectors[row] = vector
+
+    def commit(self, ids: list[str], model: str):
+        """Flush vectors, append their IDs and atomically advance the checkpoint."""
+        if self.vectors is not None:
+            self.vectors.flush()
+        with open(self._path(IDS_FILE), "a") as f:
+            for record_id in ids:
+                f.write(json.dumps(record_id) + "\n")
+        self.meta["count"] += len(ids)
+        self.meta["model"] = model
+        tmp = self._path(META_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self._path(META_FILE))
+
+    def close(self):
+        """Trim the preallocated tail so the file holds exactly `count` rows."""
+        if self.vectors is not None:
+            self.vectors.flush()
+            del self.vectors
+            self.vectors = None
+        if self.dim:
+            with open(self._path(VECTORS_FILE), "rb+") as f:
+                f.truncate(self.count * self.dim * 4)
+
+def load_vectors(directory: str) -> tuple[np.ndarray, list[str], dict]:
+    """Open a store read-only as an (count, dim) float32 memmap plus its IDs and metadata."""
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+    with open(os.path.join(directory, IDS_FILE)) as f:
+        ids = [json.loads(line) for _, line in zip(range(meta["count"]), f)]
+    if not meta["count"]:
+        return np.zeros((0, meta["dim"] or 0), dtype=np.float32), ids, meta
+    vectors = np.memmap(os.path.join(directory, VECTORS_FILE), dtype=np.float32, mode="r",
+                        shape=(meta["count"], meta["dim"]))
+    return vectors, ids, meta
+
+def read_corpus(path: str, id_field: str, text_field: str) -> Iterator[tuple[str, str]]:
+    """Yield (id, text) pairs from a JSONL file or a text file with one chunk per line."""
+    jsonl = path.endswith((".jsonl", ".ndjson"))
+    with (sys.stdin if path == "-" else open(path)) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if jsonl:
+                record = json.loads(line)
+                yield str(record.get(id_field, line_number)), record[text_field]
+            else:
+                yield str(line_number), line
+
+async def embed(session: aiohttp.ClientSession, url: str, model: str, text: str, retries: int) -> list[float]:
+    """Request one embedding, retrying transient failures with backoff."""
+    delay = 0.5
+    for attempt in range(retries + 1):
+        try:
+            async with session.post(url, json={"model": model, "prompt": text}) as response:
+                data = await response.json(content_type=None)
+                if response.status == 200 and data.get("embedding"):
+                    return data["embedding"]
+                error = data.get("error", f"HTTP {response.status}")
+                if response.status < 500 and response.status != 429:
+                    raise RuntimeError(error)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            error = str(e) or type(e).__name__
+        if attempt < retries:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 10.0)
+    raise RuntimeError(f"embedding failed after {retries + 1} attempts: {error}")
+
+async def ingest(records: Iterator[tuple[str, str]], store: VectorStore, url: str, model: str,
+                 concurrency: int, retries: int, checkpoint_every: int, report_every: float) -> int:
+    """Embed all records, committing completed rows in input order."""
+    start_row = store.count
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 4)
+    done: dict[int, str] = {}
+    next_commit = start_row
+    embedded = 0
+    failure: Optional[Exception] = None
+    started = time.monotonic()
+    last_report = started
+
+    def commit_ready(force: bool = False):
+        """Checkpoint the contiguous run of finished rows following the last commit."""
+        nonlocal next_commit
+        end = next_commit
+        while end in done:
+            end += 1
+        if end > next_commit and (force or end - next_commit >= checkpoint_every):
+            store.commit([done.pop(row) for row in range(next_commit, end)], model)
+            next_commit = end
+
+    async def worker(session: aiohttp.ClientSession):
+        nonlocal embedded, failure, last_report
+        while (item := await queue.get()) is not None:
+            # After a failure keep draining the queue so the reader never blocks
+            if failure is not None:
+                continue
+            row, record_id, text = item
+            try:
+                vector = await embed(session, url, model, text, retries)
+            except RuntimeError as e:
+                failure = e
+                continue
+            store.write(row, vector)
+            done[row] = record_id
+            embedded += 1
+            commit_ready()
+            now = time.monotonic()
+            if now - last_report >= report_every:
+                last_report = now
+                print(f"{start_row + embedded} embedded ({embedded / (now - started):.1f} docs/sec)")
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        workers = [asyncio.create_task(worker(session)) for _ in range(concurrency)]
+        try:
+            for row, (record_id, text) in enumerate(records):
+                if failure is not None:
+                    break
+                if row >= start_row:
+                    await queue.put((row, record_id, text))
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            commit_ready(force=True)
+    if failure is not None:
+        raise failure
+    return embedded
+
+def main():
+    parser = argparse.ArgumentParser(description="Embed a corpus into a memory-mapped vector store")
+    parser.add_argument("input", help="JSONL (.jsonl/.ndjson) or text file with one chunk per line ('-' for stdin)")
+    parser.add_argument("--output", required=True, help="Directory for vectors.f32, ids.jsonl and meta.json")
+    parser.add_argument("--model", default="nomic-embed-text", help="Embedding model")
+    parser.add_argument("--url", default="http://localhost:11434/api/embeddings",
+                        help="Embeddings endpoint: Ollama's /api/embeddings or the UI's /api/embeddings route")
+    parser.add_argument("--id-field", default="id", help="JSONL field holding the record ID")
+    parser.add_argument("--text-field", default="text", help="JSONL field holding the text to embed")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight")
+    parser.add_argument("--retries", type=int, default=3, help="Retries per record on transient errors")
+    parser.add_argument("--checkpoint-every", type=int, default=256, help="Rows per checkpoint")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between progress reports")
+    args = parser.parse_args()
+
+    store = VectorStore(args.output)
+    if store.meta["model"] and store.meta["model"] != args.model:
+        print(f"Error: {args.output} holds {store.meta['model']} embeddings, not {args.model}")
+        sys.exit(1)
+    if store.count:
+        print(f"Resuming after {store.count} embedded records")
+
+    started = time.monotonic()
+    records = read_corpus(args.input, args.id_field, args.text_field)
+    try:
+        embedded = asyncio.run(ingest(records, store, args.url, args.model, args.concurrency,
+                                      args.retries, args.checkpoint_every, args.report_every))
+    except (RuntimeError, KeyboardInterrupt) as e:
+        store.close()
+        print(f"\nStopped after {store.count} records: {str(e) or 'interrupted'}; rerun to resume")
+        sys.exit(1)
+    store.close()
+    elapsed = time.monotonic() - started
+    rate = embedded / elapsed if elapsed > 0 else 0.0
+    print(f"Embedded {embedded} records in {elapsed:.1f}s ({rate:.1f} docs/sec); "
+          f"store holds {store.count} x {store.dim} vectors")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+# /ollama-ui/fake_ollama.py
+#!/usr/bin/env python3
+"""Deterministic stand-in for the Ollama HTTP API.
+
+Serves the subset of endpoints the UI, deploy.py and test_offline.py talk to,
+with configurable token rate, time-to-first-token, latency and failures, so
+the Next.js routes can be exercised and benchmarked without a real daemon.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from aiohttp import web
+
+FAKE_VERSION = "0.0.0-fake"
+# Expiry shown for models loaded with a negative keep_alive, which Ollama keeps loaded indefinitely
+FOREVER = datetime(9999, 1, 1, tzinfo=timezone.utc).timestamp()
+
+WORDS = (
+    "the model is running locally and answering your question with a short "
+    "reply about llamas offline inference tokens latency and friendly help"
+).split()
+
+@dataclass
+class FakeOllamaConfig:
+    """Knobs controlling the behaviour of the fake server."""
+    tokens_per_second: float = 50.0
+    ttft: float = 0.05
+    load_time: float = 0.0
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    drop_rate: float = 0.0
+    max_tokens: int = 64
+    embedding_dim: int = 384
+    pull_size: int = 50 * 1024 * 1024
+    pull_rate: float = 200 * 1024 * 1024
+    keep_alive: float = 300.0
+    seed: int = 0
+    models: list[str] = field(default_factory=lambda: ["llama3.2:1b"])
+
+def model_digest(name: str) -> str:
+    """Return a stable fake digest for a model name."""
+    return hashlib.sha256(name.encode()).hexdigest()
+
+def normalize_name(name: str) -> str:
+    """Append the implicit :latest tag the way Ollama does."""
+    return name if ":" in name else f"{name}:latest"
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+class FakeOllama:
+    """In-memory model registry plus request handlers."""
+
+    def __init__(self, config: FakeOllamaConfig):
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.models: dict[str, dict] = {}
+        self.loaded: dict[str, float] = {}
+        self.partial: dict[str, int] = {}
+        self.blobs: dict[str, int] = {}
+        self.requests_served = 0
+        for name in config.models:
+            self.add_model(name)
+
+    def add_model(self, name: str) -> dict:
+        name = normalize_name(name)
+        family = name.split(":")[0].split("/")[-1]
+        info = {
+            "name": name,
+            "model": name,
+            "modified_at": now_iso(),
+            "size": self.config.pull_size,
+            "digest": model_digest(name),
+            "details": {
+                "format": "gguf",
+                "family": family,
+                "families": [family],
+                "parameter_size": name.split(":")[1].upper() if ":" in name else "unknown",
+                "quantization_level": "Q4_K_M",
+            },
+        }
+        self.models[name] = info
+        return info
+
+    def find_model(self, name: Optional[str]) -> Optional[dict]:
+        if not name:
+            return None
+        return self.models.get(normalize_name(name))
+
+    async def inject_latency(self) -> None:
+        delay = self.config.latency
+        if self.config.jitter:
+            delay += self.rng.uniform(0, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def should_fail(self) -> bool:
+        return self.config.failure_rate > 0 and self.rng.random() < self.config.failure_rate
+
+    def load_model(self, name: str, keep_alive: Optional[float] = None) -> float:
+        """Mark a model as resident and return the simulated load time in seconds."""
+        cold = name not in self.loaded or self.loaded[name] < time.time()
+        ttl = self.config.keep_alive if keep_alive is None else keep_alive
+        if ttl == 0:
+            self.loaded.pop(name, None)
+        else:
+            self.loaded[name] = FOREVER if ttl < 0 else time.time() + ttl
+        return self.config.load_time if cold else 0.0
+
+    def reply_tokens(self, prompt: str, limit: Optional[int]) -> list[str]:
+        """Build a deterministic reply whose length depends on the prompt."""
+        seed = int(hashlib.sha256(prompt.encode()).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        count = self.config.max_tokens if limit is None or limit < 0 else min(limit, self.config.max_tokens)
+        return [("" if i == 0 else " ") + rng.choice(WORDS) for i in range(count)]
+
+    def embedding(self, prompt: str) -> list[float]:
+        seed = int(hashlib.sha256(prompt.encode()).hexdigest()[:8], 16)
+        rng = random.Random(seed)
+        vector = [rng.gauss(0, 1) for _ in range(self.config.embedding_dim)]
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    # Handlers
+
+    async def version(self, request: web.Request) -> web.Response:
+        await self.inject_latency()
+        return web.json_response({"version": FAKE_VERSION})
+
+    async def tags(self, request: web.Request) -> web.Response:
+        await self.inject_latency()
+        return web.json_response({"models": list(self.models.values())})
+
+    async def ps(self, request: web.Request) -> web.Response:
+        await self.inject_latency()
+        now = time.time()
+        running = []
+        for name, expires in list(self.loaded.items()):
+            if expires < now:
+                del self.loaded[name]
+                continue
+            info = self.models.get(name)
+            if not info:
+                continue
+            running.append({
+                **info,
+                "size_vram": info["size"],
+                "expires_at": datetime.fromtimestamp(expires, timezone.utc).isoformat().replace("+00:00", "Z"),
+            })
+        return web.json_response({"models": running})
+
+    async def delete(self, request: web.Request) -> web.Response:
+        await self.inject_latency()
+        body = await read_json(request)
+        name = body.get("name") or body.get("model")
+        model = self.find_model(name)
+        if not model:
+            return web.json_response({"error": f"model '{name}' not found"}, status=404)
+        del self.models[model["name"]]
+        self.loaded.pop(model["name"], None)
+        return web.Response(status=200)
+
+    async def embeddings(self, request: web.Request) -> web.Response:
+        await self.inject_latency()
+        body = await read_json(request)
+        model = self.find_model(body.get("model"))
+        if not model:
+            return not_found(body.get("model"))
+        if self.should_fail():
+            return web.json_response({"error": "injected failure"}, status=500)
+        delay = self.load_model(model["name"])
+        if delay:
+            await asyncio.sleep(delay)
+        return web.json_response({"embedding": self.embedding(body.get("prompt", ""))})
+
+    async def pull(self, request: web.Request) -> web.StreamResponse:
+        await self.inject_latency()
+        body = await read_json(request)
+        name = body.get("name") or body.get("model")
+        if not name:
+            return web.json_response({"error": "model is required"}, status=400)
+        stream = body.get("stream", True)
+        digest = "sha256:" + model_digest(normalize_name(name))
+        if not stream:
+            await asyncio.sleep(self.config.pull_size / self.config.pull_rate)
+            self.add_model(name)
+            return web.json_response({"status": "success"})
+
+        response = await start_ndjson(request)
+        await write_line(response, {"status": "pulling manifest"})
+        if self.should_fail():
+            await write_line(response, {"error": "injected failure: pull manifest: no route to host"})
+            return await finish(response)
+
+        total = self.config.pull_size
+        # Like Ollama, keep partial downloads so a retried pull resumes
+        completed = self.partial.get(normalize_name(name), 0)
+        step = max(total // 20, 1)
+        while completed < total:
+            chunk = min(step, total - completed)
+            await asyncio.sleep(chunk / self.config.pull_rate)
+            completed += chunk
+            self.partial[normalize_name(name)] = completed
+            await write_line(response, {"status": f"pulling {digest[7:19]}", "digest": digest,
+                                        "total": total, "completed": completed})
+            if self.config.drop_rate and self.rng.random() < self.config.drop_rate:
+                return drop(request, response)
+        for status in ("verifying sha256 digest", "writing manifest", "success"):
+            await write_line(response, {"status": status})
+        self.partial.pop(normalize_name(name), None)
+        self.add_model(name)
+        return await finish(response)
+
+    async def head_blob(self, request: web.Request) -> web.Response:
+        await self.inject_latency()
+        return web.Response(status=200 if request.match_info["digest"] in self.blobs else 404)
+
+    async def upload_blob(self, request: web.Request) -> web.Response:
+        """Hash the uploaded stream without keeping it; reject it if the digest does not match."""
+        await self.inject_latency()
+        expected = request.match_info["digest"]
+        digest = hashlib.sha256()
+        size = 0
+        async for chunk in request.content.iter_any():
+            digest.update(chunk)
+            size += len(chunk)
+        if f"sha256:{digest.hexdigest()}" != expected:
+            return web.json_response({"error": "digest mismatch"}, status=400)
+        self.blobs[expected] = size
+        return web.Response(status=201)
+
+    async def create(self, request: web.Request) -> web.StreamResponse:
+        """Register a model whose files were uploaded as blobs."""
+        await self.inject_latency()
+        body = await read_json(request)
+        name = body.get("model") or body.get("name")
+        if not name:
+            return web.json_response({"error": "model is required"}, status=400)
+        digests = list((body.get("files") or {}).values()) + list((body.get("adapters") or {}).values())
+        missing = [d for d in digests if d not in self.blobs]
+        if missing:
+            return web.json_response({"error": f"blob {missing[0]} not found"}, status=400)
+        if not digests and not body.get("from"):
+            return web.json_response({"error": "neither 'from' nor 'files' was specified"}, status=400)
+        info = self.add_model(name)
+        info["size"] = sum(self.blobs[d] for d in digests) or info["size"]
+        if not body.get("stream", True):
+            return web.json_response({"status": "success"})
+        response = await start_ndjson(request)
+        for status in ("parsing GGUF", "using existing layer", "writing manifest", "success"):
+            await write_line(response, {"status": status})
+        return await finish(response)
+
+    async def chat(self, request: web.Request) -> web.StreamResponse:
+        body = await read_json(request)
+        messages = body.get("messages") or []
+        prompt = "\n".join(str(m.get("content", "")) for m in messages if isinstance(m, dict))
+        return await self.infer(request, body, prompt, chat=True)
+
+    async def generate(self, request: web.Request) -> web.StreamResponse:
+        body = await read_json(request)
+        return await self.infer(request, body, str(body.get("prompt", "")), chat=False)
+
+    async def infer(self, request: web.Request, body: dict, prompt: str, chat: bool) -> web.StreamResponse:
+        """Shared implementation of /api/chat and /api/generate."""
+        started = time.perf_counter()
+        await self.inject_latency()
+        name = body.get("model")
+        model = self.find_model(name)
+        if not model:
+            return not_found(name)
+        if self.should_fail():
+            return web.json_response({"error": "injected failure"}, status=500)
+        self.requests_served += 1
+
+        keep_alive = parse_duration(body.get("keep_alive"))
+        load = self.load_model(model["name"], keep_alive)
+        if load:
+            await asyncio.sleep(load)
+
+        options = body.get("options") or {}
+        limit = options.get("num_predict", body.get("num_predict"))
+        # Ollama treats an empty generate prompt as a load-only request
+        tokens = [] if not chat and not prompt else self.reply_tokens(prompt, limit)
+        prompt_tokens = max(len(prompt.split()), 1)
+
+        def frame(content: str, done: bool) -> dict:
+            data = {"model": name, "created_at": now_iso(), "done": done}
+            if chat:
+                data["message"] = {"role": "assistant", "content": content}
+            else:
+                data["response"] = content
+            return data
+
+        def final_frame(eval_ns: int) -> dict:
+            data = frame("", True)
+            data.update({
+                "done_reason": "stop" if tokens else "load",
+                "total_duration": int((time.perf_counter() - started) * 1e9),
+                "load_duration": int(load * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(self.config.ttft * 1e9),
+                "eval_count": len(tokens),
+                "eval_duration": eval_ns,
+            })
+            return data
+
+        interval = 1.0 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+        if not body.get("stream", True):
+            await asyncio.sleep(self.config.ttft + interval * max(len(tokens) - 1, 0))
+            result = final_frame(int(interval * len(tokens) * 1e9))
+            if chat:
+                result["message"]["content"] = "".join(tokens)
+            else:
+                result["response"] = "".join(tokens)
+            return web.json_response(result)
+
+        response = await start_ndjson(request)
+        if tokens:
+            await asyncio.sleep(self.config.ttft)
+        eval_started = time.perf_counter()
+        for index, token in enumerate(tokens):
+            if index:
+                await asyncio.sleep(interval)
+            await write_line(response, frame(token, False))
+            if self.config.drop_rate and self.rng.random() < self.config.drop_rate:
+                return drop(request, response)
+        await write_line(response, final_frame(int((time.perf_counter() - eval_started) * 1e9)))
+        return await finish(response)
+
+def parse_duration(value) -> Optional[float]:
+    """Parse an Ollama keep_alive value ("5m", "30s", -1, 0) into seconds; any negative value becomes -1 (forever)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return -1.0 if value < 0 else float(value)
+    text = str(value).strip()
+    units = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    for suffix in ("ms", "s", "m", "h"):
+        if text.endswith(suffix):
+            try:
+                amount = float(text[:-len(suffix)])
+            except ValueError:
+                return None
+            return -1.0 if amount < 0 else amount * units[suffix]
+    try:
+        amount = float(text)
+    except ValueError:
+        return None
+    return -1.0 if amount < 0 else amount
+
+async def read_json(request: web.Request) -> dict:
+    try:
+        data = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def not_found(name: Optional[str]) -> web.Response:
+    return web.json_response({"error": f"model '{name}' not found, try pulling it first"}, status=404)
+
+async def start_ndjson(request: web.Request) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+    await response.prepare(request)
+    return response
+
+async def write_line(response: web.StreamResponse, data: dict) -> None:
+    await response.write(json.dumps(data).encode() + b"\n")
+
+async def finish(response: web.StreamResponse) -> web.StreamResponse:
+    await response.write_eof()
+    return response
+
+def drop(request: web.Request, response: web.StreamResponse) -> web.StreamResponse:
+    """Abort the connection mid-stream to simulate a network failure."""
+    if request.transport is not None:
+        request.transport.abort()
+    return response
+
+def create_app(config: FakeOllamaConfig) -> web.Application:
+    """Build the aiohttp application serving the fake API."""
+    fake = FakeOllama(config)
+    app = web.Application()
+    app["fake"] = fake
+    app.router.add_get("/", lambda request: web.Response(text="Ollama is running"))
+    app.router.add_get("/api/version", fake.version)
+    app.router.add_get("/api/tags", fake.tags)
+    app.router.add_get("/api/ps", fake.ps)
+    app.router.add_post("/api/pull", fake.pull)
+    app.router.add_post("/api/chat", fake.chat)
+    app.router.add_post("/api/generate", fake.generate)
+    app.router.add_post("/api/embeddings", fake.embeddings)
+    app.router.add_delete("/api/delete", fake.delete)
+    app.router.add_head("/api/blobs/{digest}", fake.head_blob)
+    app.router.add_post("/api/blobs/{digest}", fake.upload_blob)
+    app.router.add_post("/api/create", fake.create)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server for tests and benchmarks")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind")
+    parser.add_argument("--port", type=int, default=11434, help="Port to listen on")
+    parser.add_argument("--models", default="llama3.2:1b",
+                        help="Comma-separated models reported as installed at startup")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0,
+                        help="Streaming rate for chat/generate tokens")
+    parser.add_argument("--ttft", type=float, default=0.05,
+                        help="Seconds before the first token of a reply")
+    parser.add_argument("--load-time", type=float, default=0.0,
+                        help="Seconds to simulate a cold model load")
+    parser.add_argument("--max-tokens", type=int, default=64,
+                        help="Upper bound on tokens per reply")
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="Fixed delay in seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0,
+                        help="Random extra delay in seconds (uniform, 0..jitter)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Probability (0-1) of returning an injected error")
+    parser.add_argument("--drop-rate", type=float, default=0.0,
+                        help="Per-chunk probability (0-1) of dropping a stream mid-way")
+    parser.add_argument("--embedding-dim", type=int, default=384,
+                        help="Length of returned embedding vectors")
+    parser.add_argument("--pull-size", type=int, default=50 * 1024 * 1024,
+                        help="Bytes reported for each pulled model")
+    parser.add_argument("--pull-rate", type=float, default=200 * 1024 * 1024,
+                        help="Simulated pull bandwidth in bytes per second")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for latency and failure injection")
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        tokens_per_second=args.tokens_per_second,
+        ttft=args.ttft,
+        load_time=args.load_time,
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        drop_rate=args.drop_rate,
+        max_tokens=args.max_tokens,
+        embedding_dim=args.embedding_dim,
+        pull_size=args.pull_size,
+        pull_rate=args.pull_rate,
+        seed=args.seed,
+        models=[m for m in args.models.split(",") if m],
+    )
+    print(f"Fake Ollama listening on http://{args.host}:{args.port}")
+    web.run_app(create_app(config), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# /ollama-ui/fault_proxy.py
+#!/usr/bin/env python3
+"""Fault-injecting TCP proxy for testing the UI against slow or flaky links.
+
+Sits between the UI (or a test) and Ollama and forwards bytes in both
+directions while injecting latency, jitter, bandwidth caps, mid-stream
+connection drops and full partitions. Faults can be changed at runtime:
+from Python through `start_background()`, over HTTP on a control port, or
+from a schedule of timed phases. No root access or interface changes needed.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass, fields, replace
+from typing import Optional
+
+from aiohttp import web
+
+CHUNK_SIZE = 16 * 1024
+
+@dataclass
+class FaultProfile:
+    """Faults applied to every proxied connection."""
+    latency: float = 0.0       # seconds added to each chunk, in each direction
+    jitter: float = 0.0        # extra random delay, 0..jitter seconds
+    bandwidth: float = 0.0     # bytes/sec per direction and connection, 0 for unlimited
+    drop_rate: float = 0.0     # probability per chunk of resetting the connection
+    partition: bool = False    # no traffic gets through while set
+    partition_mode: str = "reset"  # "reset" closes connections, "blackhole" stalls them
+
+    def update(self, **changes) -> "FaultProfile":
+        known = {f.name for f in fields(self)}
+        unknown = set(changes) - known
+        if unknown:
+            raise ValueError(f"unknown fault settings: {', '.join(sorted(unknown))}")
+        if changes.get("partition_mode", self.partition_mode) not in ("reset", "blackhole"):
+            raise ValueError("partition_mode must be 'reset' or 'blackhole'")
+        return replace(self, **changes)
+
+@dataclass
+class Phase:
+    """Fault settings applied `at` seconds after the schedule starts."""
+    at: float
+    profile: FaultProfile
+    name: str = ""
+
+def load_schedule(path: str) -> list[Phase]:
+    """Read a JSON list of {"at": seconds, "name": ..., <fault settings>} phases.
+
+    Each phase starts from a clean profile, so settings do not carry over.
+    """
+    with open(path) as f:
+        raw = json.load(f)
+    phases = []
+    for item in raw:
+        item = dict(item)
+        at = float(item.pop("at"))
+        name = item.pop("name", "")
+        phases.append(Phase(at, FaultProfile().update(**item), name))
+    return sorted(phases, key=lambda p: p.at)
+
+class Connection:
+    """One proxied client connection."""
+
+    def __init__(self, client: asyncio.StreamWriter):
+        self.client = client
+        self.upstream: Optional[asyncio.StreamWriter] = None
+
+    def abort(self):
+        for writer in (self.client, self.upstream):
+            if writer is not None:
+                writer.transport.abort()
+
+class FaultProxy:
+    """asyncio TCP proxy applying a mutable FaultProfile."""
+
+    def __init__(self, listen_host: str, listen_port: int, target_host: str, target_port: int,
+                 profile: Optional[FaultProfile] = None, seed: Optional[int] = None):
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.target_host = target_host
+        self.target_port = target_port
+        self.profile = profile or FaultProfile()
+        self.rng = random.Random(seed)
+        self.connections: set[Connection] = set()
+        self.handlers: set[asyncio.Task] = set()
+        self.healed = asyncio.Event()
+        self.healed.set()
+        self.phase = ""
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.stats = {"connections": 0, "refused": 0, "dropped": 0, "reset_by_partition": 0,
+                      "bytes_up": 0, "bytes_down": 0}
+
+    def configure(self, profile: FaultProfile, phase: str = ""):
+        """Switch to a new profile, applying partition changes to live connections."""
+        self.profile = profile
+        self.phase = phase
+        if profile.partition:
+            self.healed.clear()
+            if profile.partition_mode == "reset":
+                for connection in list(self.connections):
+                    connection.abort()
+                    self.stats["reset_by_partition"] += 1
+        else:
+            self.healed.set()
+        print(f"Faults{f' ({phase})' if phase else ''}: {describe(profile)}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self.handlers.add(task)
+        task.add_done_callback(self.handlers.discard)
+        connection = Connection(writer)
+        if self.profile.partition:
+            if self.profile.partition_mode == "reset":
+                self.stats["refused"] += 1
+                writer.transport.abort()
+                return
+            await self.healed.wait()
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection(self.target_host, self.target_port)
+        except OSError:
+            self.stats["refused"] += 1
+            writer.transport.abort()
+            return
+        connection.upstream = upstream_writer
+        self.connections.add(connection)
+        self.stats["connections"] += 1
+        try:
+            await asyncio.gather(self.pipe(reader, upstream_writer, connection, "bytes_up"),
+                                 self.pipe(upstream_reader, writer, connection, "bytes_down"))
+        finally:
+            self.connections.discard(connection)
+            upstream_writer.close()
+            writer.close()
+
+    async def pipe(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                   connection: Connection, counter: str):
+        """Forward one direction, delaying each chunk without reordering or serialising the delays."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=256)
+
+        async def receive():
+            try:
+                while data := await reader.read(CHUNK_SIZE):
+                    await queue.put((time.monotonic(), data))
+            except (ConnectionError, OSError):
+                pass
+            await queue.put((time.monotonic(), None))
+
+        receiver = asyncio.create_task(receive())
+        try:
+            while True:
+                arrived, data = await queue.get()
+                if data is None:
+                    if writer.can_write_eof():
+                        writer.write_eof()
+                    return
+                profile = self.profile
+                if profile.partition:
+                    # Blackhole: hold the data until the partition heals
+                    await self.healed.wait()
+                    profile = self.profile
+                delay = arrived + profile.latency + self.rng.uniform(0, profile.jitter) - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if profile.drop_rate and self.rng.random() < profile.drop_rate:
+                    self.stats["dropped"] += 1
+                    connection.abort()
+                    return
+                writer.write(data)
+                await writer.drain()
+                self.stats[counter] += len(data)
+                if profile.bandwidth:
+                    await asyncio.sleep(len(data) / profile.bandwidth)
+        except (ConnectionError, OSError, RuntimeError):
+            connection.abort()
+        finally:
+            receiver.cancel()
+
+    async def run_schedule(self, phases: list[Phase], loop_schedule: bool = False):
+        while True:
+            started = time.monotonic()
+            for phase in phases:
+                await asyncio.sleep(max(0.0, started + phase.at - time.monotonic()))
+                self.configure(phase.profile, phase.name or f"t+{phase.at:g}s")
+            if not loop_schedule:
+                return
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.listen_host, self.listen_port)
+        print(f"Fault proxy {self.listen_host}:{self.listen_port} -> {self.target_host}:{self.target_port}")
+
+    async def stop(self):
+        if self.server is not None:
+            self.server.close()
+        for connection in list(self.connections):
+            connection.abort()
+        # Aborted connections end their handlers on the next loop iterations
+        if self.handlers:
+            await asyncio.wait(list(self.handlers), timeout=1.0)
+
+    def snapshot(self) -> dict:
+        return {"phase": self.phase, "profile": asdict(self.profile),
+                "active_connections": len(self.connections), **self.stats}
+
+def describe(profile: FaultProfile) -> str:
+    if profile.partition:
+        return f"partitioned ({profile.partition_mode})"
+    parts = []
+    if profile.latency or profile.jitter:
+        parts.append(f"latency {profile.latency * 1000:.0f}ms +0-{profile.jitter * 1000:.0f}ms")
+    if profile.bandwidth:
+        parts.append(f"bandwidth {profile.bandwidth / 1024:.0f} KB/s")
+    if profile.drop_rate:
+        parts.append(f"drop rate {profile.drop_rate:.1%}")
+    return ", ".join(parts) or "none"
+
+def create_control_app(proxy: FaultProxy) -> web.Application:
+    """HTTP control API: GET /faults for state and stats, POST /faults to change settings."""
+    async def get_faults(request: web.Request) -> web.Response:
+        return web.json_response(proxy.snapshot())
+
+    async def post_faults(request: web.Request) -> web.Response:
+        try:
+            changes = await request.json()
+            name = changes.pop("name", "")
+            profile = FaultProfile() if changes.pop("reset", False) else proxy.profile
+            proxy.configure(profile.update(**changes), name)
+        except (ValueError, TypeError) as e:
+            return web.json_response({"error": str(e)}, status=400)
+        return web.json_response(proxy.snapshot())
+
+    app = web.Application()
+    app.router.add_get("/faults", get_faults)
+    app.router.add_post("/faults", post_faults)
+    return app
+
+class BackgroundProxy:
+    """A FaultProxy running on its own event loop thread, controllable from synchronous code."""
+
+    def __init__(self, proxy: FaultProxy):
+        self.proxy = proxy
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def start(self) -> "BackgroundProxy":
+        self.thread.start()
+        self._call(self.proxy.start())
+        return self
+
+    def configure(self, reset: bool = True, **changes):
+        """Apply fault settings; by default starting from a clean profile."""
+        base = FaultProfile() if reset else self.proxy.profile
+        profile = base.update(**changes)
+
+        async def apply():
+            self.proxy.configure(profile)
+        self._call(apply())
+
+    def stats(self) -> dict:
+        async def snapshot():
+            return self.proxy.snapshot()
+        return self._call(snapshot())
+
+    def stop(self):
+        self._call(self.proxy.stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+def start_background(listen_port: int, target_port: int, listen_host: str = "127.0.0.1",
+                     target_host: str = "127.0.0.1", seed: Optional[int] = None) -> BackgroundProxy:
+    """Start a proxy in a background thread, e.g. from test_offline.py."""
+    return BackgroundProxy(FaultProxy(listen_host, listen_port, target_host, target_port, seed=seed)).start()
+
+def parse_target(value: str) -> tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+async def serve(args: argparse.Namespace):
+    target_host, target_port = parse_target(args.target)
+    profile = FaultProfile(latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth,
+                           drop_rate=args.drop_rate)
+    proxy = FaultProxy(args.host, args.port, target_host, target_port, profile, args.seed)
+    await proxy.start()
+    runner = None
+    if args.control_port:
+        runner = web.AppRunner(create_control_app(proxy))
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", args.control_port).start()
+        print(f"Fault control API at http://127.0.0.1:{args.control_port}/faults")
+    try:
+        if args.schedule:
+            await proxy.run_schedule(load_schedule(args.schedule), args.loop)
+        await asyncio.Event().wait()
+    finally:
+        await proxy.stop()
+        if runner:
+            await runner.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description="TCP proxy injecting latency, bandwidth limits, drops and partitions")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=11439, help="Port to listen on")
+    parser.add_argument("--target", default="127.0.0.1:11434", help="host:port to forward to")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds of delay per chunk and direction")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay of up to this many seconds")
+    parser.add_argument("--bandwidth", type=float, default=0.0, help="Bytes/sec per direction and connection")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Probability per chunk of resetting the connection")
+    parser.add_argument("--schedule", help="JSON list of timed fault phases")
+    parser.add_argument("--loop", action="store_true", help="Repeat the schedule forever")
+    parser.add_argument("--control-port", type=int, help="Serve GET/POST /faults on this port")
+    parser.add_argument("--seed", type=int, help="Random seed for jitter and drops")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
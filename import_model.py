@@ -0,0 +1,365 @@
+# /ollama-ui/import_model.py
+#!/usr/bin/env python3
+"""Import local GGUF models into one or more Ollama hosts.
+
+Every file a Modelfile references (FROM and ADAPTER paths) is hashed once
+over a memory-mapped view, with files hashed in parallel. Digests are cached
+by path, size and mtime, so re-imports skip the read entirely. Each host is
+asked `HEAD /api/blobs/sha256:<digest>` first, and only missing blobs are
+streamed to it, with bounded parallelism across files and hosts. The model
+is then created from the uploaded blobs with `/api/create`.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+
+HASH_CHUNK = 8 * 1024 * 1024
+UPLOAD_CHUNK = 1024 * 1024
+DIGEST_CACHE = os.path.join(os.path.expanduser("~"), ".cache", "ollama-ui", "digests.json")
+# Modelfile commands whose argument may be a local file to upload
+FILE_COMMANDS = ("FROM", "ADAPTER")
+
+@dataclass
+class Blob:
+    """A local file referenced by a Modelfile."""
+    path: str
+    size: int
+    digest: Optional[str] = None
+    cached: bool = False
+    hash_seconds: float = 0.0
+
+@dataclass
+class ModelImport:
+    """A model to create and the files it needs."""
+    name: str
+    directory: str
+    commands: list[tuple[str, str]]
+    blobs: dict[str, Blob] = field(default_factory=dict)
+    results: dict[str, str] = field(default_factory=dict)
+
+@dataclass
+class Transfer:
+    """Totals for one phase of the import, measured over its wall-clock span."""
+    bytes: int = 0
+    files: int = 0
+    skipped: int = 0
+    first: Optional[float] = None
+    last: Optional[float] = None
+
+    def record(self, started: float, size: int):
+        self.bytes += size
+        self.files += 1
+        self.first = started if self.first is None else min(self.first, started)
+        self.last = max(self.last or 0.0, time.monotonic())
+
+    @property
+    def seconds(self) -> float:
+        return (self.last - self.first) if self.first is not None else 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.bytes / self.seconds if self.seconds > 0 else 0.0
+
+def parse_modelfile(text: str) -> list[tuple[str, str]]:
+    """Split a Modelfile into (COMMAND, argument) pairs, joining triple-quoted values."""
+    commands = []
+    lines = iter(text.splitlines())
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        command, _, argument = stripped.partition(" ")
+        argument = argument.strip()
+        if argument.startswith('"""'):
+            body = argument[3:]
+            while not body.endswith('"""'):
+                try:
+                    body += "\n" + next(lines)
+                except StopIteration:
+                    raise ValueError(f"unterminated \"\"\" in {command}")
+            argument = body[:-3]
+        commands.append((command.upper(), argument))
+    return commands
+
+def load_model(name: str, path: str) -> ModelImport:
+    """Read a Modelfile, or treat a .gguf path as `FROM <path>`."""
+    if path.endswith(".gguf"):
+        commands = [("FROM", os.path.basename(path))]
+    else:
+        with open(path) as f:
+            commands = parse_modelfile(f.read())
+    model = ModelImport(name, os.path.dirname(os.path.abspath(path)), commands)
+    for command, argument in commands:
+        if command in FILE_COMMANDS:
+            local = os.path.normpath(os.path.join(model.directory, os.path.expanduser(argument)))
+            if os.path.isfile(local):
+                model.blobs[argument] = Blob(local, os.path.getsize(local))
+            elif command == "ADAPTER":
+                raise FileNotFoundError(f"adapter not found: {local}")
+    return model
+
+def sha256_file(path: str) -> str:
+    """Hash a file through mmap, feeding slices of the mapping to hashlib without copying."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return f"sha256:{digest.hexdigest()}"
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, len(view), HASH_CHUNK):
+                    # hashlib releases the GIL for large buffers, so files hash in parallel
+                    digest.update(view[offset:offset + HASH_CHUNK])
+            finally:
+                view.release()
+    return f"sha256:{digest.hexdigest()}"
+
+class DigestCache:
+    """Digests keyed by absolute path, valid while size and mtime are unchanged."""
+
+    def __init__(self, path: Optional[str] = DIGEST_CACHE):
+        self.path = path
+        self.entries: dict[str, dict] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    def get(self, blob: Blob) -> Optional[str]:
+        entry = self.entries.get(blob.path)
+        stat = os.stat(blob.path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["digest"]
+        return None
+
+    def put(self, blob: Blob):
+        stat = os.stat(blob.path)
+        self.entries[blob.path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": blob.digest}
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, "w") as f:
+            json.dump(self.entries, f, indent=1)
+
+def hash_blobs(blobs: list[Blob], cache: DigestCache, workers: int) -> Transfer:
+    """Fill in every blob's digest, hashing uncached files in parallel threads."""
+    transfer = Transfer()
+    pending = []
+    for blob in blobs:
+        blob.digest = cache.get(blob)
+        if blob.digest:
+            blob.cached = True
+            transfer.skipped += 1
+        else:
+            pending.append(blob)
+
+    def work(blob: Blob):
+        started = time.monotonic()
+        blob.digest = sha256_file(blob.path)
+        blob.hash_seconds = time.monotonic() - started
+        transfer.record(started, blob.size)
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        list(pool.map(work, pending))
+    for blob in pending:
+        cache.put(blob)
+    return transfer
+
+async def file_chunks(path: str, transfer_bytes: list[int]):
+    """Stream a file in chunks read off the event loop."""
+    loop = asyncio.get_running_loop()
+    with open(path, "rb") as f:
+        while chunk := await loop.run_in_executor(None, f.read, UPLOAD_CHUNK):
+            transfer_bytes[0] += len(chunk)
+            yield chunk
+
+async def blob_exists(session: aiohttp.ClientSession, host: str, digest: str) -> bool:
+    async with session.head(f"{host}/api/blobs/{digest}") as response:
+        if response.status not in (200, 404):
+            response.raise_for_status()
+        return response.status == 200
+
+async def upload_blob(session: aiohttp.ClientSession, host: str, blob: Blob, transfer: Transfer,
+                      semaphore: asyncio.Semaphore):
+    """Upload one blob to one host unless the host already has it."""
+    name = os.path.basename(blob.path)
+    async with semaphore:
+        try:
+            if await blob_exists(session, host, blob.digest):
+                transfer.skipped += 1
+                return
+            started = time.monotonic()
+            sent = [0]
+            async with session.post(f"{host}/api/blobs/{blob.digest}", data=file_chunks(blob.path, sent),
+                                    headers={"Content-Length": str(blob.size)}) as response:
+                if response.status >= 400:
+                    print(f"{host}: upload of {name} failed: HTTP {response.status} "
+                          f"{(await response.text()).strip()}")
+                    return
+            transfer.record(started, sent[0])
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            # The create on this host then reports the missing blob
+            print(f"{host}: upload of {name} failed: {str(e) or type(e).__name__}")
+
+def coerce(value: str):
+    for kind in (int, float):
+        try:
+            return kind(value)
+        except ValueError:
+            pass
+    if value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value.strip('"')
+
+def create_request(model: ModelImport) -> dict:
+    """Build the /api/create body with blob digests in place of local paths.
+
+    Both forms are sent: `modelfile` for servers that still parse Modelfiles,
+    and the structured `files`/`adapters`/`parameters` fields for newer ones.
+    """
+    body: dict = {"model": model.name, "name": model.name, "stream": True}
+    lines = []
+    parameters: dict = {}
+    for command, argument in model.commands:
+        blob = model.blobs.get(argument) if command in FILE_COMMANDS else None
+        if blob is not None:
+            key = "files" if command == "FROM" else "adapters"
+            body.setdefault(key, {})[os.path.basename(blob.path)] = blob.digest
+            lines.append(f"{command} @{blob.digest}")
+            continue
+        if command == "FROM":
+            body["from"] = argument
+        elif command == "PARAMETER":
+            key, _, value = argument.partition(" ")
+            value = coerce(value.strip())
+            if key == "stop":
+                parameters.setdefault("stop", []).append(value)
+            else:
+                parameters[key] = value
+        elif command in ("TEMPLATE", "SYSTEM"):
+            body[command.lower()] = argument
+        elif command == "LICENSE":
+            body.setdefault("license", []).append(argument)
+        elif command == "MESSAGE":
+            role, _, content = argument.partition(" ")
+            body.setdefault("messages", []).append({"role": role, "content": content})
+        lines.append(f'{command} """{argument}"""' if "\n" in argument else f"{command} {argument}")
+    if parameters:
+        body["parameters"] = parameters
+    body["modelfile"] = "\n".join(lines) + "\n"
+    return body
+
+async def create_model(session: aiohttp.ClientSession, host: str, model: ModelImport) -> str:
+    """Create the model on one host; return "success" or the error."""
+    async with session.post(f"{host}/api/create", json=create_request(model)) as response:
+        if response.status != 200:
+            return f"HTTP {response.status}: {(await response.text()).strip()}"
+        status = "stream ended before success"
+        async for line in response.content:
+            if not line.strip():
+                continue
+            try:
+                update = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if update.get("error"):
+                return update["error"]
+            if update.get("status") == "success":
+                status = "success"
+        return status
+
+async def import_models(models: list[ModelImport], hosts: list[str], concurrency: int = 4,
+                        cache: Optional[DigestCache] = None) -> tuple[Transfer, Transfer]:
+    """Hash, upload and create every model on every host; return (hash, upload) totals."""
+    cache = cache or DigestCache(None)
+    # The same file may back several models; hash and upload it once
+    unique = {blob.path: blob for model in models for blob in model.blobs.values()}
+    for model in models:
+        model.blobs = {argument: unique[blob.path] for argument, blob in model.blobs.items()}
+    blobs = list(unique.values())
+    hashing = await asyncio.to_thread(hash_blobs, blobs, cache, concurrency)
+    cache.save()
+
+    uploading = Transfer()
+    semaphore = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=600)
+    async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=concurrency + 1)) as session:
+        await asyncio.gather(*(upload_blob(session, host, blob, uploading, semaphore)
+                               for host in hosts for blob in blobs))
+
+        async def create(model: ModelImport, host: str):
+            try:
+                model.results[host] = await create_model(session, host, model)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                model.results[host] = str(e) or type(e).__name__
+
+        await asyncio.gather(*(create(model, host) for model in models for host in hosts))
+    return hashing, uploading
+
+def format_bytes(count: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024:
+            return f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} TB"
+
+def print_transfer(label: str, transfer: Transfer, skipped_label: str):
+    print(f"{label:<8}{format_bytes(transfer.bytes):>12} in {transfer.files} files, {transfer.seconds:.2f}s "
+          f"({format_bytes(transfer.rate)}/s), {transfer.skipped} {skipped_label}")
+
+def parse_model(value: str) -> tuple[str, str]:
+    name, _, path = value.partition("=")
+    if not path:
+        raise argparse.ArgumentTypeError(f"expected NAME=PATH, got {value!r}")
+    return name, path
+
+def main():
+    parser = argparse.ArgumentParser(description="Import local GGUF models into Ollama hosts via blob uploads")
+    parser.add_argument("models", nargs="+", type=parse_model,
+                        help="NAME=PATH, where PATH is a Modelfile or a .gguf file")
+    parser.add_argument("--host", action="append",
+                        help="Ollama host, repeat for several (default: $OLLAMA_API_HOST or localhost:11434)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Files hashed and uploads in flight at once")
+    parser.add_argument("--digest-cache", default=DIGEST_CACHE, help="JSON file of known digests")
+    parser.add_argument("--no-digest-cache", action="store_true", help="Always re-hash every file")
+    args = parser.parse_args()
+
+    hosts = [h.rstrip("/") for h in args.host or [os.environ.get("OLLAMA_API_HOST", "http://localhost:11434")]]
+    try:
+        models = [load_model(name, path) for name, path in args.models]
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    cache = DigestCache(None if args.no_digest_cache else args.digest_cache)
+
+    hashing, uploading = asyncio.run(import_models(models, hosts, args.concurrency, cache))
+    print()
+    print_transfer("hash", hashing, "cached")
+    print_transfer("upload", uploading, "already on host")
+    failed = False
+    print(f"\n{'model':<32}{'host':<32}result")
+    for model in models:
+        for host in hosts:
+            result = model.results.get(host, "not attempted")
+            failed |= result != "success"
+            print(f"{model.name:<32}{host:<32}{result}")
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+# /ollama-ui/load_balancer.py
+#!/usr/bin/env python3
+"""Model-affinity load balancer across several Ollama hosts.
+
+Each backend's /api/ps and /api/tags are polled, and every /api/chat,
+/api/generate and /api/embeddings request goes to a healthy host that
+already has the model loaded and the fewest streams in flight. When no host has the model loaded,
+the request goes to a host with the model installed and a free model slot,
+so each model is loaded on as few hosts as its traffic needs. Hosts that
+fail requests are ejected for a while; latency is tracked per backend.
+Pulls, deletes, creates and copies are applied to every healthy host.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+import numpy as np
+from aiohttp import web
+
+from ollama_proxy import client_session, forwarded_headers, relay
+
+ROUTED_PATHS = ("/api/chat", "/api/generate", "/api/embeddings", "/api/embed")
+# Applied to every healthy host so they keep the same models installed
+MODEL_CHANGING_PATHS = ("/api/pull", "/api/delete", "/api/create", "/api/copy")
+# Model changes that stream progress frames unless the body says "stream": false
+STREAMED_CHANGES = ("/api/pull", "/api/create")
+
+def normalize_name(name: str) -> str:
+    return name if ":" in name else f"{name}:latest"
+
+@dataclass
+class Backend:
+    """One Ollama host and what the balancer knows about it."""
+    url: str
+    healthy: bool = False
+    installed: set[str] = field(default_factory=set)
+    loaded: set[str] = field(default_factory=set)
+    inflight: int = 0
+    requests: int = 0
+    errors: int = 0
+    consecutive_failures: int = 0
+    ejections: int = 0
+    ejected_until: float = 0.0
+    ttft: deque = field(default_factory=lambda: deque(maxlen=1000))
+    durations: deque = field(default_factory=lambda: deque(maxlen=1000))
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and time.monotonic() >= self.ejected_until
+
+def latency_summary(samples: deque) -> dict:
+    if not samples:
+        return {"count": 0, "p50_ms": None, "p95_ms": None}
+    values = np.array(samples) * 1000
+    return {"count": len(values), "p50_ms": float(np.percentile(values, 50)),
+            "p95_ms": float(np.percentile(values, 95))}
+
+class LoadBalancer:
+    """aiohttp proxy that routes inference requests by model affinity."""
+
+    def __init__(self, hosts: list[str], max_loaded: int = 3, max_inflight: int = 4, poll_interval: float = 2.0,
+                 max_failures: int = 3, eject_seconds: float = 10.0):
+        self.backends = [Backend(host.rstrip("/")) for host in hosts]
+        self.max_loaded = max_loaded
+        self.max_inflight = max_inflight
+        self.poll_interval = poll_interval
+        self.max_failures = max_failures
+        self.eject_seconds = eject_seconds
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.poller: Optional[asyncio.Task] = None
+        self.decisions = {"loaded": 0, "free_slot": 0, "fallback": 0}
+
+    # Backend state
+
+    async def poll_backend(self, backend: Backend):
+        """Refresh one backend's installed and loaded models."""
+        try:
+            async with self.session.get(f"{backend.url}/api/tags", timeout=aiohttp.ClientTimeout(total=5)) as response:
+                response.raise_for_status()
+                tags = await response.json()
+            async with self.session.get(f"{backend.url}/api/ps", timeout=aiohttp.ClientTimeout(total=5)) as response:
+                response.raise_for_status()
+                ps = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            if backend.healthy:
+                print(f"{backend.url} unreachable: {e}")
+            backend.healthy = False
+            return
+        if not backend.healthy:
+            print(f"{backend.url} healthy")
+        backend.healthy = True
+        backend.installed = {normalize_name(m["name"]) for m in tags.get("models", [])}
+        backend.loaded = {normalize_name(m["name"]) for m in ps.get("models", [])}
+
+    async def poll_forever(self):
+        while True:
+            await asyncio.gather(*(self.poll_backend(b) for b in self.backends))
+            await asyncio.sleep(self.poll_interval)
+
+    def record_failure(self, backend: Backend, reason: str):
+        """Passively eject a backend after repeated failures, doubling the ejection each time."""
+        backend.errors += 1
+        backend.consecutive_failures += 1
+        if backend.consecutive_failures >= self.max_failures:
+            duration = self.eject_seconds * 2 ** min(backend.ejections, 5)
+            backend.ejected_until = time.monotonic() + duration
+            backend.ejections += 1
+            backend.consecutive_failures = 0
+            print(f"Ejecting {backend.url} for {duration:.0f}s: {reason}")
+
+    def pick_backend(self, model: str, exclude: set[str]) -> Optional[Backend]:
+        """Prefer hosts with the model loaded, then hosts with a free slot, then any installed host.
+
+        A model only spreads to another host once every host holding it has
+        `max_inflight` streams running.
+        """
+        candidates = [b for b in self.backends if b.available and b.url not in exclude]
+        if not candidates:
+            return None
+        loaded = [b for b in candidates if model in b.loaded]
+        idle = [b for b in loaded if b.inflight < self.max_inflight]
+        if idle:
+            self.decisions["loaded"] += 1
+            return min(idle, key=lambda b: b.inflight)
+        others = [b for b in candidates if b not in loaded]
+        installed = [b for b in others if model in b.installed] or others
+        free = [b for b in installed if len(b.loaded) < self.max_loaded]
+        if free:
+            self.decisions["free_slot"] += 1
+            choice = min(free, key=lambda b: (b.inflight, len(b.loaded)))
+            # Assume the load until the next poll so concurrent requests follow it to the same host
+            choice.loaded.add(model)
+            return choice
+        self.decisions["fallback"] += 1
+        return min(loaded or installed, key=lambda b: (b.inflight, len(b.loaded)))
+
+    # Request handling
+
+    async def handle_routed(self, request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        try:
+            model = json.loads(body).get("model")
+        except (ValueError, AttributeError):
+            return web.json_response({"error": "invalid request body"}, status=400)
+        if not isinstance(model, str):
+            return web.json_response({"error": "model must be a string"}, status=400)
+        model = normalize_name(model)
+
+        tried: set[str] = set()
+        while (backend := self.pick_backend(model, tried)) is not None:
+            tried.add(backend.url)
+            response = await self.forward(request, body, backend)
+            if response is not None:
+                return response
+        return web.json_response({"error": f"no healthy Ollama host available for {model}"}, status=503)
+
+    async def forward(self, request: web.Request, body: bytes, backend: Backend) -> Optional[web.StreamResponse]:
+        """Stream a request to one backend; return None if it failed before any bytes reached the client."""
+        backend.inflight += 1
+        backend.requests += 1
+        started = time.monotonic()
+        response: Optional[web.StreamResponse] = None
+        try:
+            async with self.session.request(request.method, f"{backend.url}{request.path_qs}",
+                                            data=body or None, headers=forwarded_headers(request)) as upstream:
+                if upstream.status >= 500:
+                    self.record_failure(backend, f"HTTP {upstream.status}")
+                    return None
+                first_chunk = True
+
+                def record_ttft(chunk: bytes):
+                    nonlocal first_chunk
+                    if first_chunk:
+                        backend.ttft.append(time.monotonic() - started)
+                        first_chunk = False
+
+                response, error = await relay(request, upstream, {"X-Ollama-Backend": backend.url}, record_ttft)
+                if error is not None:
+                    raise error
+                backend.durations.append(time.monotonic() - started)
+                backend.consecutive_failures = 0
+                return response
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.record_failure(backend, str(e) or type(e).__name__)
+            # Once bytes have reached the client the stream cannot be retried elsewhere
+            return response
+        finally:
+            backend.inflight -= 1
+
+    async def handle_tags(self, request: web.Request) -> web.Response:
+        """Merge installed models across healthy backends."""
+        models: dict[str, dict] = {}
+        for backend in self.backends:
+            if backend.available:
+                for name in await self.fetch_models(backend, "/api/tags"):
+                    models.setdefault(name["name"], name)
+        return web.json_response({"models": list(models.values())})
+
+    async def handle_ps(self, request: web.Request) -> web.Response:
+        """List loaded models across healthy backends, tagging each with its host."""
+        models = []
+        for backend in self.backends:
+            if backend.available:
+                models.extend({**m, "host": backend.url} for m in await self.fetch_models(backend, "/api/ps"))
+        return web.json_response({"models": models})
+
+    async def fetch_models(self, backend: Backend, path: str) -> list[dict]:
+        try:
+            async with self.session.get(f"{backend.url}{path}", timeout=aiohttp.ClientTimeout(total=5)) as response:
+                response.raise_for_status()
+                return (await response.json()).get("models", [])
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            self.record_failure(backend, str(e) or type(e).__name__)
+            return []
+
+    async def handle_model_change(self, request: web.Request) -> web.StreamResponse:
+        """Apply a pull, delete, create or copy to every healthy backend, then re-poll them."""
+        body = await request.read()
+        targets = [b for b in self.backends if b.available]
+        if not targets:
+            return web.json_response({"error": "no healthy Ollama host available"}, status=503)
+        try:
+            stream = request.path in STREAMED_CHANGES and json.loads(body or b"{}").get("stream", True) is not False
+        except (ValueError, AttributeError):
+            return web.json_response({"error": "invalid request body"}, status=400)
+        try:
+            if stream:
+                return await self.fan_out_stream(request, body, targets)
+            return await self.fan_out(request, body, targets)
+        finally:
+            await asyncio.gather(*(self.poll_backend(b) for b in targets))
+
+    async def fan_out(self, request: web.Request, body: bytes, targets: list[Backend]) -> web.Response:
+        """Send a request to every target and answer once all have replied."""
+
+        async def send(backend: Backend) -> tuple[int, bytes]:
+            try:
+                async with self.session.request(request.method, f"{backend.url}{request.path_qs}",
+                                                data=body or None, headers=forwarded_headers(request)) as upstream:
+                    return upstream.status, await upstream.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.record_failure(backend, str(e) or type(e).__name__)
+                return 502, json.dumps({"error": f"upstream unavailable: {e}"}).encode()
+
+        replies = dict(zip((b.url for b in targets), await asyncio.gather(*(send(b) for b in targets))))
+        succeeded = [url for url, (status, _) in replies.items() if status < 400]
+        # A model is often only installed on some hosts, so a 404 elsewhere is not a failed delete
+        failed = {url: reply for url, reply in replies.items()
+                  if reply[0] >= 400 and not (succeeded and request.path == "/api/delete" and reply[0] == 404)}
+        if not failed:
+            status, data = replies[succeeded[0]]
+            return web.Response(status=status, body=data, content_type="application/json")
+        return web.json_response({
+            "error": f"{request.path} failed on {len(failed)} of {len(targets)} hosts",
+            "hosts": {url: data.decode(errors="replace") for url, (_, data) in failed.items()},
+        }, status=next(iter(failed.values()))[0])
+
+    async def fan_out_stream(self, request: web.Request, body: bytes, targets: list[Backend]) -> web.StreamResponse:
+        """Merge every target's progress frames into one stream, each tagged with its host.
+
+        The hosts' own success frames are held back; one success frame (or an
+        error naming the hosts that failed) ends the stream once all are done.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def pump(backend: Backend):
+            error = None
+            try:
+                async with self.session.request(request.method, f"{backend.url}{request.path_qs}",
+                                                data=body or None, headers=forwarded_headers(request)) as upstream:
+                    async for line in upstream.content:
+                        try:
+                            frame = json.loads(line)
+                        except ValueError:
+                            continue
+                        if not isinstance(frame, dict):
+                            continue
+                        if frame.get("error") or upstream.status >= 400:
+                            error = frame.get("error") or f"HTTP {upstream.status}"
+                        elif frame.get("status") != "success":
+                            await queue.put({**frame, "host": backend.url})
+                    if upstream.status >= 400 and error is None:
+                        error = f"HTTP {upstream.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.record_failure(backend, str(e) or type(e).__name__)
+                error = str(e) or type(e).__name__
+            await queue.put((backend, error))
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        tasks = [asyncio.create_task(pump(b)) for b in targets]
+        errors: dict[str, str] = {}
+        try:
+            remaining = len(tasks)
+            while remaining:
+                item = await queue.get()
+                if isinstance(item, tuple):
+                    backend, error = item
+                    remaining -= 1
+                    if error:
+                        errors[backend.url] = error
+                    continue
+                await response.write(json.dumps(item).encode() + b"\n")
+        finally:
+            for task in tasks:
+                task.cancel()
+        if errors:
+            final = {"error": f"{request.path} failed on {len(errors)} of {len(targets)} hosts", "hosts": errors}
+        else:
+            final = {"status": "success"}
+        await response.write(json.dumps(final).encode() + b"\n")
+        await response.write_eof()
+        return response
+
+    async def handle_passthrough(self, request: web.Request) -> web.StreamResponse:
+        """Send anything else (version, show, ...) to the first available backend."""
+        body = await request.read()
+        for backend in self.backends:
+            if backend.available:
+                response = await self.forward(request, body, backend)
+                if response is not None:
+                    return response
+        return web.json_response({"error": "no healthy Ollama host available"}, status=503)
+
+    # Metrics
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        return {
+            "decisions": dict(self.decisions),
+            "backends": [{
+                "url": b.url,
+                "healthy": b.healthy,
+                "ejected_for": max(b.ejected_until - now, 0.0),
+                "inflight": b.inflight,
+                "requests": b.requests,
+                "errors": b.errors,
+                "ejections": b.ejections,
+                "loaded": sorted(b.loaded),
+                "installed": len(b.installed),
+                "ttft": latency_summary(b.ttft),
+                "duration": latency_summary(b.durations),
+            } for b in self.backends],
+        }
+
+    async def handle_status(self, request: web.Request) -> web.Response:
+        return web.json_response(self.status())
+
+    async def on_startup(self, app: web.Application):
+        self.session = client_session()
+        await asyncio.gather(*(self.poll_backend(b) for b in self.backends))
+        self.poller = asyncio.create_task(self.poll_forever())
+
+    async def on_cleanup(self, app: web.Application):
+        self.poller.cancel()
+        await self.session.close()
+
+def create_app(balancer: LoadBalancer) -> web.Application:
+    app = web.Application(client_max_size=1024 ** 3)
+    app.on_startup.append(balancer.on_startup)
+    app.on_cleanup.append(balancer.on_cleanup)
+    app.router.add_get("/balancer/status", balancer.handle_status)
+    app.router.add_get("/api/tags", balancer.handle_tags)
+    app.router.add_get("/api/ps", balancer.handle_ps)
+    for path in ROUTED_PATHS:
+        app.router.add_post(path, balancer.handle_routed)
+    for path in MODEL_CHANGING_PATHS:
+        app.router.add_route("*", path, balancer.handle_model_change)
+    app.router.add_route("*", "/{path:.*}", balancer.handle_passthrough)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Route Ollama requests across hosts by model affinity")
+    parser.add_argument("hosts", nargs="+", help="Ollama hosts, e.g. http://gpu1:11434 http://gpu2:11434")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="Address to listen on; the balancer carries the whole Ollama API, so keep it private")
+    parser.add_argument("--port", type=int, default=11437, help="Port to listen on")
+    parser.add_argument("--max-loaded", type=int, default=3,
+                        help="Models a host can keep loaded (match OLLAMA_MAX_LOADED_MODELS)")
+    parser.add_argument("--max-inflight", type=int, default=4,
+                        help="Streams per host before a model spreads to another host (match OLLAMA_NUM_PARALLEL)")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between /api/ps and /api/tags polls")
+    parser.add_argument("--max-failures", type=int, default=3, help="Consecutive failures before ejecting a host")
+    parser.add_argument("--eject-seconds", type=float, default=10.0, help="First ejection period, doubled on repeats")
+    args = parser.parse_args()
+
+    balancer = LoadBalancer(args.hosts, args.max_loaded, args.max_inflight, args.poll_interval, args.max_failures, args.eject_seconds)
+    print(f"Balancing {len(args.hosts)} Ollama hosts on http://{args.host}:{args.port}; "
+          f"status at /balancer/status")
+    web.run_app(create_app(balancer), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# /ollama-ui/load_test.py
+#!/usr/bin/env python3
+"""Concurrent load generator for the streaming chat route.
+
+Opens many simultaneous `/api/chat/stream` sessions and reports time to first
+byte, inter-chunk latency percentiles, per-stream token rate, aggregate
+throughput and error rate.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+
+from resource_profiler import ResourceProfiler, print_summary, summarize as summarize_resources
+from test_offline import MODEL_NAME, build_chat_payload
+
+@dataclass
+class StreamResult:
+    """Timings collected for a single streaming session."""
+    ok: bool
+    status: int = 0
+    error: Optional[str] = None
+    ttfb: Optional[float] = None
+    duration: float = 0.0
+    tokens: int = 0
+    bytes: int = 0
+    gaps: list[float] = field(default_factory=list)
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Token rate from the first to the last chunk of the stream."""
+        streaming_time = self.duration - (self.ttfb or 0.0)
+        if self.tokens < 2 or streaming_time <= 0:
+            return None
+        return (self.tokens - 1) / streaming_time
+
+def percentile(values: list[float], pct: float) -> Optional[float]:
+    """Return the pct-th percentile of values using linear interpolation."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def summarize(values: list[float]) -> dict:
+    """Return p50/p95/p99/mean/max for a list of samples."""
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values),
+        "max": max(values),
+    }
+
+def count_tokens(line: bytes) -> int:
+    """Count content-bearing frames in one NDJSON line of an Ollama stream."""
+    try:
+        frame = json.loads(line)
+    except json.JSONDecodeError:
+        return 0
+    if not isinstance(frame, dict) or frame.get("done"):
+        return 0
+    content = (frame.get("message") or {}).get("content") or frame.get("response")
+    return 1 if content else 0
+
+async def run_stream(session: aiohttp.ClientSession, url: str, payload: dict) -> StreamResult:
+    """Run one streaming chat session and record its timings."""
+    started = time.perf_counter()
+    result = StreamResult(ok=False)
+    try:
+        async with session.post(url, json=payload) as response:
+            result.status = response.status
+            if response.status != 200:
+                result.error = f"HTTP {response.status}"
+                await response.read()
+                return result
+            last = None
+            async for line in response.content:
+                now = time.perf_counter()
+                if last is None:
+                    result.ttfb = now - started
+                else:
+                    result.gaps.append(now - last)
+                last = now
+                result.bytes += len(line)
+                result.tokens += count_tokens(line)
+            result.ok = result.ttfb is not None
+            if not result.ok:
+                result.error = "empty stream"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        result.error = type(e).__name__ if not str(e) else str(e)
+    finally:
+        result.duration = time.perf_counter() - started
+    return result
+
+async def run_load(url: str, concurrency: int, sessions: int, payload: dict,
+                   timeout: float, ramp_up: float = 0.0) -> tuple[list[StreamResult], float]:
+    """Run `sessions` streams with at most `concurrency` in flight."""
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(index: int, session: aiohttp.ClientSession) -> StreamResult:
+        if ramp_up and index < concurrency:
+            await asyncio.sleep(ramp_up * index / concurrency)
+        async with semaphore:
+            return await run_stream(session, url, payload)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(worker(i, session) for i in range(sessions)))
+        wall = time.perf_counter() - started
+    return list(results), wall
+
+def build_report(results: list[StreamResult], wall: float, concurrency: int, url: str) -> dict:
+    """Aggregate per-stream results into a report dictionary."""
+    succeeded = [r for r in results if r.ok]
+    errors: dict[str, int] = {}
+    for r in results:
+        if not r.ok:
+            errors[r.error or "unknown"] = errors.get(r.error or "unknown", 0) + 1
+    total_tokens = sum(r.tokens for r in succeeded)
+    return {
+        "url": url,
+        "concurrency": concurrency,
+        "sessions": len(results),
+        "succeeded": len(succeeded),
+        "error_rate": (len(results) - len(succeeded)) / len(results) if results else 0.0,
+        "errors": errors,
+        "wall_time": wall,
+        "ttfb": summarize([r.ttfb for r in succeeded if r.ttfb is not None]),
+        "inter_chunk": summarize([gap for r in succeeded for gap in r.gaps]),
+        "stream_duration": summarize([r.duration for r in succeeded]),
+        "tokens_per_stream_second": summarize([r.tokens_per_second for r in succeeded
+                                               if r.tokens_per_second is not None]),
+        "total_tokens": total_tokens,
+        "aggregate_tokens_per_second": total_tokens / wall if wall > 0 else 0.0,
+        "total_bytes": sum(r.bytes for r in succeeded),
+    }
+
+def format_ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+def format_rate(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+def print_report(report: dict):
+    """Print a report as a console table."""
+    print(f"\nLoad test against {report['url']}")
+    print(f"Sessions: {report['sessions']}  Concurrency: {report['concurrency']}  "
+          f"Wall time: {report['wall_time']:.2f}s  Error rate: {report['error_rate'] * 100:.1f}%")
+    print(f"\n{'metric':<26}{'p50':>10}{'p95':>10}{'p99':>10}{'mean':>10}{'max':>10}")
+    print("-" * 76)
+    for label, key, fmt in (
+        ("time to first byte (ms)", "ttfb", format_ms),
+        ("inter-chunk (ms)", "inter_chunk", format_ms),
+        ("stream duration (ms)", "stream_duration", format_ms),
+        ("tokens/sec per stream", "tokens_per_stream_second", format_rate),
+    ):
+        stats = report[key]
+        print(f"{label:<26}" + "".join(f"{fmt(stats[p]):>10}" for p in ("p50", "p95", "p99", "mean", "max")))
+    print("-" * 76)
+    print(f"Aggregate throughput: {report['aggregate_tokens_per_second']:.1f} tokens/sec "
+          f"({report['total_tokens']} tokens)")
+    for error, count in report["errors"].items():
+        print(f"Error: {error} x{count}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the chat streaming route")
+    parser.add_argument("--url", default="http://localhost:3000", help="Base URL of the UI")
+    parser.add_argument("--route", default="/api/chat/stream", help="Route to load")
+    parser.add_argument("--model", default=MODEL_NAME, help="Model to chat with")
+    parser.add_argument("--prompt", default="Say hello", help="User message sent by every session")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent sessions")
+    parser.add_argument("--sessions", type=int, help="Total sessions (default: concurrency)")
+    parser.add_argument("--ramp-up", type=float, default=0.0,
+                        help="Seconds over which to start the first wave of sessions")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-session timeout in seconds")
+    parser.add_argument("--json", dest="json_path", help="Write the JSON report to this file ('-' for stdout)")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Sample UI and Ollama process resources during the run into this .npz/CSV file")
+    parser.add_argument("--profile-interval", type=float, default=0.5, help="Seconds between resource samples")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/") + args.route
+    sessions = args.sessions or args.concurrency
+    payload = build_chat_payload(args.prompt, args.model)
+
+    print(f"Starting {sessions} sessions against {url} with concurrency {args.concurrency}...")
+    profiler = ResourceProfiler(args.profile_interval).start() if args.profile else None
+    try:
+        results, wall = asyncio.run(run_load(url, args.concurrency, sessions, payload, args.timeout, args.ramp_up))
+    finally:
+        if profiler:
+            profiler.stop()
+    report = build_report(results, wall, args.concurrency, url)
+    print_report(report)
+    if profiler:
+        profiler.save(args.profile)
+        print_summary(summarize_resources(profiler.arrays()))
+
+    if args.json_path == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_path}")
+
+    if report["succeeded"] == 0:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
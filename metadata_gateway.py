@@ -0,0 +1,160 @@
+# /ollama-ui/metadata_gateway.py
+#!/usr/bin/env python3
+"""Coalescing gateway for Ollama's metadata endpoints.
+
+Identical in-flight GET /api/tags, /api/ps and /api/version requests share
+one upstream call and successful replies are served from a short TTL cache.
+Any pull, delete, copy or create that passes through invalidates the cache
+as soon as it finishes. Everything else is streamed through unchanged. Put
+it in front of whatever serves many metadata polls; ollama_proxy.py
+describes how it chains with the other sidecars.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+from ollama_proxy import UpstreamProxy, forwarded_headers, upstream_unavailable
+
+METADATA_ROUTES = ("/api/tags", "/api/ps", "/api/version")
+MODEL_CHANGING_ROUTES = ("/api/pull", "/api/delete", "/api/copy", "/api/create")
+
+@dataclass
+class Reply:
+    """An upstream reply to a metadata request."""
+    status: int
+    content_type: str
+    body: bytes
+    fetched_at: float
+
+class MetadataGateway(UpstreamProxy):
+    """aiohttp proxy that coalesces and briefly caches metadata GETs."""
+
+    def __init__(self, upstream: str, ttl: float = 2.0, ps_ttl: Optional[float] = None):
+        super().__init__(upstream)
+        self.ttls = {path: ttl for path in METADATA_ROUTES}
+        if ps_ttl is not None:
+            self.ttls["/api/ps"] = ps_ttl
+        self.cache: dict[str, Reply] = {}
+        self.inflight: dict[str, asyncio.Future] = {}
+        # Bumped on invalidation so fetches that started earlier are not cached
+        self.generation = 0
+        self.counts: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"requests": 0, "upstream_calls": 0, "cache_hits": 0, "coalesced": 0})
+        self.invalidations = 0
+        self.started = time.monotonic()
+
+    def invalidate(self, reason: str):
+        self.generation += 1
+        self.invalidations += 1
+        self.cache.clear()
+        # Fetches that started before the change may return the old list; later requests start their own
+        self.inflight.clear()
+        print(f"Metadata cache invalidated after {reason}")
+
+    async def fetch(self, key: str, headers: dict) -> Reply:
+        """Make the single upstream call for a metadata key."""
+        generation = self.generation
+        self.counts[key.split("?", 1)[0]]["upstream_calls"] += 1
+        async with self.session.get(f"{self.upstream}{key}", headers=headers) as response:
+            reply = Reply(response.status, response.headers.get("Content-Type", "application/json"),
+                          await response.read(), time.monotonic())
+        if reply.status == 200 and generation == self.generation:
+            self.cache[key] = reply
+        return reply
+
+    async def handle_metadata(self, request: web.Request) -> web.Response:
+        key = request.path_qs
+        counts = self.counts[request.path]
+        counts["requests"] += 1
+        reply = self.cache.get(key)
+        if reply is not None and time.monotonic() - reply.fetched_at < self.ttls[request.path]:
+            counts["cache_hits"] += 1
+            return self.respond(reply, "HIT")
+
+        future = self.inflight.get(key)
+        if future is not None:
+            counts["coalesced"] += 1
+            state = "COALESCED"
+        else:
+            future = asyncio.ensure_future(self.fetch(key, forwarded_headers(request, ("accept", "authorization"))))
+            self.inflight[key] = future
+            future.add_done_callback(lambda f: self.finish(key, f))
+            state = "MISS"
+        try:
+            # Shield so one client disconnecting does not cancel the call the others are waiting on
+            reply = await asyncio.shield(future)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return upstream_unavailable(e)
+        return self.respond(reply, state)
+
+    def finish(self, key: str, future: asyncio.Future):
+        if self.inflight.get(key) is future:
+            del self.inflight[key]
+        # Mark the error retrieved in case every waiting client has gone away
+        if not future.cancelled():
+            future.exception()
+
+    def respond(self, reply: Reply, state: str) -> web.Response:
+        age = time.monotonic() - reply.fetched_at
+        return web.Response(status=reply.status, body=reply.body,
+                            headers={"Content-Type": reply.content_type, "X-Cache": state, "Age": str(int(age))})
+
+    async def handle_passthrough(self, request: web.Request) -> web.StreamResponse:
+        """Stream any other request through, invalidating after model-changing ones."""
+        try:
+            return await super().handle_passthrough(request)
+        finally:
+            if request.path in MODEL_CHANGING_ROUTES and request.method != "GET":
+                self.invalidate(f"{request.method} {request.path}")
+
+    def stats(self) -> dict:
+        routes = {path: dict(counts) for path, counts in self.counts.items()}
+        requests = sum(c["requests"] for c in routes.values())
+        upstream_calls = sum(c["upstream_calls"] for c in routes.values())
+        return {
+            "uptime": time.monotonic() - self.started,
+            "routes": routes,
+            # Without the gateway every request would have been an upstream call
+            "upstream_calls_without_gateway": requests,
+            "upstream_calls": upstream_calls,
+            "calls_saved": requests - upstream_calls,
+            "reduction": 1 - upstream_calls / requests if requests else 0.0,
+            "invalidations": self.invalidations,
+            "inflight": len(self.inflight),
+        }
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+def create_app(gateway: MetadataGateway) -> web.Application:
+    app = web.Application(client_max_size=1024 ** 3)
+    app.on_startup.append(gateway.on_startup)
+    app.on_cleanup.append(gateway.on_cleanup)
+    app.router.add_get("/gateway/metrics", gateway.handle_stats)
+    for path in METADATA_ROUTES:
+        app.router.add_get(path, gateway.handle_metadata)
+    app.router.add_route("*", "/{path:.*}", gateway.handle_passthrough)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Coalescing, short-TTL cache for Ollama metadata endpoints")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=11436, help="Port to listen on")
+    parser.add_argument("--upstream", default="http://localhost:11434", help="Ollama host to forward to")
+    parser.add_argument("--ttl", type=float, default=2.0, help="Seconds a metadata reply stays fresh")
+    parser.add_argument("--ps-ttl", type=float, help="Separate TTL for /api/ps (default: --ttl)")
+    args = parser.parse_args()
+
+    gateway = MetadataGateway(args.upstream, args.ttl, args.ps_ttl)
+    print(f"Gateway for {args.upstream} on http://{args.host}:{args.port}; metrics at /gateway/metrics")
+    web.run_app(create_app(gateway), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+# /ollama-ui/metrics_exporter.py
+#!/usr/bin/env python3
+"""Prometheus/OpenMetrics exporter for Ollama inference traffic.
+
+Requests are streamed through unchanged while the exporter watches them:
+chat and generate streams feed histograms of time to first token, total
+latency and generation speed (from Ollama's `eval_count`/`eval_duration`)
+per model and route, pulls report their download progress, and `/api/ps` is polled for
+resident models and their RAM/VRAM size. The metrics are served at /metrics
+on a separate listener, so they can be scraped remotely while the proxy,
+which carries the whole Ollama API, stays on 127.0.0.1.
+
+Only the first chunk time and the final line of each stream are looked at,
+so the cost per request is a regex over the request body and one JSON parse.
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+from ollama_proxy import UpstreamProxy, relay, upstream_unavailable
+
+INFERENCE_ROUTES = ("/api/chat", "/api/generate")
+PULL_ROUTE = "/api/pull"
+MODEL_FIELD = re.compile(rb'"model"\s*:\s*"((?:[^"\\]|\\.)*)"')
+# Older clients name the model to pull with "name"
+NAME_FIELD = re.compile(rb'"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+STREAM_DISABLED = re.compile(rb'"stream"\s*:\s*false')
+
+TTFT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+TOKENS_PER_SECOND_BUCKETS = (1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 50.0, 75.0, 100.0, 150.0, 200.0, 500.0)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+class Histogram:
+    """Fixed-bucket histogram per label set; observe() is a bisect and two additions."""
+
+    def __init__(self, name: str, help_text: str, buckets: tuple, labels: tuple):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.labels = labels
+        self.series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float):
+        series = self.series.get(labels)
+        if series is None:
+            # Bucket counts (the last one is +Inf), then sum
+            series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def render(self, openmetrics: bool) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), series):
+                cumulative += count
+                le = f'le="{format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{format_labels(self.labels, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, labels)} {format_number(series[-1])}")
+        return lines
+
+class Family:
+    """A counter or gauge per label set."""
+
+    def __init__(self, name: str, kind: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.kind = kind
+        self.help = help_text
+        self.labels = labels
+        self.values: dict[tuple, float] = defaultdict(float)
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        self.values[labels] += amount
+
+    def set(self, labels: tuple, value: float):
+        self.values[labels] = value
+
+    def render(self, openmetrics: bool) -> list[str]:
+        # OpenMetrics names the counter family without the _total suffix its samples carry
+        family = self.name[:-len("_total")] if openmetrics and self.kind == "counter" else self.name
+        lines = [f"# HELP {family} {self.help}", f"# TYPE {family} {self.kind}"]
+        for labels, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{format_labels(self.labels, labels)} {format_number(value)}")
+        return lines
+
+class StreamTail:
+    """Keeps only the last complete line of a newline-delimited JSON stream."""
+
+    def __init__(self):
+        self.pending = b""
+        self.last = b""
+
+    def feed(self, chunk: bytes):
+        data = self.pending + chunk
+        cut = data.rfind(b"\n")
+        if cut == -1:
+            self.pending = data
+            return
+        self.pending = data[cut + 1:]
+        line = data[data.rfind(b"\n", 0, cut) + 1:cut]
+        if line.strip():
+            self.last = line
+
+    def final(self) -> Optional[dict]:
+        line = self.pending if self.pending.strip() else self.last
+        try:
+            frame = json.loads(line)
+        except ValueError:
+            return None
+        return frame if isinstance(frame, dict) else None
+
+class PullProgress:
+    """Download progress of one pull, summed over its layers."""
+
+    def __init__(self):
+        self.layers: dict[str, tuple[int, int]] = {}
+
+    def update(self, frame: dict):
+        if frame.get("digest") and frame.get("total"):
+            self.layers[frame["digest"]] = (frame["total"], frame.get("completed", 0))
+
+    @property
+    def total(self) -> int:
+        return sum(total for total, _ in self.layers.values())
+
+    @property
+    def completed(self) -> int:
+        return sum(completed for _, completed in self.layers.values())
+
+class MetricsExporter(UpstreamProxy):
+    """aiohttp proxy that passively measures Ollama traffic and serves /metrics."""
+
+    def __init__(self, upstream: str, ps_interval: float = 5.0):
+        super().__init__(upstream)
+        self.ps_interval = ps_interval
+        self.poller: Optional[asyncio.Task] = None
+        self.started = time.monotonic()
+
+        labels = ("model", "route")
+        self.ttft = Histogram("ollama_time_to_first_token_seconds",
+                              "Time from request to the first streamed chunk.", TTFT_BUCKETS, labels)
+        self.latency = Histogram("ollama_request_duration_seconds",
+                                 "Time from request to the end of the response.", LATENCY_BUCKETS, labels)
+        self.tokens_per_second = Histogram("ollama_eval_tokens_per_second",
+                                           "Generation speed reported by Ollama (eval_count / eval_duration).",
+                                           TOKENS_PER_SECOND_BUCKETS, labels)
+        self.requests = Family("ollama_requests_total", "counter", "Inference requests by status code.",
+                               ("model", "route", "code"))
+        self.prompt_tokens = Family("ollama_prompt_tokens_total", "counter", "Prompt tokens evaluated.", labels)
+        self.eval_tokens = Family("ollama_eval_tokens_total", "counter", "Tokens generated.", labels)
+        self.inflight = Family("ollama_inflight_requests", "gauge", "Inference requests currently streaming.",
+                               ("route",))
+        for route in INFERENCE_ROUTES:
+            self.inflight.set((route,), 0)
+        self.pulls: dict[str, PullProgress] = {}
+        self.up = Family("ollama_up", "gauge", "Whether the last /api/ps poll succeeded.")
+        self.loaded = Family("ollama_models_loaded", "gauge", "Models resident in Ollama.")
+        self.model_size = Family("ollama_model_size_bytes", "gauge", "Memory used by a resident model.", ("model",))
+        self.model_vram = Family("ollama_model_vram_bytes", "gauge", "VRAM used by a resident model.", ("model",))
+
+    async def handle_passthrough(self, request: web.Request) -> web.StreamResponse:
+        """Stream a request through, measuring inference and pull responses on the way."""
+        started = time.monotonic()
+        body = await request.read()
+        route = request.path if request.method == "POST" else None
+        model = ""
+        if route in INFERENCE_ROUTES or route == PULL_ROUTE:
+            match = MODEL_FIELD.search(body) or (NAME_FIELD.search(body) if route == PULL_ROUTE else None)
+            model = match.group(1).decode(errors="replace") if match else "unknown"
+        try:
+            upstream = await self.open_upstream(request, body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if route in INFERENCE_ROUTES:
+                self.requests.inc((model, route, "502"))
+            return upstream_unavailable(e)
+
+        async with upstream:
+            if route in INFERENCE_ROUTES:
+                return await self.relay_inference(request, upstream, model, route, started,
+                                                  stream=STREAM_DISABLED.search(body) is None)
+            if route == PULL_ROUTE:
+                return await self.relay_pull(request, upstream, model)
+            response, _ = await relay(request, upstream)
+            return response
+
+    async def relay_inference(self, request: web.Request, upstream: aiohttp.ClientResponse, model: str,
+                              route: str, started: float, stream: bool) -> web.StreamResponse:
+        labels = (model, route)
+        tail = StreamTail()
+        first_chunk: Optional[float] = None
+
+        def watch(chunk: bytes):
+            nonlocal first_chunk
+            if first_chunk is None:
+                first_chunk = time.monotonic()
+            tail.feed(chunk)
+
+        self.inflight.inc((route,))
+        try:
+            response, error = await relay(request, upstream, on_chunk=watch)
+        finally:
+            self.inflight.inc((route,), -1)
+            self.requests.inc((model, route, str(upstream.status)))
+        # A stream Ollama cut short has no final frame worth timing
+        if upstream.status != 200 or error is not None:
+            return response
+        self.latency.observe(labels, time.monotonic() - started)
+        if stream and first_chunk is not None:
+            self.ttft.observe(labels, first_chunk - started)
+        final = tail.final()
+        if final and final.get("done"):
+            self.prompt_tokens.inc(labels, final.get("prompt_eval_count", 0))
+            self.eval_tokens.inc(labels, final.get("eval_count", 0))
+            if final.get("eval_count") and final.get("eval_duration"):
+                self.tokens_per_second.observe(labels, final["eval_count"] / (final["eval_duration"] / 1e9))
+        return response
+
+    async def relay_pull(self, request: web.Request, upstream: aiohttp.ClientResponse,
+                         model: str) -> web.StreamResponse:
+        progress = self.pulls.setdefault(model, PullProgress())
+        pending = b""
+
+        def watch(chunk: bytes):
+            nonlocal pending
+            *lines, pending = (pending + chunk).split(b"\n")
+            for line in lines:
+                try:
+                    progress.update(json.loads(line))
+                except (ValueError, AttributeError):
+                    pass
+
+        try:
+            response, _ = await relay(request, upstream, on_chunk=watch)
+            return response
+        finally:
+            self.pulls.pop(model, None)
+
+    async def poll_ps(self):
+        """Refresh the resident model gauges from /api/ps."""
+        while True:
+            try:
+                async with self.session.get(f"{self.upstream}/api/ps",
+                                            timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    response.raise_for_status()
+                    models = (await response.json()).get("models", [])
+                self.update_residency(models)
+                self.up.set((), 1)
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                self.up.set((), 0)
+            await asyncio.sleep(self.ps_interval)
+
+    def update_residency(self, models: list[dict]):
+        self.loaded.set((), len(models))
+        # Unloaded models drop out of the gauges instead of keeping their last size
+        for family in (self.model_size, self.model_vram):
+            family.values.clear()
+        for model in models:
+            name = (model.get("name") or model.get("model") or "unknown",)
+            self.model_size.set(name, model.get("size", 0))
+            self.model_vram.set(name, model.get("size_vram", 0))
+
+    def render(self, openmetrics: bool = False) -> str:
+        pull_total = Family("ollama_pull_bytes", "gauge", "Bytes to download for an in-progress pull.", ("model",))
+        pull_completed = Family("ollama_pull_completed_bytes", "gauge", "Bytes downloaded for an in-progress pull.",
+                                ("model",))
+        for model, progress in self.pulls.items():
+            pull_total.set((model,), progress.total)
+            pull_completed.set((model,), progress.completed)
+        pulls = Family("ollama_pulls_in_progress", "gauge", "Pulls currently streaming.")
+        pulls.set((), len(self.pulls))
+        uptime = Family("ollama_exporter_uptime_seconds", "gauge", "Seconds since the exporter started.")
+        uptime.set((), time.monotonic() - self.started)
+
+        lines = []
+        for metric in (self.ttft, self.latency, self.tokens_per_second, self.requests, self.prompt_tokens,
+                       self.eval_tokens, self.inflight, pulls, pull_total, pull_completed, self.up, self.loaded,
+                       self.model_size, self.model_vram, uptime):
+            lines.extend(metric.render(openmetrics))
+        if openmetrics:
+            lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        openmetrics = "application/openmetrics-text" in request.headers.get("Accept", "")
+        return web.Response(body=self.render(openmetrics).encode(),
+                            headers={"Content-Type": OPENMETRICS_CONTENT_TYPE if openmetrics
+                                     else PROMETHEUS_CONTENT_TYPE})
+
+    async def on_startup(self, app: web.Application):
+        await super().on_startup(app)
+        self.poller = asyncio.create_task(self.poll_ps())
+
+    async def on_cleanup(self, app: web.Application):
+        self.poller.cancel()
+        await asyncio.wait([self.poller])
+        await super().on_cleanup(app)
+
+def create_app(exporter: MetricsExporter) -> web.Application:
+    """The proxy the UI talks to; it carries the whole Ollama API, so keep it on a private address."""
+    app = web.Application(client_max_size=1024 ** 3)
+    app.on_startup.append(exporter.on_startup)
+    app.on_cleanup.append(exporter.on_cleanup)
+    app.router.add_route("*", "/{path:.*}", exporter.handle_passthrough)
+    return app
+
+def create_metrics_app(exporter: MetricsExporter) -> web.Application:
+    """Only /metrics, safe to expose to a remote scraper."""
+    app = web.Application()
+    app.router.add_get("/metrics", exporter.handle_metrics)
+    return app
+
+async def start_sites(exporter: MetricsExporter, host: str, port: int, metrics_host: str,
+                      metrics_port: int) -> list[web.AppRunner]:
+    runners = []
+    for app, bind, bind_port in ((create_app(exporter), host, port),
+                                 (create_metrics_app(exporter), metrics_host, metrics_port)):
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, bind, bind_port).start()
+        runners.append(runner)
+    return runners
+
+class BackgroundExporter:
+    """An exporter served from its own event loop thread, e.g. by deploy.py."""
+
+    def __init__(self, exporter: MetricsExporter, host: str, port: int, metrics_host: str, metrics_port: int):
+        self.exporter = exporter
+        self.sites = (host, port, metrics_host, metrics_port)
+        self.runners: list[web.AppRunner] = []
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, name="metrics-exporter", daemon=True)
+
+    def _call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def start(self) -> "BackgroundExporter":
+        self.thread.start()
+        self.runners = self._call(start_sites(self.exporter, *self.sites))
+        return self
+
+    def stop(self):
+        for runner in reversed(self.runners):
+            self._call(runner.cleanup())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+def start_background(upstream: str, port: int, metrics_port: int, metrics_host: str = "127.0.0.1",
+                     ps_interval: float = 5.0) -> BackgroundExporter:
+    """Start an exporter in a background thread; the proxy always listens on 127.0.0.1."""
+    exporter = MetricsExporter(upstream, ps_interval)
+    return BackgroundExporter(exporter, "127.0.0.1", port, metrics_host, metrics_port).start()
+
+async def serve(args: argparse.Namespace):
+    runners = await start_sites(MetricsExporter(args.upstream, args.ps_interval), args.host, args.port,
+                                args.metrics_host, args.metrics_port)
+    print(f"Exporter for {args.upstream} on http://{args.host}:{args.port}; "
+          f"metrics at http://{args.metrics_host}:{args.metrics_port}/metrics")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        for runner in reversed(runners):
+            await runner.cleanup()
+
+def main():
+    parser = argparse.ArgumentParser(description="Passive Prometheus/OpenMetrics exporter proxy for Ollama")
+    parser.add_argument("--host", default="127.0.0.1", help="Address the Ollama proxy listens on")
+    parser.add_argument("--port", type=int, default=11441, help="Port the Ollama proxy listens on")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="Address serving /metrics; 0.0.0.0 exposes only the metrics, not the proxy")
+    parser.add_argument("--metrics-port", type=int, default=9464, help="Port serving /metrics")
+    parser.add_argument("--upstream", default="http://localhost:11434", help="Ollama host to forward to")
+    parser.add_argument("--ps-interval", type=float, default=5.0, help="Seconds between /api/ps polls")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# /ollama-ui/ollama_proxy.py
+"""Plumbing shared by the sidecars that sit in front of Ollama or the UI.
+
+response_cache.py, metadata_gateway.py, load_balancer.py, admission.py and
+metrics_exporter.py each answer a few routes themselves and stream the rest
+to a single upstream. traffic_capture.py does the same in front of the UI.
+This module holds the parts they have in common: the upstream client
+session, the request headers worth forwarding, and the streaming relay.
+
+Sidecars chain. Each one forwards to its `--upstream`, so point the UI's
+OLLAMA_API_HOST at the first sidecar and each sidecar's `--upstream` at the
+next one, ending at Ollama. See "Chaining Sidecars" in docs/benchmarking.md
+for a recommended order.
+"""
+
+import asyncio
+from typing import AsyncIterable, Callable, Optional
+
+import aiohttp
+from aiohttp import web
+
+# Request headers forwarded upstream; hop-by-hop and host headers are rebuilt by aiohttp
+FORWARDED_HEADERS = ("content-type", "accept", "authorization")
+
+def forwarded_headers(request: web.Request, names: tuple = FORWARDED_HEADERS) -> dict:
+    return {k: v for k, v in request.headers.items() if k.lower() in names}
+
+def client_session(**kwargs) -> aiohttp.ClientSession:
+    # No total timeout: generations and pulls stream for as long as they take
+    return aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=None, sock_connect=10), **kwargs)
+
+def upstream_unavailable(error: BaseException) -> web.Response:
+    return web.json_response({"error": f"upstream unavailable: {error}"}, status=502)
+
+async def relay(request: web.Request, upstream: aiohttp.ClientResponse, headers: Optional[dict] = None,
+                on_chunk: Optional[Callable[[bytes], None]] = None,
+                chunks: Optional[AsyncIterable[bytes]] = None) -> tuple[web.StreamResponse, Optional[Exception]]:
+    """Stream an upstream reply to the client.
+
+    `on_chunk` sees every chunk before it is written; `chunks` replaces the
+    default `iter_any()` (e.g. the line iterator for NDJSON). An upstream
+    failure mid-stream ends the response cleanly and is returned alongside it;
+    a client disconnect is raised as usual. X- headers set by a sidecar
+    further down the chain are kept.
+    """
+    passed = {k: v for k, v in upstream.headers.items() if k.lower().startswith("x-")}
+    response = web.StreamResponse(status=upstream.status, headers={
+        **passed, "Content-Type": upstream.headers.get("Content-Type", "application/json"), **(headers or {})})
+    await response.prepare(request)
+    iterator = (chunks if chunks is not None else upstream.content.iter_any()).__aiter__()
+    error = None
+    while True:
+        try:
+            chunk = await iterator.__anext__()
+        except StopAsyncIteration:
+            break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = e
+            break
+        if on_chunk is not None:
+            on_chunk(chunk)
+        await response.write(chunk)
+    await response.write_eof()
+    return response, error
+
+class UpstreamProxy:
+    """Base for a sidecar: owns the upstream session and streams unhandled requests through."""
+
+    def __init__(self, upstream: str):
+        self.upstream = upstream.rstrip("/")
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def open_upstream(self, request: web.Request, body: bytes,
+                            headers: Optional[dict] = None) -> aiohttp.ClientResponse:
+        return await self.session.request(request.method, f"{self.upstream}{request.path_qs}", data=body or None,
+                                          headers=forwarded_headers(request) if headers is None else headers)
+
+    async def handle_passthrough(self, request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        try:
+            upstream = await self.open_upstream(request, body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return upstream_unavailable(e)
+        async with upstream:
+            response, _ = await relay(request, upstream)
+            return response
+
+    async def on_startup(self, app: web.Application):
+        self.session = client_session()
+
+    async def on_cleanup(self, app: web.Application):
+        await self.session.close()
@@ -0,0 +1,219 @@
+# /ollama-ui/provision_models.py
+#!/usr/bin/env python3
+"""Pull a manifest of models into Ollama with bounded concurrency.
+
+Models already present in a single /api/tags snapshot are skipped, dropped
+pull streams are retried (Ollama resumes partially downloaded layers), and
+aggregate bytes/sec and ETA are reported across all pulls.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+
+# Errors from Ollama that retrying will not fix
+PERMANENT_ERRORS = ("not found", "file does not exist", "invalid model name")
+
+@dataclass
+class PullState:
+    """Progress of one model pull."""
+    model: str
+    status: str = "queued"
+    attempts: int = 0
+    layers: dict[str, tuple[int, int]] = field(default_factory=dict)
+    baseline: dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return sum(total for total, _ in self.layers.values())
+
+    @property
+    def completed(self) -> int:
+        return sum(completed for _, completed in self.layers.values())
+
+    @property
+    def downloaded(self) -> int:
+        """Bytes fetched by this run, excluding layers already on disk when it started."""
+        return sum(max(completed - self.baseline.get(digest, 0), 0)
+                   for digest, (_, completed) in self.layers.items())
+
+class PullError(Exception):
+    """A pull failed; `retryable` says whether another attempt may succeed."""
+
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+def load_manifest(path: str) -> list[str]:
+    """Read models from a JSON list/object or a text file with one model per line."""
+    with open(path) as f:
+        content = f.read()
+    if path.endswith(".json"):
+        data = json.loads(content)
+        models = data.get("models", []) if isinstance(data, dict) else data
+        return [m if isinstance(m, str) else m["name"] for m in models]
+    return [line.split("#", 1)[0].strip() for line in content.splitlines()
+            if line.split("#", 1)[0].strip()]
+
+def normalize_name(name: str) -> str:
+    return name if ":" in name else f"{name}:latest"
+
+async def fetch_installed(session: aiohttp.ClientSession, host: str) -> set[str]:
+    """Take one /api/tags snapshot of installed models."""
+    async with session.get(f"{host}/api/tags") as response:
+        response.raise_for_status()
+        data = await response.json()
+    return {normalize_name(m.get("name", "")) for m in data.get("models", [])}
+
+async def pull_once(session: aiohttp.ClientSession, host: str, state: PullState):
+    """Stream one pull attempt, updating state as progress arrives."""
+    async with session.post(f"{host}/api/pull", json={"name": state.model, "stream": True}) as response:
+        if response.status != 200:
+            text = await response.text()
+            raise PullError(f"HTTP {response.status}: {text.strip()}", retryable=response.status >= 500)
+        async for line in response.content:
+            if not line.strip():
+                continue
+            try:
+                update = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if update.get("error"):
+                message = update["error"]
+                raise PullError(message, retryable=not any(e in message.lower() for e in PERMANENT_ERRORS))
+            state.status = update.get("status", state.status)
+            digest = update.get("digest")
+            if digest and "total" in update:
+                completed = update.get("completed", 0)
+                # The first report for a layer in this run is what was already on disk
+                state.baseline.setdefault(digest, completed if state.attempts == 1 else 0)
+                state.layers[digest] = (update["total"], completed)
+            if state.status == "success":
+                return
+    raise PullError("stream ended before success")
+
+async def pull_with_retry(session: aiohttp.ClientSession, host: str, state: PullState,
+                          retries: int, semaphore: asyncio.Semaphore):
+    """Pull a model, retrying dropped streams with exponential backoff."""
+    async with semaphore:
+        started = time.monotonic()
+        delay = 1.0
+        while True:
+            state.attempts += 1
+            state.status = "pulling"
+            try:
+                await pull_once(session, host, state)
+                state.status = "success"
+                break
+            except (PullError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = getattr(e, "retryable", True)
+                state.error = str(e) or type(e).__name__
+                if not retryable or state.attempts > retries:
+                    state.status = "failed"
+                    break
+                print(f"{state.model}: {state.error}; retrying in {delay:.0f}s "
+                      f"(attempt {state.attempts + 1}/{retries + 1})")
+                state.status = "retrying"
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+        state.seconds = time.monotonic() - started
+
+def format_bytes(count: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024:
+            return f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} TB"
+
+def format_progress(states: list[PullState], elapsed: float) -> str:
+    """Summarise progress across all pulls as a single line."""
+    total = sum(s.total for s in states)
+    completed = sum(s.completed for s in states)
+    downloaded = sum(s.downloaded for s in states)
+    rate = downloaded / elapsed if elapsed > 0 else 0.0
+    remaining = total - completed
+    eta = f"{remaining / rate:.0f}s" if rate > 0 and remaining > 0 else "-"
+    active = sum(1 for s in states if s.status not in ("queued", "success", "failed", "skipped"))
+    done = sum(1 for s in states if s.status in ("success", "skipped"))
+    return (f"[{done}/{len(states)} done, {active} active] {format_bytes(completed)} / {format_bytes(total)} "
+            f"at {format_bytes(rate)}/s, ETA {eta}")
+
+async def report_progress(states: list[PullState], started: float, interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        print(format_progress(states, time.monotonic() - started))
+
+async def provision(host: str, models: list[str], concurrency: int, retries: int,
+                    interval: float = 1.0) -> list[PullState]:
+    """Pull every missing model with at most `concurrency` pulls in flight."""
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=300)
+    connector = aiohttp.TCPConnector(limit=concurrency + 1)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        installed = await fetch_installed(session, host)
+        states = [PullState(model) for model in dict.fromkeys(models)]
+        pending = []
+        for state in states:
+            if normalize_name(state.model) in installed:
+                state.status = "skipped"
+                print(f"{state.model}: already installed, skipping")
+            else:
+                pending.append(state)
+
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(concurrency)
+        reporter = asyncio.create_task(report_progress(states, started, interval))
+        try:
+            await asyncio.gather(*(pull_with_retry(session, host, s, retries, semaphore) for s in pending))
+        finally:
+            reporter.cancel()
+        elapsed = time.monotonic() - started
+        if pending:
+            print(format_progress(states, elapsed))
+        return states
+
+def main():
+    parser = argparse.ArgumentParser(description="Pull a manifest of models into Ollama in parallel")
+    parser.add_argument("models", nargs="*", help="Models to pull (in addition to --manifest)")
+    parser.add_argument("--manifest", help="JSON list/object with 'models' or a text file with one model per line")
+    parser.add_argument("--host", default=os.environ.get("OLLAMA_API_HOST", "http://localhost:11434"),
+                        help="Ollama host")
+    parser.add_argument("--concurrency", type=int, default=3, help="Maximum simultaneous pulls")
+    parser.add_argument("--retries", type=int, default=5, help="Retries per model after a dropped stream")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between progress reports")
+    args = parser.parse_args()
+
+    models = list(args.models)
+    if args.manifest:
+        models.extend(load_manifest(args.manifest))
+    if not models:
+        parser.error("no models given; pass model names or --manifest")
+
+    started = time.monotonic()
+    states = asyncio.run(provision(args.host.rstrip("/"), models, args.concurrency, args.retries, args.interval))
+    elapsed = time.monotonic() - started
+
+    print(f"\n{'model':<32}{'status':<10}{'attempts':>9}{'size':>12}{'time':>9}")
+    for s in states:
+        size = format_bytes(s.total) if s.total else "-"
+        timing = f"{s.seconds:.1f}s" if s.status not in ("skipped",) else "-"
+        print(f"{s.model:<32}{s.status:<10}{s.attempts:>9}{size:>12}{timing:>9}")
+        if s.status == "failed":
+            print(f"  error: {s.error}")
+    downloaded = sum(s.downloaded for s in states)
+    print(f"\nDownloaded {format_bytes(downloaded)} in {elapsed:.1f}s "
+          f"({format_bytes(downloaded / elapsed if elapsed > 0 else 0)}/s)")
+
+    if any(s.status == "failed" for s in states):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# /ollama-ui/resource_profiler.py
+#!/usr/bin/env python3
+"""Background resource sampler for the UI server and Ollama.
+
+Finds the Next.js server (standalone `server.js`, `next start` or `next dev`)
+and the `ollama` server and runner processes, plus their children, and
+samples CPU%, RSS, USS, open file descriptors, threads and sockets per
+process group at a fixed interval. Samples are saved as columnar `.npz` or
+CSV, and the summary reports peak and steady-state memory and the memory
+growth slope, so leaks in long-lived streaming routes show up in test runs.
+"""
+
+import argparse
+import csv
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import psutil
+
+METRICS = ("cpu", "rss", "uss", "fds", "threads", "sockets", "processes")
+# Substrings of a process's command line that put it in a group
+DEFAULT_GROUPS = {
+    "ui": (".next/standalone/server.js", "next-server", "next start", "next dev"),
+    "ollama": ("ollama serve", "ollama runner", "ollama_llama_server"),
+}
+MB = 1024 * 1024
+
+def command_line(process: psutil.Process) -> str:
+    try:
+        return " ".join(process.cmdline()) or process.name()
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return ""
+
+def find_processes(groups: dict[str, tuple[str, ...]], extra_pids: Optional[dict[str, list[int]]] = None
+                   ) -> dict[str, dict[int, psutil.Process]]:
+    """Return the processes matching each group, including their children."""
+    me = os.getpid()
+    found: dict[str, dict[int, psutil.Process]] = {name: {} for name in groups}
+    for process in psutil.process_iter():
+        if process.pid == me:
+            continue
+        line = command_line(process)
+        for name, patterns in groups.items():
+            if any(pattern in line for pattern in patterns):
+                found[name][process.pid] = process
+                break
+    for name, pids in (extra_pids or {}).items():
+        for pid in pids:
+            try:
+                found.setdefault(name, {})[pid] = psutil.Process(pid)
+            except psutil.NoSuchProcess:
+                pass
+    for members in found.values():
+        for process in list(members.values()):
+            try:
+                members.update((child.pid, child) for child in process.children(recursive=True))
+            except psutil.NoSuchProcess:
+                pass
+    return found
+
+def count_sockets(process: psutil.Process) -> int:
+    # psutil >= 6 renamed connections() to net_connections()
+    connections = getattr(process, "net_connections", None) or process.connections
+    return len(connections(kind="inet"))
+
+def sample_process(process: psutil.Process) -> dict[str, float]:
+    """Read one process's counters; USS is NaN where the platform does not allow it."""
+    with process.oneshot():
+        sample = {"cpu": process.cpu_percent(), "threads": process.num_threads()}
+        try:
+            memory = process.memory_full_info()
+            sample["uss"] = memory.uss
+        except psutil.AccessDenied:
+            memory = process.memory_info()
+            sample["uss"] = np.nan
+        sample["rss"] = memory.rss
+        try:
+            sample["fds"] = process.num_fds() if hasattr(process, "num_fds") else process.num_handles()
+        except psutil.AccessDenied:
+            sample["fds"] = np.nan
+    try:
+        sample["sockets"] = count_sockets(process)
+    except psutil.AccessDenied:
+        sample["sockets"] = np.nan
+    return sample
+
+@dataclass
+class GroupSummary:
+    """Memory behaviour of one process group over a run."""
+    name: str
+    samples: int
+    peak_rss: float
+    peak_uss: float
+    steady_rss: float
+    steady_uss: float
+    slope_mb_per_min: float
+    mean_cpu: float
+    peak_fds: float
+    peak_threads: float
+    peak_sockets: float
+
+class ResourceProfiler:
+    """Sample process groups on a background thread until stopped."""
+
+    def __init__(self, interval: float = 1.0, groups: Optional[dict[str, tuple[str, ...]]] = None,
+                 extra_pids: Optional[dict[str, list[int]]] = None, rescan_every: int = 5):
+        self.interval = interval
+        self.groups = dict(groups or DEFAULT_GROUPS)
+        self.extra_pids = extra_pids or {}
+        for name in self.extra_pids:
+            self.groups.setdefault(name, ())
+        # Runners start and exit as models load, so look for new processes regularly
+        self.rescan_every = rescan_every
+        self.processes: dict[str, dict[int, psutil.Process]] = {}
+        self.times: list[float] = []
+        self.rows: list[list[float]] = []
+        self.columns = [f"{group}.{metric}" for group in self.groups for metric in METRICS]
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.started = 0.0
+
+    def rescan(self):
+        found = find_processes(self.groups, self.extra_pids)
+        for name, members in found.items():
+            known = self.processes.setdefault(name, {})
+            for pid, process in members.items():
+                if pid not in known:
+                    process.cpu_percent()  # The first reading is always 0.0; start the interval now
+                    known[pid] = process
+
+    def sample(self):
+        row = []
+        for name in self.groups:
+            totals = dict.fromkeys(METRICS, 0.0)
+            for pid, process in list(self.processes.get(name, {}).items()):
+                try:
+                    values = sample_process(process)
+                except psutil.NoSuchProcess:
+                    del self.processes[name][pid]
+                    continue
+                for metric, value in values.items():
+                    totals[metric] += value
+                totals["processes"] += 1
+            row.extend(totals[metric] for metric in METRICS)
+        self.times.append(time.monotonic() - self.started)
+        self.rows.append(row)
+
+    def run(self):
+        count = 0
+        while not self.stopping.is_set():
+            if count % self.rescan_every == 0:
+                self.rescan()
+            self.sample()
+            count += 1
+            self.stopping.wait(self.interval)
+
+    def start(self) -> "ResourceProfiler":
+        self.started = time.monotonic()
+        self.rescan()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> "ResourceProfiler":
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join()
+        return self
+
+    def __enter__(self) -> "ResourceProfiler":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        data = np.array(self.rows, dtype=np.float64).reshape(len(self.rows), len(self.columns))
+        arrays = {"time": np.array(self.times)}
+        arrays.update((column, data[:, i]) for i, column in enumerate(self.columns))
+        return arrays
+
+    def save(self, path: str):
+        save_samples(path, self.arrays())
+        print(f"Resource samples ({len(self.times)} x {len(self.columns)} columns) written to {path}")
+
+def save_samples(path: str, arrays: dict[str, np.ndarray]):
+    """Write samples as .npz (compressed columns) or, for any other extension, CSV."""
+    if path.endswith(".npz"):
+        np.savez_compressed(path, **arrays)
+        return
+    names = list(arrays)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(arrays[name].tolist() for name in names)))
+
+def load_samples(path: str) -> dict[str, np.ndarray]:
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        names = next(reader)
+        values = np.array([[float(v) for v in row] for row in reader]).reshape(-1, len(names))
+    return {name: values[:, i] for i, name in enumerate(names)}
+
+def nanmax(values: np.ndarray) -> float:
+    return float(np.nanmax(values)) if np.isfinite(values).any() else float("nan")
+
+def nanmedian(values: np.ndarray) -> float:
+    return float(np.nanmedian(values)) if np.isfinite(values).any() else float("nan")
+
+def summarize(arrays: dict[str, np.ndarray], warmup: float = 0.2) -> list[GroupSummary]:
+    """Summarize each group, treating the first `warmup` fraction of the run as start-up.
+
+    Steady state is the median after warm-up. The slope is a least-squares fit
+    of USS (RSS where USS is unavailable) over the same window, in MB/minute.
+    """
+    times = arrays["time"]
+    steady = times >= times[-1] * warmup if len(times) else times.astype(bool)
+    summaries = []
+    for name in dict.fromkeys(column.split(".", 1)[0] for column in arrays if column != "time"):
+        def column(metric: str) -> np.ndarray:
+            return arrays[f"{name}.{metric}"]
+
+        seen = column("processes") > 0
+        if not seen.any():
+            continue
+        memory = column("uss") if np.isfinite(column("uss")[seen]).all() else column("rss")
+        window = steady & seen
+        slope = float("nan")
+        if window.sum() >= 3 and np.ptp(times[window]) > 0:
+            slope = float(np.polyfit(times[window] / 60, memory[window] / MB, 1)[0])
+        summaries.append(GroupSummary(
+            name=name,
+            samples=int(seen.sum()),
+            peak_rss=nanmax(column("rss")[seen]) / MB,
+            peak_uss=nanmax(column("uss")[seen]) / MB,
+            steady_rss=nanmedian(column("rss")[window]) / MB,
+            steady_uss=nanmedian(column("uss")[window]) / MB,
+            slope_mb_per_min=slope,
+            mean_cpu=float(np.nanmean(column("cpu")[seen])),
+            peak_fds=nanmax(column("fds")[seen]),
+            peak_threads=nanmax(column("threads")[seen]),
+            peak_sockets=nanmax(column("sockets")[seen]),
+        ))
+    return summaries
+
+def print_summary(summaries: list[GroupSummary], leak_threshold: float = 1.0) -> bool:
+    """Print the summary table; return False when a group grows faster than leak_threshold MB/min."""
+    if not summaries:
+        print("No UI or Ollama processes were found while profiling")
+        return True
+    print(f"\n{'group':<10}{'peak RSS':>10}{'peak USS':>10}{'steady RSS':>12}{'steady USS':>12}"
+          f"{'MB/min':>9}{'CPU%':>8}{'FDs':>6}{'threads':>9}{'sockets':>9}")
+    print("-" * 95)
+    healthy = True
+    for s in summaries:
+        print(f"{s.name:<10}{s.peak_rss:>10.1f}{s.peak_uss:>10.1f}{s.steady_rss:>12.1f}{s.steady_uss:>12.1f}"
+              f"{s.slope_mb_per_min:>9.2f}{s.mean_cpu:>8.1f}{s.peak_fds:>6.0f}{s.peak_threads:>9.0f}"
+              f"{s.peak_sockets:>9.0f}")
+    print("-" * 95)
+    for s in summaries:
+        if s.slope_mb_per_min > leak_threshold:
+            healthy = False
+            print(f"Warning: {s.name} memory grew {s.slope_mb_per_min:.2f} MB/min after warm-up "
+                  f"(threshold {leak_threshold:.2f})")
+    return healthy
+
+def parse_groups(values: list[str]) -> dict[str, tuple[str, ...]]:
+    """Parse NAME=SUBSTRING options, repeatable per group."""
+    groups: dict[str, tuple[str, ...]] = {}
+    for value in values:
+        name, _, pattern = value.partition("=")
+        if not pattern:
+            raise argparse.ArgumentTypeError(f"expected NAME=SUBSTRING, got {value!r}")
+        groups[name] = groups.get(name, ()) + (pattern,)
+    return groups
+
+def main():
+    parser = argparse.ArgumentParser(description="Sample CPU, memory, FDs, threads and sockets of the UI and Ollama")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between samples")
+    parser.add_argument("--duration", type=float, help="Seconds to sample (default: until Ctrl-C)")
+    parser.add_argument("--output", default="resource-profile.npz", help="Samples file (.npz, or CSV otherwise)")
+    parser.add_argument("--match", action="append", default=[],
+                        help="Extra NAME=SUBSTRING group matched against command lines, e.g. ollama=fake_ollama.py")
+    parser.add_argument("--pid", action="append", default=[], help="Extra NAME=PID process to sample with its children")
+    parser.add_argument("--warmup", type=float, default=0.2, help="Fraction of the run excluded from steady state")
+    parser.add_argument("--leak-threshold", type=float, default=1.0, help="MB/min of growth reported as a leak")
+    parser.add_argument("--summary", metavar="FILE", help="Summarize an existing samples file and exit")
+    args = parser.parse_args()
+
+    if args.summary:
+        sys.exit(0 if print_summary(summarize(load_samples(args.summary), args.warmup), args.leak_threshold) else 1)
+
+    groups = dict(DEFAULT_GROUPS)
+    for name, patterns in parse_groups(args.match).items():
+        groups[name] = groups.get(name, ()) + patterns
+    extra_pids: dict[str, list[int]] = {}
+    for value in args.pid:
+        name, _, pid = value.partition("=")
+        extra_pids.setdefault(name, []).append(int(pid))
+
+    profiler = ResourceProfiler(args.interval, groups, extra_pids)
+    print(f"Sampling {', '.join(profiler.groups)} every {args.interval:g}s...")
+    profiler.start()
+    try:
+        if args.duration:
+            time.sleep(args.duration)
+        else:
+            while True:
+                time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    profiler.stop()
+    profiler.save(args.output)
+    if not print_summary(summarize(profiler.arrays(), args.warmup), args.leak_threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,405 @@
+# /ollama-ui/response_cache.py
+#!/usr/bin/env python3
+"""Content-addressed response cache in front of Ollama.
+
+Deterministic /api/chat and /api/generate requests (temperature 0 or a
+fixed seed) and all /api/embeddings requests are keyed by a hash of the
+normalised request and the model's digest from /api/tags. Replies, streamed
+or not, are kept in an in-memory LRU bounded by size and in an on-disk
+store, and replayed chunk by chunk with their original timing or as fast as
+possible. Everything else is passed through unchanged.
+
+The UI's chat and generate routes forward the advanced settings as options,
+so a chat with temperature set to 0 is cached. Chats at the default
+temperature are sampled and are not cached unless `--cache-all` is given,
+since replaying one answer to every regenerate would change what the UI does.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+from ollama_proxy import UpstreamProxy, relay, upstream_unavailable
+
+CACHED_ROUTES = ("/api/chat", "/api/generate", "/api/embeddings")
+# Requests that can change which digest a model name points to
+MODEL_CHANGING_ROUTES = ("/api/pull", "/api/delete", "/api/create", "/api/copy")
+# Request fields that do not affect the reply
+VOLATILE_FIELDS = ("keep_alive",)
+
+@dataclass
+class Entry:
+    """A recorded reply: status, content type and (offset seconds, bytes) chunks."""
+    model: str
+    digest: str
+    status: int
+    content_type: str
+    chunks: list[tuple[float, bytes]] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return sum(len(chunk) for _, chunk in self.chunks)
+
+    def to_json(self) -> dict:
+        return {
+            "model": self.model,
+            "digest": self.digest,
+            "status": self.status,
+            "content_type": self.content_type,
+            "chunks": [[offset, chunk.decode()] for offset, chunk in self.chunks],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> "Entry":
+        chunks = [(offset, chunk.encode()) for offset, chunk in data["chunks"]]
+        return cls(data["model"], data["digest"], data["status"], data["content_type"], chunks)
+
+class MemoryCache:
+    """LRU of entries bounded by total body size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[str, Entry] = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Entry]:
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: Entry):
+        if entry.size > self.max_bytes:
+            return
+        self.remove(key)
+        self.entries[key] = entry
+        self.bytes += entry.size
+        while self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= evicted.size
+            self.evictions += 1
+
+    def remove(self, key: str):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def drop_digest(self, digest: str) -> int:
+        keys = [key for key, entry in self.entries.items() if entry.digest == digest]
+        for key in keys:
+            self.remove(key)
+        return len(keys)
+
+class DiskCache:
+    """Entries stored as `<directory>/<digest>/<key>.json`, evicted oldest-access first past `max_bytes`."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index: OrderedDict[str, tuple[str, int]] = OrderedDict()
+        self.bytes = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        files = []
+        for digest in os.listdir(directory):
+            folder = os.path.join(directory, digest)
+            if not os.path.isdir(folder):
+                continue
+            for name in os.listdir(folder):
+                if name.endswith(".json"):
+                    stat = os.stat(os.path.join(folder, name))
+                    files.append((stat.st_mtime, name[:-5], digest, stat.st_size))
+        for _, key, digest, size in sorted(files):
+            self.index[key] = (digest, size)
+            self.bytes += size
+
+    def _path(self, key: str, digest: str) -> str:
+        return os.path.join(self.directory, digest, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Entry]:
+        if key not in self.index:
+            return None
+        digest, _ = self.index[key]
+        path = self._path(key, digest)
+        try:
+            with open(path) as f:
+                entry = Entry.from_json(json.load(f))
+        except (OSError, ValueError, KeyError):
+            self.remove(key)
+            return None
+        os.utime(path)
+        self.index.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: Entry):
+        path = self._path(key, entry.digest)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(entry.to_json(), f)
+        os.replace(tmp, path)
+        self.remove(key, delete=False)
+        size = os.path.getsize(path)
+        self.index[key] = (entry.digest, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.index) > 1:
+            oldest = next(iter(self.index))
+            self.remove(oldest)
+            self.evictions += 1
+
+    def remove(self, key: str, delete: bool = True):
+        if key not in self.index:
+            return
+        digest, size = self.index.pop(key)
+        self.bytes -= size
+        if delete:
+            try:
+                os.remove(self._path(key, digest))
+            except OSError:
+                pass
+
+    def drop_digest(self, digest: str) -> int:
+        keys = [key for key, (d, _) in self.index.items() if d == digest]
+        for key in keys:
+            self.remove(key, delete=False)
+        shutil.rmtree(os.path.join(self.directory, digest), ignore_errors=True)
+        return len(keys)
+
+    def digests(self) -> set[str]:
+        return {digest for digest, _ in self.index.values()}
+
+def normalize_name(name: str) -> str:
+    return name if ":" in name else f"{name}:latest"
+
+def is_deterministic(path: str, body: dict) -> bool:
+    """Embeddings always are; chat and generate need temperature 0 or a fixed seed."""
+    if path == "/api/embeddings":
+        return True
+    options = body.get("options") or {}
+    return options.get("temperature") == 0 or options.get("seed") is not None
+
+def cache_key(path: str, body: dict, digest: str) -> str:
+    """Hash the request with its model name replaced by the model's digest."""
+    normalized = {k: v for k, v in body.items() if k not in VOLATILE_FIELDS and k != "model"}
+    if path != "/api/embeddings":
+        normalized["stream"] = body.get("stream", True)
+    canonical = json.dumps({"path": path, "digest": digest, "request": normalized},
+                           sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class ResponseCache(UpstreamProxy):
+    """aiohttp proxy that serves cached replies and forwards everything else."""
+
+    def __init__(self, upstream: str, directory: str, memory_bytes: int, disk_bytes: int,
+                 replay: str = "fast", digest_ttl: float = 10.0, cache_all: bool = False):
+        super().__init__(upstream)
+        self.memory = MemoryCache(memory_bytes)
+        self.disk = DiskCache(directory, disk_bytes)
+        self.replay = replay
+        self.digest_ttl = digest_ttl
+        self.cache_all = cache_all
+        self.digests: dict[str, str] = {}
+        self.digests_at = 0.0
+        self.digest_lock = asyncio.Lock()
+        self.metrics = {
+            "hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0,
+            "hit_bytes": 0, "miss_bytes": 0, "invalidated_entries": 0,
+        }
+
+    # Model digests
+
+    async def refresh_digests(self, force: bool = False):
+        """Re-read /api/tags at most every `digest_ttl` seconds, dropping entries for changed digests."""
+        async with self.digest_lock:
+            if not force and time.monotonic() - self.digests_at < self.digest_ttl:
+                return
+            async with self.session.get(f"{self.upstream}/api/tags") as response:
+                response.raise_for_status()
+                data = await response.json()
+            digests = {normalize_name(m["name"]): m.get("digest", "") for m in data.get("models", [])}
+            current = set(digests.values())
+            stale = (set(self.digests.values()) | self.disk.digests()) - current
+            for digest in stale:
+                # Memory holds a subset of the disk entries, so count each reply once
+                dropped = max(self.memory.drop_digest(digest), self.disk.drop_digest(digest))
+                if dropped:
+                    self.metrics["invalidated_entries"] += dropped
+                    print(f"Invalidated {dropped} cached replies for digest {digest[:12]}")
+            self.digests = digests
+            self.digests_at = time.monotonic()
+
+    async def model_digest(self, model: str) -> Optional[str]:
+        """Return the model's current digest, or None to bypass the cache."""
+        try:
+            await self.refresh_digests()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            print(f"Could not read model digests: {e}")
+            return None
+        return self.digests.get(normalize_name(model))
+
+    # Request handling
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        body = await request.read()
+        if request.method == "POST" and request.path in CACHED_ROUTES:
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                payload = None
+            if isinstance(payload, dict) and (self.cache_all or is_deterministic(request.path, payload)):
+                digest = await self.model_digest(payload.get("model", ""))
+                if digest:
+                    return await self.serve_cached(request, body, payload, digest)
+        self.metrics["bypassed"] += 1
+        response = await self.forward(request, body, record=None)
+        if request.method in ("POST", "DELETE") and request.path in MODEL_CHANGING_ROUTES:
+            self.digests_at = 0.0
+        return response
+
+    async def serve_cached(self, request: web.Request, body: bytes, payload: dict, digest: str) -> web.StreamResponse:
+        key = cache_key(request.path, payload, digest)
+        entry = self.memory.get(key)
+        tier = "memory"
+        if entry is None:
+            entry = self.disk.get(key)
+            tier = "disk"
+            if entry is not None:
+                self.memory.put(key, entry)
+        if entry is not None:
+            self.metrics["hits"] += 1
+            self.metrics[f"{tier}_hits"] += 1
+            self.metrics["hit_bytes"] += entry.size
+            return await self.replay_entry(request, entry)
+
+        self.metrics["misses"] += 1
+        entry = Entry(normalize_name(payload.get("model", "")), digest, 0, "")
+        response = await self.forward(request, body, record=entry)
+        self.metrics["miss_bytes"] += entry.size
+        if entry.status == 200 and complete(entry):
+            self.memory.put(key, entry)
+            try:
+                self.disk.put(key, entry)
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Could not store {key[:12]} on disk: {e}")
+        return response
+
+    async def forward(self, request: web.Request, body: bytes, record: Optional[Entry]) -> web.StreamResponse:
+        """Proxy a request upstream, streaming the reply and optionally recording its chunks."""
+        started = time.monotonic()
+        try:
+            upstream = await self.open_upstream(request, body)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return upstream_unavailable(e)
+        async with upstream:
+            content_type = upstream.headers.get("Content-Type", "application/json")
+            streaming = "ndjson" in content_type
+
+            def record_chunk(chunk: bytes):
+                record.chunks.append((time.monotonic() - started, chunk))
+
+            if record is not None:
+                record.status = upstream.status
+                record.content_type = content_type
+            response, error = await relay(request, upstream, {"X-Cache": "MISS" if record else "BYPASS"},
+                                          on_chunk=record_chunk if record is not None else None,
+                                          chunks=upstream.content if streaming else None)
+            if record is not None and error is not None:
+                # Never cache a reply that was cut short
+                record.status = 0
+            if record is not None and not streaming and record.chunks:
+                # Non-streamed replies are stored as one chunk
+                record.chunks = [(record.chunks[-1][0], b"".join(chunk for _, chunk in record.chunks))]
+        return response
+
+    async def replay_entry(self, request: web.Request, entry: Entry) -> web.StreamResponse:
+        response = web.StreamResponse(status=entry.status, headers={"Content-Type": entry.content_type,
+                                                                    "X-Cache": "HIT"})
+        await response.prepare(request)
+        started = time.monotonic()
+        for offset, chunk in entry.chunks:
+            if self.replay == "original":
+                delay = offset - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await response.write(chunk)
+        await response.write_eof()
+        return response
+
+    # Metrics
+
+    def stats(self) -> dict:
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "hit_ratio": self.metrics["hits"] / lookups if lookups else 0.0,
+            "memory_entries": len(self.memory.entries),
+            "memory_bytes": self.memory.bytes,
+            "memory_evictions": self.memory.evictions,
+            "disk_entries": len(self.disk.index),
+            "disk_bytes": self.disk.bytes,
+            "disk_evictions": self.disk.evictions,
+            "models": len(self.digests),
+        }
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+    async def handle_clear(self, request: web.Request) -> web.Response:
+        cleared = len(self.disk.index)
+        for digest in list(self.disk.digests()):
+            self.disk.drop_digest(digest)
+        self.memory = MemoryCache(self.memory.max_bytes)
+        return web.json_response({"cleared": cleared})
+
+def complete(entry: Entry) -> bool:
+    """Streamed replies must end with a `done: true` frame to be cacheable."""
+    if "ndjson" not in entry.content_type:
+        return bool(entry.chunks)
+    try:
+        return bool(entry.chunks) and json.loads(entry.chunks[-1][1]).get("done") is True
+    except ValueError:
+        return False
+
+def create_app(cache: ResponseCache) -> web.Application:
+    app = web.Application(client_max_size=1024 ** 3)
+    app.on_startup.append(cache.on_startup)
+    app.on_cleanup.append(cache.on_cleanup)
+    app.router.add_get("/cache/metrics", cache.handle_stats)
+    app.router.add_delete("/cache", cache.handle_clear)
+    app.router.add_route("*", "/{path:.*}", cache.handle)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Caching proxy for deterministic Ollama requests")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=11435, help="Port to listen on")
+    parser.add_argument("--upstream", default="http://localhost:11434", help="Ollama host to forward to")
+    parser.add_argument("--cache-dir", default=".ollama-cache", help="On-disk store directory")
+    parser.add_argument("--memory-mb", type=float, default=256, help="In-memory LRU size")
+    parser.add_argument("--disk-mb", type=float, default=2048, help="On-disk store size")
+    parser.add_argument("--replay", choices=("fast", "original"), default="fast",
+                        help="Replay cached streams as fast as possible or with their recorded timing")
+    parser.add_argument("--digest-ttl", type=float, default=10.0, help="Seconds between /api/tags digest checks")
+    parser.add_argument("--cache-all", action="store_true",
+                        help="Also cache chat/generate requests without temperature 0 or a seed")
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.upstream, args.cache_dir, int(args.memory_mb * 1024 * 1024),
+                          int(args.disk_mb * 1024 * 1024), args.replay, args.digest_ttl, args.cache_all)
+    print(f"Caching {args.upstream} on http://{args.host}:{args.port} "
+          f"({len(cache.disk.index)} replies on disk); metrics at /cache/metrics")
+    web.run_app(create_app(cache), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
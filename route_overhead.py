@@ -0,0 +1,315 @@
+# /ollama-ui/route_overhead.py
+#!/usr/bin/env python3
+"""Measure what the Next.js API routes add on top of Ollama.
+
+Each UI route that wraps an Ollama endpoint gets the same workload twice:
+once sent to Ollama directly and once through the UI route. Latency
+percentiles, time to first byte and throughput are compared per route. The
+result is written to a versioned baseline file, and later runs compare
+against it and exit non-zero when a route's overhead regresses past the
+thresholds, so the script can gate UI upgrades.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+
+from load_test import summarize
+from test_offline import MODEL_NAME
+
+BASELINE_VERSION = 1
+BASELINE_PATH = os.path.join("benchmarks", "route-overhead.json")
+
+@dataclass
+class RouteCase:
+    """A UI route and the Ollama call it wraps, with the same workload for both."""
+    name: str
+    ui_path: str
+    ollama_path: str
+    ui_method: str = "GET"
+    ollama_method: str = "GET"
+    ui_body: Optional[dict] = None
+    ollama_body: Optional[dict] = None
+
+@dataclass
+class Sample:
+    ok: bool
+    ttfb: Optional[float] = None
+    latency: float = 0.0
+    error: Optional[str] = None
+
+@dataclass
+class Measurement:
+    """Requests against one side (direct or UI) of one route."""
+    samples: list[Sample] = field(default_factory=list)
+    wall: float = 0.0
+
+    def summary(self) -> dict:
+        ok = [s for s in self.samples if s.ok]
+        latency = summarize([s.latency * 1000 for s in ok])
+        ttfb = summarize([s.ttfb * 1000 for s in ok if s.ttfb is not None])
+        return {
+            "requests": len(self.samples),
+            "errors": len(self.samples) - len(ok),
+            "p50_ms": latency["p50"],
+            "p99_ms": latency["p99"],
+            "ttfb_p50_ms": ttfb["p50"],
+            "ttfb_p99_ms": ttfb["p99"],
+            "throughput_rps": len(ok) / self.wall if self.wall > 0 else 0.0,
+        }
+
+def build_cases(model: str, embedding_model: str, pull_model: str) -> list[RouteCase]:
+    messages = [{"role": "user", "content": "Say hello"}]
+    chat = {"model": model, "messages": messages}
+    generate = {"model": model, "prompt": "Say hello", "stream": False}
+    embeddings = {"model": embedding_model, "prompt": "Say hello"}
+    return [
+        RouteCase("chat", "/api/chat", "/api/chat", "POST", "POST", chat, {**chat, "stream": True}),
+        RouteCase("chat/stream", "/api/chat/stream", "/api/chat", "POST", "POST", chat, {**chat, "stream": True}),
+        RouteCase("generate", "/api/generate", "/api/generate", "POST", "POST", generate, generate),
+        RouteCase("embeddings", "/api/embeddings", "/api/embeddings", "POST", "POST", embeddings, embeddings),
+        RouteCase("ps", "/api/ps", "/api/ps"),
+        RouteCase("version", "/api/version", "/api/version"),
+        # The pull route answers from /api/tags once the model is installed, so compare against that call
+        RouteCase("models/pull", "/api/models/pull", "/api/tags", "POST", "GET", {"name": pull_model}),
+    ]
+
+async def request_once(session: aiohttp.ClientSession, method: str, url: str, body: Optional[dict],
+                       headers: dict) -> Sample:
+    started = time.perf_counter()
+    sample = Sample(ok=False)
+    try:
+        async with session.request(method, url, json=body, headers=headers) as response:
+            async for _ in response.content.iter_any():
+                if sample.ttfb is None:
+                    sample.ttfb = time.perf_counter() - started
+            sample.ok = response.status < 400
+            if not sample.ok:
+                sample.error = f"HTTP {response.status}"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        sample.error = str(e) or type(e).__name__
+    sample.latency = time.perf_counter() - started
+    return sample
+
+async def measure(session: aiohttp.ClientSession, method: str, url: str, body: Optional[dict], headers: dict,
+                  requests: int, concurrency: int, warmup: int) -> Measurement:
+    """Send `requests` requests with `concurrency` in flight, after `warmup` unmeasured ones."""
+    for _ in range(warmup):
+        await request_once(session, method, url, body, headers)
+    measurement = Measurement()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one() -> Sample:
+        async with semaphore:
+            return await request_once(session, method, url, body, headers)
+
+    started = time.perf_counter()
+    measurement.samples = list(await asyncio.gather(*(one() for _ in range(requests))))
+    measurement.wall = time.perf_counter() - started
+    return measurement
+
+def overhead(direct: dict, ui: dict) -> dict:
+    """What the UI route adds: extra latency in ms and the fraction of throughput lost."""
+    def added(key: str) -> Optional[float]:
+        return ui[key] - direct[key] if ui[key] is not None and direct[key] is not None else None
+
+    loss = 1 - ui["throughput_rps"] / direct["throughput_rps"] if direct["throughput_rps"] else None
+    return {"added_p50_ms": added("p50_ms"), "added_p99_ms": added("p99_ms"),
+            "added_ttfb_p50_ms": added("ttfb_p50_ms"), "throughput_loss": loss}
+
+async def is_installed(session: aiohttp.ClientSession, ollama: str, model: str) -> bool:
+    try:
+        async with session.get(f"{ollama}/api/tags") as response:
+            models = (await response.json()).get("models", [])
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        return False
+    return any(m.get("name") == model for m in models)
+
+async def pull_once(session: aiohttp.ClientSession, ollama: str, model: str) -> bool:
+    """Install a model with a single unmeasured pull, without the per-request timeout."""
+    status = None
+    try:
+        async with session.post(f"{ollama}/api/pull", json={"name": model, "stream": True},
+                                timeout=aiohttp.ClientTimeout(total=None)) as response:
+            async for line in response.content:
+                if line.strip():
+                    frame = json.loads(line)
+                    status = frame.get("error") or frame.get("status")
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        status = str(e) or type(e).__name__
+    if status != "success":
+        print(f"Error: pulling {model} failed: {status}")
+    return status == "success"
+
+async def run_suite(ui: str, ollama: str, cases: Optional[list[str]], args: argparse.Namespace) -> dict:
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+    connector = aiohttp.TCPConnector(limit=args.concurrency * 2)
+    headers = {name.strip(): value.strip() for name, _, value in (h.partition(":") for h in args.header)}
+    results = {}
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        skip = set()
+        if (not cases or "models/pull" in cases) and not await is_installed(session, ollama, args.pull_model):
+            # Measuring real downloads would fetch the model over and over, so only pull it once when asked to
+            if cases and "models/pull" in cases:
+                print(f"Pulling {args.pull_model} once before measuring models/pull")
+                if not await pull_once(session, ollama, args.pull_model):
+                    skip.add("models/pull")
+            else:
+                print(f"Skipping models/pull: {args.pull_model} is not installed (pass --routes models/pull to pull it)")
+                skip.add("models/pull")
+        for case in build_cases(args.model, args.embedding_model, args.pull_model):
+            if (cases and case.name not in cases) or case.name in skip:
+                continue
+            direct = await measure(session, case.ollama_method, f"{ollama}{case.ollama_path}", case.ollama_body,
+                                   headers, args.requests, args.concurrency, args.warmup)
+            wrapped = await measure(session, case.ui_method, f"{ui}{case.ui_path}", case.ui_body,
+                                    headers, args.requests, args.concurrency, args.warmup)
+            direct_summary, ui_summary = direct.summary(), wrapped.summary()
+            results[case.name] = {"ollama_path": case.ollama_path, "ui_path": case.ui_path,
+                                  "direct": direct_summary, "ui": ui_summary,
+                                  "overhead": overhead(direct_summary, ui_summary)}
+            errors = direct_summary["errors"] + ui_summary["errors"]
+            print(f"{case.name}: done{f' ({errors} errors)' if errors else ''}")
+    return results
+
+def format_value(value: Optional[float], pattern: str = "{:.1f}") -> str:
+    return "-" if value is None else pattern.format(value)
+
+def print_results(results: dict, baseline: Optional[dict]):
+    base_routes = (baseline or {}).get("routes", {})
+    header = (f"{'route':<14}{'direct p50':>11}{'ui p50':>9}{'+p50':>8}{'direct p99':>11}{'ui p99':>9}{'+p99':>8}"
+              f"{'direct rps':>11}{'ui rps':>9}{'loss':>8}")
+    if baseline:
+        header += f"{'base +p50':>10}{'base +p99':>10}"
+    print(f"\n{header}")
+    print("-" * len(header))
+    for name, r in results.items():
+        d, u, o = r["direct"], r["ui"], r["overhead"]
+        row = (f"{name:<14}{format_value(d['p50_ms']):>11}{format_value(u['p50_ms']):>9}"
+               f"{format_value(o['added_p50_ms'], '{:+.1f}'):>8}{format_value(d['p99_ms']):>11}"
+               f"{format_value(u['p99_ms']):>9}{format_value(o['added_p99_ms'], '{:+.1f}'):>8}"
+               f"{d['throughput_rps']:>11.1f}{u['throughput_rps']:>9.1f}"
+               f"{format_value(o['throughput_loss'], '{:.0%}'):>8}")
+        if baseline:
+            old = (base_routes.get(name) or {}).get("overhead", {})
+            row += (f"{format_value(old.get('added_p50_ms'), '{:+.1f}'):>10}"
+                    f"{format_value(old.get('added_p99_ms'), '{:+.1f}'):>10}")
+        print(row)
+    print("-" * len(header))
+    print("Latencies in ms; + columns are the latency the UI route adds, loss is the throughput it costs")
+
+def find_regressions(results: dict, baseline: dict, max_ms: float, max_ratio: float, max_loss: float) -> list[str]:
+    """Compare each route's overhead with the baseline.
+
+    Added p50/p99 latency regresses when it grows by more than max_ms and by
+    more than max_ratio of the route's direct latency, so noise on fast routes
+    and slow routes is judged on the same footing. Throughput loss regresses
+    when it grows by more than max_loss (a fraction).
+    """
+    regressions = []
+    for name, r in results.items():
+        old = (baseline.get("routes", {}).get(name) or {}).get("overhead")
+        if not old:
+            continue
+        new = r["overhead"]
+        for key, direct_key in (("added_p50_ms", "p50_ms"), ("added_p99_ms", "p99_ms")):
+            if new[key] is None or old.get(key) is None:
+                continue
+            growth = new[key] - old[key]
+            if growth > max_ms and growth > max_ratio * (r["direct"][direct_key] or 0):
+                regressions.append(f"{name}: {key} {old[key]:.1f} -> {new[key]:.1f} ms")
+        if new["throughput_loss"] is not None and old.get("throughput_loss") is not None:
+            if new["throughput_loss"] - old["throughput_loss"] > max_loss:
+                regressions.append(f"{name}: throughput loss {old['throughput_loss']:.0%} -> {new['throughput_loss']:.0%}")
+    return regressions
+
+def ui_version() -> dict:
+    try:
+        with open("package.json") as f:
+            version = json.load(f).get("version")
+    except (OSError, ValueError):
+        version = None
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    return {"package": version, "commit": commit or None}
+
+def load_baseline(path: str, workload: dict) -> Optional[dict]:
+    """Read a baseline if it exists and was measured with the same format and workload."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        baseline = json.load(f)
+    if baseline.get("version") != BASELINE_VERSION:
+        print(f"Ignoring {path}: baseline format {baseline.get('version')}, expected {BASELINE_VERSION}")
+        return None
+    if baseline.get("workload") != workload:
+        print(f"Ignoring {path}: measured with a different workload {baseline.get('workload')}")
+        return None
+    return baseline
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the latency and throughput the UI routes add over Ollama")
+    parser.add_argument("--ui", default="http://localhost:3000", help="Base URL of the UI")
+    parser.add_argument("--ollama", default=os.environ.get("OLLAMA_API_HOST", "http://localhost:11434"),
+                        help="The Ollama host the UI forwards to")
+    parser.add_argument("--routes", help="Comma-separated subset, e.g. chat/stream,ps")
+    parser.add_argument("--model", default=MODEL_NAME, help="Model for chat and generate")
+    parser.add_argument("--embedding-model", default=MODEL_NAME, help="Model for embeddings")
+    parser.add_argument("--pull-model", default=MODEL_NAME, help="Model for the pull route")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per route and side")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight")
+    parser.add_argument("--warmup", type=int, default=5, help="Unmeasured requests before each measurement")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Per-request timeout in seconds")
+    parser.add_argument("--header", action="append", default=[], help="Extra 'Name: value' header for every request")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Write this run as the new baseline")
+    parser.add_argument("--max-regression-ms", type=float, default=5.0,
+                        help="Allowed growth in added p50/p99 latency, in ms")
+    parser.add_argument("--max-regression-ratio", type=float, default=0.1,
+                        help="Allowed growth in added latency as a fraction of direct latency")
+    parser.add_argument("--max-throughput-loss", type=float, default=0.1,
+                        help="Allowed growth in throughput loss, as a fraction")
+    parser.add_argument("--json", dest="json_path", help="Also write this run's results here")
+    args = parser.parse_args()
+
+    workload = {"model": args.model, "embedding_model": args.embedding_model, "pull_model": args.pull_model,
+                "requests": args.requests, "concurrency": args.concurrency}
+    routes = [r for r in args.routes.split(",") if r] if args.routes else None
+    print(f"Comparing {args.ui} with {args.ollama}: {args.requests} requests per route at concurrency {args.concurrency}")
+    results = asyncio.run(run_suite(args.ui.rstrip("/"), args.ollama.rstrip("/"), routes, args))
+    baseline = load_baseline(args.baseline, workload)
+    print_results(results, baseline)
+
+    run = {"version": BASELINE_VERSION, "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "ui": ui_version(),
+           "workload": workload, "routes": results}
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(run, f, indent=2)
+
+    failed = [name for name, r in results.items() if r["ui"]["errors"] == r["ui"]["requests"]]
+    for name in failed:
+        print(f"Error: every request through {name} failed")
+    regressions = find_regressions(results, baseline, args.max_regression_ms, args.max_regression_ratio,
+                                   args.max_throughput_loss) if baseline else []
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    if baseline and not regressions:
+        print(f"No overhead regressions against {args.baseline} ({baseline['ui'].get('commit')})")
+
+    if args.update_baseline and not failed:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+    if failed or regressions:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+// /ollama-ui/src/__tests__/admission.test.ts
+import { execFileSync } from 'child_process';
+
+jest.setTimeout(15000);
+
+function runPython(script: string): any {
+  const output = execFileSync('python3', ['-c', script], {
+    cwd: process.cwd(),
+    env: { ...process.env, PYTHONPATH: process.cwd() },
+  });
+  return JSON.parse(output.toString().trim().split('\n').pop() || '{}');
+}
+
+describe('Admission queue', () => {
+  it('does not leak a slot when a queued client disconnects before its handler runs', () => {
+    const state = runPython(`
+import asyncio, json
+from admission import ModelQueue, Ticket
+
+async def main():
+    loop = asyncio.get_running_loop()
+    queue = ModelQueue(1, 1)
+
+    def enqueue(seq):
+        ticket = Ticket(0, 0.0, seq, f"user{seq}", "interactive", 0.0, loop.create_future())
+        queue.push(ticket, 1.0)
+        return ticket
+
+    enqueue(0)
+    queue.dispatch()
+    cancelled, waiting = enqueue(1), enqueue(2)
+    # The client disconnects, but the running request finishes before the cancelled handler runs
+    cancelled.granted.cancel()
+    queue.release("interactive")
+    queue.remove(cancelled)
+    print(json.dumps({"running": queue.running, "queued": queue.queued, "heap": len(queue.heap),
+                      "granted": waiting.granted.done(), "users": dict(queue.queued_by_user)}))
+
+asyncio.run(main())
+`);
+
+    expect(state).toEqual({
+      running: { interactive: 1, batch: 0 },
+      queued: { interactive: 0, batch: 0 },
+      heap: 0,
+      granted: true,
+      users: {},
+    });
+  });
+});
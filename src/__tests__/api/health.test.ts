@@ -68,4 +68,59 @@ describe('Health API', () => {
     // Restore the original implementation
     require('next/server').NextResponse.json = originalNextResponseJson;
   });
+
+  describe('deep mode', () => {
+    const deepRequest = (query: string) => ({ url: `http://localhost:3000/api/health?${query}` }) as Request;
+
+    beforeEach(() => {
+      global.fetch = jest.fn((url: string) => {
+        if (url.endsWith('/api/version')) {
+          return Promise.resolve({ ok: true, json: () => Promise.resolve({ version: '0.6.0' }) });
+        }
+        if (url.endsWith('/api/ps')) {
+          return Promise.resolve({ ok: true, json: () => Promise.resolve({ models: [{ name: 'llama3.2:1b' }] }) });
+        }
+        if (url.endsWith('/api/generate')) {
+          return Promise.resolve({ ok: true, json: () => Promise.resolve({ done: true, load_duration: 1500000000 }) });
+        }
+        return Promise.reject(new Error(`Unexpected URL ${url}`));
+      }) as jest.Mock;
+    });
+
+    it('should time the Ollama round-trip', async () => {
+      const response = await GET(deepRequest('deep=1'));
+      const data = await response.json();
+
+      expect(response.status).toBe(200);
+      expect(data.status).toBe('healthy');
+      expect(data.ollama).toMatchObject({ status: 'running', version: '0.6.0', loadedModels: ['llama3.2:1b'] });
+      expect(data.ollama.latencyMs.version).toEqual(expect.any(Number));
+      expect(data.ollama.latencyMs.ps).toEqual(expect.any(Number));
+      expect(data.models).toEqual([]);
+    });
+
+    it('should warm up requested models and report load time and TTFT', async () => {
+      const response = await GET(deepRequest('deep=1&models=llama3.2:1b'));
+      const data = await response.json();
+
+      expect(response.status).toBe(200);
+      expect(data.models).toHaveLength(1);
+      expect(data.models[0]).toMatchObject({ name: 'llama3.2:1b', loadMs: 1500 });
+      expect(data.models[0].ttftMs).toEqual(expect.any(Number));
+      const generateCall = (global.fetch as jest.Mock).mock.calls.find(([url]) => url.endsWith('/api/generate'));
+      expect(JSON.parse(generateCall[1].body)).toMatchObject({ model: 'llama3.2:1b', options: { num_predict: 1 } });
+    });
+
+    it('should return 503 when Ollama is unreachable', async () => {
+      global.fetch = jest.fn().mockRejectedValue(new Error('connect ECONNREFUSED')) as jest.Mock;
+
+      const response = await GET(deepRequest('deep=1&models=llama3.2:1b'));
+      const data = await response.json();
+
+      expect(response.status).toBe(503);
+      expect(data.status).toBe('unhealthy');
+      expect(data.ollama).toMatchObject({ status: 'unreachable', error: 'connect ECONNREFUSED' });
+      expect(data.models).toEqual([]);
+    });
+  });
 }); 
\ No newline at end of file
@@ -1,4 +1,5 @@
 import { GET } from '@/app/api/models/library/route'
+import { resetCatalog } from '@/lib/catalog'
 
 // Mock NextResponse
 jest.mock('next/server', () => ({
@@ -17,6 +18,7 @@ global.fetch = mockFetch
 describe('Library Models API', () => {
   beforeEach(() => {
     jest.clearAllMocks()
+    resetCatalog()
   })
 
   it('should return 200 and empty models array when Ollama is healthy', async () => {
@@ -1,4 +1,5 @@
 import { GET } from '@/app/api/models/route'
+import { resetCatalog } from '@/lib/catalog'
 
 // Mock fetch
 const mockFetch = jest.fn()
@@ -7,6 +8,7 @@ global.fetch = mockFetch
 describe('Main Models API', () => {
   beforeEach(() => {
     jest.clearAllMocks()
+    resetCatalog()
   })
 
   it('should use HTML scraping from ollama.com/library', async () => {
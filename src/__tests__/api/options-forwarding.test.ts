@@ -0,0 +1,54 @@
+// src/__tests__/api/options-forwarding.test.ts
+import { NextRequest } from 'next/server';
+import { POST as chat } from '@/app/api/chat/route';
+import { POST as chatStream } from '@/app/api/chat/stream/route';
+import { POST as generate } from '@/app/api/generate/route';
+
+const routes: [string, (request: NextRequest) => Promise<Response>, object][] = [
+  ['chat', chat, { model: 'llama2', messages: [{ role: 'user', content: 'Hi' }] }],
+  ['chat/stream', chatStream, { model: 'llama2', messages: [{ role: 'user', content: 'Hi' }] }],
+  ['generate', generate, { model: 'llama2', prompt: 'Hi' }],
+];
+
+function makeRequest(path: string, body: object) {
+  return new NextRequest(`http://localhost:3000/api/${path}`, {
+    method: 'POST',
+    body: JSON.stringify(body),
+  });
+}
+
+function forwardedBody(): Record<string, unknown> {
+  return JSON.parse((global.fetch as jest.Mock).mock.calls[0][1].body);
+}
+
+describe('Forwarding sampling options to Ollama', () => {
+  beforeEach(() => {
+    global.fetch = jest.fn().mockResolvedValue({
+      ok: true,
+      status: 200,
+      headers: new Headers(),
+      body: null,
+      json: async () => ({ response: 'Hello' }),
+    });
+  });
+
+  describe.each(routes)('%s route', (path, handler, body) => {
+    it('sends the parameters from the advanced settings as options', async () => {
+      await handler(makeRequest(path, { ...body, temperature: 0, top_p: 0.9, seed: 42 }));
+
+      expect(forwardedBody().options).toEqual({ temperature: 0, top_p: 0.9, seed: 42 });
+    });
+
+    it('lets an explicit options object win', async () => {
+      await handler(makeRequest(path, { ...body, temperature: 0.7, options: { temperature: 0 } }));
+
+      expect(forwardedBody().options).toEqual({ temperature: 0 });
+    });
+
+    it('sends no options when none are set', async () => {
+      await handler(makeRequest(path, body));
+
+      expect(forwardedBody()).not.toHaveProperty('options');
+    });
+  });
+});
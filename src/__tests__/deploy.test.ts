@@ -169,15 +169,15 @@ JWT_SECRET=test-secret-key
         return;
       }
 
-      // Create .env file before running the script since Docker deployment is not implemented
+      // An existing .env file must be left untouched
       writeFileSync(envPath, 'OLLAMA_API_HOST=http://ollama:11434\nNODE_ENV=production\nAUTH_ENABLED=true\nJWT_SECRET=test-secret');
 
       const { exitCode } = await runDeployScript(['--environment', 'docker'], {
         MOCK_COMMANDS: 'docker,docker-compose,curl'
       });
 
-      // Docker deployment is not implemented, so it should exit with code 1
-      expect(exitCode).toBe(1);
+      // Docker commands and healthchecks are skipped, so the deployment succeeds
+      expect(exitCode).toBe(0);
       expect(existsSync(envPath)).toBe(true);
 
       const envContent = readFileSync(envPath, 'utf-8');
@@ -200,6 +200,33 @@ JWT_SECRET=test-secret-key
       expect(output).toContain('Starting Next.js in development mode');
     });
 
+    it('should create .env file from .env.example when missing', async () => {
+      const { exitCode, output } = await runDeployScript(['--environment', 'docker'], {
+        MOCK_COMMANDS: 'docker,docker-compose,curl'
+      });
+
+      expect(exitCode).toBe(0);
+      expect(output).toContain('Creating .env file');
+      const envContent = readFileSync(envPath, 'utf-8');
+      expect(envContent).toContain('OLLAMA_API_HOST=http://ollama:11434');
+      expect(envContent).toContain('NODE_ENV=production');
+    });
+
+    it('should report per-phase timings', async () => {
+      const { exitCode, output } = await runDeployScript(['--environment', 'docker'], {
+        MOCK_COMMANDS: 'docker,docker-compose,curl'
+      });
+
+      expect(exitCode).toBe(0);
+      expect(output).toContain('Building ollama-ui image and pulling ollama/ollama in parallel');
+      expect(output).toContain('Docker deployment timings:');
+      expect(output).toMatch(/build\s+\d+\.\ds/);
+      expect(output).toMatch(/pull\s+\d+\.\ds/);
+      expect(output).toMatch(/start\s+\d+\.\ds/);
+      expect(output).toMatch(/healthy \(ollama-ui\)\s+\d+\.\ds/);
+      expect(output).toContain('Docker deployment completed successfully!');
+    });
+
     it('should handle Docker build failures', async () => {
       const { exitCode, output } = await runDeployScript(['--environment', 'docker'], {
         MOCK_COMMANDS: 'docker,docker-compose,curl',
@@ -207,7 +234,7 @@ JWT_SECRET=test-secret-key
       });
 
       expect(exitCode).not.toBe(0);
-      expect(output).toContain('Docker deployment not implemented yet');
+      expect(output).toContain('Error: Failed to build Docker image');
     });
   });
 
@@ -221,14 +248,14 @@ JWT_SECRET=test-secret-key
       expect(localExitCode).toBe(1);
       expect(localOutput).toContain('Starting Next.js in development mode');
 
-      // Test Docker environment (should exit with code 1 since Docker deployment is not implemented)
+      // Test Docker environment (should exit with code 1 since docker and docker-compose are missing)
       const { exitCode: dockerExitCode, output: dockerOutput } = await runDeployScript(
         ['--environment', 'docker'],
         { MOCK_COMMANDS: 'curl' }  // Only mock curl, not docker or docker-compose
       );
 
       expect(dockerExitCode).not.toBe(0);
-      expect(dockerOutput).toContain('Docker deployment not implemented yet');
+      expect(dockerOutput).toContain('required commands are missing: docker, docker-compose');
     });
 
     it('should handle missing Python virtual environment', async () => {
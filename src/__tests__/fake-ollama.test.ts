@@ -0,0 +1,111 @@
+// /ollama-ui/src/__tests__/fake-ollama.test.ts
+import { ChildProcess, spawn } from 'child_process';
+import { request } from 'http';
+import { join } from 'path';
+
+jest.setTimeout(15000);
+
+const PORT = 18434;
+
+function callFakeOllama(method: string, path: string, body?: unknown): Promise<{ status: number; text: string }> {
+  return new Promise((resolve, reject) => {
+    const req = request({ host: '127.0.0.1', port: PORT, method, path }, (res) => {
+      let text = '';
+      res.on('data', (chunk) => { text += chunk.toString(); });
+      res.on('end', () => resolve({ status: res.statusCode || 0, text }));
+    });
+    req.on('error', reject);
+    if (body !== undefined) {
+      req.write(JSON.stringify(body));
+    }
+    req.end();
+  });
+}
+
+async function waitForServer(attempts = 50): Promise<void> {
+  for (let i = 0; i < attempts; i++) {
+    try {
+      await callFakeOllama('GET', '/api/version');
+      return;
+    } catch {
+      await new Promise((resolve) => setTimeout(resolve, 100));
+    }
+  }
+  throw new Error('fake_ollama.py did not start');
+}
+
+describe('Fake Ollama Server', () => {
+  let server: ChildProcess;
+
+  beforeAll(async () => {
+    server = spawn('python3', [
+      join(process.cwd(), 'fake_ollama.py'),
+      '--port', String(PORT),
+      '--tokens-per-second', '1000',
+      '--ttft', '0',
+      '--max-tokens', '5',
+      '--pull-rate', '1000000000',
+    ]);
+    await waitForServer();
+  });
+
+  afterAll(() => {
+    server?.kill();
+  });
+
+  it('should report a version and the configured models', async () => {
+    const version = await callFakeOllama('GET', '/api/version');
+    expect(version.status).toBe(200);
+    expect(JSON.parse(version.text).version).toBeDefined();
+
+    const tags = await callFakeOllama('GET', '/api/tags');
+    const names = JSON.parse(tags.text).models.map((m: { name: string }) => m.name);
+    expect(names).toContain('llama3.2:1b');
+  });
+
+  it('should stream deterministic chat replies ending with timing fields', async () => {
+    const payload = { model: 'llama3.2:1b', messages: [{ role: 'user', content: 'Say hello' }] };
+    const first = await callFakeOllama('POST', '/api/chat', payload);
+    const second = await callFakeOllama('POST', '/api/chat', payload);
+
+    const frames = first.text.trim().split('\n').map((line) => JSON.parse(line));
+    expect(frames).toHaveLength(6);
+    expect(frames[frames.length - 1]).toMatchObject({ done: true, eval_count: 5 });
+    expect(frames[frames.length - 1].eval_duration).toBeGreaterThanOrEqual(0);
+    expect(second.text.replace(/"created_at": "[^"]+"|"\w+_duration": \d+/g, ''))
+      .toEqual(first.text.replace(/"created_at": "[^"]+"|"\w+_duration": \d+/g, ''));
+  });
+
+  it('should pull, list and delete a model', async () => {
+    const pull = await callFakeOllama('POST', '/api/pull', { name: 'phi3:mini' });
+    const statuses = pull.text.trim().split('\n').map((line) => JSON.parse(line).status);
+    expect(statuses[0]).toBe('pulling manifest');
+    expect(statuses[statuses.length - 1]).toBe('success');
+
+    const tags = await callFakeOllama('GET', '/api/tags');
+    expect(tags.text).toContain('phi3:mini');
+
+    const deleted = await callFakeOllama('DELETE', '/api/delete', { name: 'phi3:mini' });
+    expect(deleted.status).toBe(200);
+    const missing = await callFakeOllama('DELETE', '/api/delete', { name: 'phi3:mini' });
+    expect(missing.status).toBe(404);
+  });
+
+  it('should keep a model loaded forever with a negative keep_alive', async () => {
+    const load = await callFakeOllama('POST', '/api/generate', { model: 'llama3.2:1b', prompt: '', keep_alive: -1 });
+    expect(load.status).toBe(200);
+
+    const ps = await callFakeOllama('GET', '/api/ps');
+    expect(ps.status).toBe(200);
+    const running = JSON.parse(ps.text).models.find((m: { name: string }) => m.name === 'llama3.2:1b');
+    expect(new Date(running.expires_at).getUTCFullYear()).toBeGreaterThan(new Date().getUTCFullYear() + 100);
+
+    await callFakeOllama('POST', '/api/generate', { model: 'llama3.2:1b', prompt: '', keep_alive: 0 });
+    expect(JSON.parse((await callFakeOllama('GET', '/api/ps')).text).models).toEqual([]);
+  });
+
+  it('should return 404 for unknown models', async () => {
+    const response = await callFakeOllama('POST', '/api/generate', { model: 'missing', prompt: 'hi' });
+    expect(response.status).toBe(404);
+  });
+});
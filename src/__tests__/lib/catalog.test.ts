@@ -0,0 +1,152 @@
+import fs from 'fs'
+import os from 'os'
+import path from 'path'
+
+import {
+  buildSnapshot,
+  getCatalog,
+  loadSnapshot,
+  parseLibraryHtml,
+  refreshSnapshot,
+  resetCatalog,
+  saveSnapshot,
+  searchCatalog,
+  waitForRefresh,
+} from '@/lib/catalog'
+
+const libraryHtml = fs.readFileSync(path.join(__dirname, '../fixtures/ollama-library.html'), 'utf8')
+
+// Mock fetch
+const mockFetch = jest.fn()
+global.fetch = mockFetch
+
+const htmlResponse = (html: string, validators: Record<string, string> = {}) => ({
+  ok: true,
+  status: 200,
+  headers: { get: (name: string) => validators[name.toLowerCase()] ?? null },
+  text: () => Promise.resolve(html),
+})
+
+const names = (models: { name: string }[]) => models.map((model) => model.name)
+
+describe('Model catalog', () => {
+  beforeEach(() => {
+    jest.clearAllMocks()
+    resetCatalog()
+  })
+
+  it('parses the library page fixture', () => {
+    const models = parseLibraryHtml(libraryHtml)
+
+    expect(names(models)).toEqual(['llama3.2', 'llama3.2-vision', 'nomic-embed-text', 'qwen2.5'])
+    expect(models[0]).toEqual({
+      name: 'llama3.2',
+      description: "Meta's Llama 3.2 goes small with 1B and 3B models.",
+      parameterSizes: ['1b', '3b'],
+      capabilities: ['tools'],
+      pullCount: '12.1M',
+      tagCount: '63',
+      lastUpdated: '3 months ago',
+    })
+  })
+
+  it('searches by name prefix and capability', () => {
+    const snapshot = buildSnapshot(parseLibraryHtml(libraryHtml))
+
+    expect(names(searchCatalog(snapshot))).toHaveLength(4)
+    expect(names(searchCatalog(snapshot, 'llama'))).toEqual(['llama3.2', 'llama3.2-vision'])
+    expect(names(searchCatalog(snapshot, 'llama vision'))).toEqual(['llama3.2-vision'])
+    expect(names(searchCatalog(snapshot, 'EMBED'))).toEqual(['nomic-embed-text'])
+    expect(names(searchCatalog(snapshot, '', 'tools'))).toEqual(['llama3.2', 'qwen2.5'])
+    expect(names(searchCatalog(snapshot, 'qwen', 'Tools'))).toEqual(['qwen2.5'])
+    expect(searchCatalog(snapshot, 'mistral')).toEqual([])
+  })
+
+  it('keeps the validators of the library response', async () => {
+    mockFetch.mockResolvedValueOnce(htmlResponse(libraryHtml, {
+      'etag': '"v1"',
+      'last-modified': 'Mon, 06 Jan 2025 10:00:00 GMT',
+    }))
+
+    const snapshot = await refreshSnapshot(null, 1000)
+
+    expect(snapshot.etag).toBe('"v1"')
+    expect(snapshot.lastModified).toBe('Mon, 06 Jan 2025 10:00:00 GMT')
+    expect(snapshot.models).toHaveLength(4)
+  })
+
+  it('refreshes conditionally and keeps the models on 304', async () => {
+    const current = buildSnapshot(parseLibraryHtml(libraryHtml), { etag: '"v1"', lastModified: 'yesterday' }, 1000)
+    const text = jest.fn()
+    mockFetch.mockResolvedValueOnce({ ok: false, status: 304, text })
+
+    const snapshot = await refreshSnapshot(current, 5000)
+
+    expect(mockFetch).toHaveBeenCalledWith('https://ollama.com/library', expect.objectContaining({
+      headers: { 'Accept': 'text/html', 'If-None-Match': '"v1"', 'If-Modified-Since': 'yesterday' },
+    }))
+    expect(text).not.toHaveBeenCalled()
+    expect(snapshot.models).toBe(current.models)
+    expect(snapshot.builtAt).toBe(1000)
+    expect(snapshot.checkedAt).toBe(5000)
+  })
+
+  it('serves a stale snapshot while revalidating in the background', async () => {
+    const consoleError = jest.spyOn(console, 'error').mockImplementation(() => undefined)
+    mockFetch.mockResolvedValueOnce(htmlResponse(libraryHtml))
+
+    const cold = await getCatalog()
+    expect(cold.state).toBe('cold')
+    expect((await getCatalog()).state).toBe('fresh')
+    expect(mockFetch).toHaveBeenCalledTimes(1)
+
+    // Offline: the failed refresh must not take the catalog down
+    mockFetch.mockRejectedValueOnce(new Error('getaddrinfo ENOTFOUND ollama.com'))
+    const stale = await getCatalog(0, Date.now() + 1000)
+    expect(stale.state).toBe('stale')
+    expect(stale.snapshot).toBe(cold.snapshot)
+    await waitForRefresh()
+    expect((await getCatalog()).snapshot).toBe(cold.snapshot)
+
+    mockFetch.mockResolvedValueOnce(htmlResponse(libraryHtml.replace(/<li x-test-model>[\s\S]*?<\/li>/, '')))
+    await getCatalog(0, Date.now() + 1000)
+    await waitForRefresh()
+    expect((await getCatalog()).snapshot.models).toHaveLength(3)
+    expect(mockFetch).toHaveBeenCalledTimes(3)
+    consoleError.mockRestore()
+  })
+
+  it('waits before retrying a failed refresh', async () => {
+    const consoleError = jest.spyOn(console, 'error').mockImplementation(() => undefined)
+    const start = Date.now()
+    mockFetch.mockResolvedValueOnce(htmlResponse(libraryHtml))
+    await getCatalog(1000, start)
+
+    mockFetch.mockRejectedValueOnce(new Error('getaddrinfo ENOTFOUND ollama.com'))
+    expect((await getCatalog(1000, start + 2000)).state).toBe('stale')
+    await waitForRefresh()
+    expect(mockFetch).toHaveBeenCalledTimes(2)
+
+    // Still stale, but the last attempt was too recent to try again
+    expect((await getCatalog(1000, start + 2500)).state).toBe('stale')
+    await waitForRefresh()
+    expect(mockFetch).toHaveBeenCalledTimes(2)
+
+    mockFetch.mockResolvedValueOnce(htmlResponse(libraryHtml))
+    await getCatalog(1000, start + 3500)
+    await waitForRefresh()
+    expect(mockFetch).toHaveBeenCalledTimes(3)
+    expect((await getCatalog(1000, start + 3600)).state).toBe('fresh')
+    consoleError.mockRestore()
+  })
+
+  it('round-trips a snapshot through disk', async () => {
+    const file = path.join(fs.mkdtempSync(path.join(os.tmpdir(), 'catalog-')), 'library.json')
+    const snapshot = buildSnapshot(parseLibraryHtml(libraryHtml), { etag: '"v1"' })
+
+    await saveSnapshot(snapshot, file)
+
+    expect(await loadSnapshot(file)).toEqual(snapshot)
+    expect(await loadSnapshot(`${file}.missing`)).toBeNull()
+  })
+})
@@ -2,6 +2,8 @@
 import { NextResponse } from 'next/server';
 
 import { config } from '@/lib/config';
+import { authHeaders } from '@/lib/auth';
+import { ollamaOptions } from '@/lib/options';
 
 interface Message {
   role: "user" | "assistant"
@@ -12,6 +14,7 @@ interface Message {
 interface RequestBody {
   messages: Message[]
   model: string
+  [parameter: string]: unknown
 }
 
 interface ChatResponse {
@@ -64,11 +67,13 @@ export async function POST(request: Request): Promise<NextResponse<ChatResponse
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...authHeaders(request),
       },
       body: JSON.stringify({
         model,
         messages: formattedMessages,
         stream: true,
+        options: ollamaOptions(body),
       }),
     });
 
@@ -1,6 +1,8 @@
 // /ollama-ui/src/app/api/chat/stream/route.ts
 import { NextRequest, NextResponse } from 'next/server';
 import { config } from '@/lib/config';
+import { authHeaders } from '@/lib/auth';
+import { ollamaOptions } from '@/lib/options';
 
 export async function POST(request: NextRequest) {
   console.log('Chat stream route: Received request');
@@ -22,11 +24,13 @@ export async function POST(request: NextRequest) {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...authHeaders(request),
       },
       body: JSON.stringify({
         model,
         messages,
         stream,
+        options: ollamaOptions(body),
       }),
     });
 
@@ -2,6 +2,7 @@
 import { NextResponse } from 'next/server';
 
 import { config } from '@/lib/config';
+import { authHeaders } from '@/lib/auth';
 
 interface EmbeddingsRequest {
   model: string;
@@ -31,6 +32,7 @@ export async function POST(request: Request): Promise<NextResponse<EmbeddingsRes
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
+        ...authHeaders(request),
       },
       body: JSON.stringify({ model, prompt }),
     });
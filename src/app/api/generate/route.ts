@@ -1,10 +1,13 @@
 import { NextResponse } from "next/server"
 import { config } from '@/lib/config';
+import { authHeaders } from '@/lib/auth';
+import { ollamaOptions } from '@/lib/options';
 
 interface GenerateRequest {
   model: string
   prompt: string
   stream?: boolean
+  [parameter: string]: unknown
 }
 
 interface GenerateResponse {
@@ -22,8 +25,9 @@ export async function POST(request: Request): Promise<NextResponse<GenerateRespo
       method: "POST",
       headers: {
         "Content-Type": "application/json",
+        ...authHeaders(request),
       },
-      body: JSON.stringify({ model, prompt, stream }),
+      body: JSON.stringify({ model, prompt, stream, options: ollamaOptions(body) }),
     })
 
     if (!response.ok) {
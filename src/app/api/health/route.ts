@@ -2,10 +2,94 @@
 import { NextResponse } from 'next/server';
 import { config } from '@/lib/config';
 
-export async function GET(): Promise<NextResponse> {
+const PROBE_TIMEOUT_MS = 5000;
+const WARMUP_TIMEOUT_MS = 120000;
+
+interface ModelWarmup {
+  name: string;
+  loadMs: number | null;
+  ttftMs: number | null;
+  error?: string;
+}
+
+interface OllamaHealth {
+  status: 'running' | 'unreachable';
+  version?: string;
+  latencyMs: {
+    version: number | null;
+    ps: number | null;
+  };
+  loadedModels: string[];
+  error?: string;
+}
+
+async function timedFetch(url: string, init: RequestInit, timeoutMs: number): Promise<{ response: Response; ms: number }> {
+  const started = performance.now();
+  const response = await fetch(url, { ...init, signal: AbortSignal.timeout(timeoutMs) });
+  return { response, ms: performance.now() - started };
+}
+
+async function probeOllama(): Promise<OllamaHealth> {
   try {
-    // Basic health check that doesn't depend on Ollama
-    return NextResponse.json({
+    const version = await timedFetch(`${config.OLLAMA_API_HOST}/api/version`, {}, PROBE_TIMEOUT_MS);
+    if (!version.response.ok) {
+      throw new Error(`Ollama returned ${version.response.status}`);
+    }
+    const versionData = await version.response.json();
+
+    const ps = await timedFetch(`${config.OLLAMA_API_HOST}/api/ps`, {}, PROBE_TIMEOUT_MS);
+    const psData = ps.response.ok ? await ps.response.json() : { models: [] };
+
+    return {
+      status: 'running',
+      version: versionData.version,
+      latencyMs: { version: version.ms, ps: ps.ms },
+      loadedModels: (psData.models || []).map((model: { name: string }) => model.name),
+    };
+  } catch (error) {
+    return {
+      status: 'unreachable',
+      latencyMs: { version: null, ps: null },
+      loadedModels: [],
+      error: error instanceof Error ? error.message : 'Unknown error',
+    };
+  }
+}
+
+// A one-token generate loads the model if needed; Ollama reports the load time itself
+async function warmModel(name: string): Promise<ModelWarmup> {
+  try {
+    const { response, ms } = await timedFetch(`${config.OLLAMA_API_HOST}/api/generate`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ model: name, prompt: 'hi', stream: false, options: { num_predict: 1 } }),
+    }, WARMUP_TIMEOUT_MS);
+    if (!response.ok) {
+      const data = await response.json().catch(() => ({}));
+      throw new Error(data.error || `Ollama returned ${response.status}`);
+    }
+    const data = await response.json();
+    return {
+      name,
+      loadMs: typeof data.load_duration === 'number' ? data.load_duration / 1e6 : null,
+      ttftMs: ms,
+    };
+  } catch (error) {
+    return {
+      name,
+      loadMs: null,
+      ttftMs: null,
+      error: error instanceof Error ? error.message : 'Unknown error',
+    };
+  }
+}
+
+export async function GET(request?: Request): Promise<NextResponse> {
+  try {
+    const params = request ? new URL(request.url).searchParams : new URLSearchParams();
+    const deep = params.get('deep') === '1' || params.get('deep') === 'true';
+
+    const body = {
       status: 'healthy',
       environment: {
         nodeEnv: config.NODE_ENV,
@@ -13,7 +97,31 @@ export async function GET(): Promise<NextResponse> {
       },
       timestamp: new Date().toISOString(),
       version: process.env.npm_package_version || '0.1.0'
-    });
+    };
+
+    // Basic health check that doesn't depend on Ollama
+    if (!deep) {
+      return NextResponse.json(body);
+    }
+
+    // Deep health check: time the Ollama round-trip and optionally warm models
+    const ollama = await probeOllama();
+    const modelNames = (params.get('models') || '').split(',').map((name) => name.trim()).filter(Boolean);
+    const models: ModelWarmup[] = [];
+    if (ollama.status === 'running') {
+      // Warm sequentially so each model's load time isn't inflated by the others
+      for (const name of modelNames) {
+        models.push(await warmModel(name));
+      }
+    }
+    const healthy = ollama.status === 'running' && models.every((model) => !model.error);
+
+    return NextResponse.json({
+      ...body,
+      status: healthy ? 'healthy' : 'unhealthy',
+      ollama,
+      models,
+    }, { status: healthy ? 200 : 503 });
   } catch (error) {
     console.error('Error checking health:', error);
     return NextResponse.json({
@@ -22,4 +130,4 @@ export async function GET(): Promise<NextResponse> {
       timestamp: new Date().toISOString()
     }, { status: 503 });
   }
-} 
\ No newline at end of file
+}
@@ -1,67 +1,27 @@
 // /ollama-ui/src/app/api/models/route.ts
 import { NextResponse } from 'next/server';
-import { JSDOM } from 'jsdom';
+import { catalogEtag, getCatalog, searchCatalog } from '@/lib/catalog';
 
-interface LibraryModel {
-  name: string;
-  description: string;
-  parameterSizes: string[];
-  capabilities: string[];
-  pullCount: string;
-  tagCount: string;
-  lastUpdated: string;
-}
-
-export async function GET() {
+// Served from the catalog snapshot; ollama.com/library is only fetched (conditionally) when the snapshot is stale
+export async function GET(request?: Request) {
   try {
-    const response = await fetch('https://ollama.com/library', {
-      method: 'GET',
-      headers: {
-        'Accept': 'text/html',
-      },
-    });
-
-    if (!response.ok) {
-      throw new Error('Failed to fetch models from library');
+    const params = request ? new URL(request.url).searchParams : new URLSearchParams();
+    const { snapshot, state } = await getCatalog(params.has('refresh') ? 0 : undefined);
+    const query = params.get('q') || '';
+    const capability = params.get('capability') || '';
+    const models = query || capability ? searchCatalog(snapshot, query, capability) : snapshot.models;
+
+    const etag = catalogEtag(snapshot);
+    const headers = {
+      'ETag': etag,
+      'X-Catalog-State': state,
+      'Age': String(Math.max(0, Math.floor((Date.now() - snapshot.checkedAt) / 1000))),
+    };
+    if (request?.headers.get('if-none-match') === etag) {
+      return new NextResponse(null, { status: 304, headers });
     }
 
-    const html = await response.text();
-    const dom = new JSDOM(html);
-    const document = dom.window.document;
-
-    const models: LibraryModel[] = [];
-    const modelElements = document.querySelectorAll('li[x-test-model]');
-
-    modelElements.forEach((modelElement) => {
-      const name = modelElement.querySelector('[x-test-model-title]')?.getAttribute('title') || '';
-      const description = modelElement.querySelector('.text-neutral-800')?.textContent?.trim() || '';
-      
-      const parameterSizes: string[] = [];
-      modelElement.querySelectorAll('[x-test-size]').forEach((sizeElement) => {
-        parameterSizes.push(sizeElement.textContent?.trim() || '');
-      });
-
-      const capabilities: string[] = [];
-      modelElement.querySelectorAll('[x-test-capability]').forEach((capElement) => {
-        capabilities.push(capElement.textContent?.trim() || '');
-      });
-
-      const pullCount = modelElement.querySelector('[x-test-pull-count]')?.textContent?.trim() || '0';
-      const tagCount = modelElement.querySelector('[x-test-tag-count]')?.textContent?.trim() || '0';
-      const lastUpdated = modelElement.querySelector('[x-test-updated]')?.textContent?.trim() || '';
-
-      models.push({
-        name,
-        description,
-        parameterSizes,
-        capabilities,
-        pullCount,
-        tagCount,
-        lastUpdated,
-      });
-    });
-
-    return NextResponse.json({ models });
+    return NextResponse.json({ models }, { headers });
   } catch (err) {
     const errorMessage = err instanceof Error ? err.message : 'Unknown error occurred';
     return NextResponse.json(
@@ -69,4 +29,4 @@ export async function GET() {
       { status: 500 }
     );
   }
-} 
\ No newline at end of file
+}
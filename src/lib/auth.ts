@@ -25,3 +25,18 @@ export function generateToken(payload: TokenPayload): string {
   return jwt.sign(payload, JWT_SECRET, { expiresIn: "24h" })
 }
 
+
+// Forward the caller's token so a scheduler in front of Ollama can identify the user
+export function authHeaders(request: Request): Record<string, string> {
+  const authorization = request.headers.get('authorization')
+  if (authorization) {
+    return { Authorization: authorization }
+  }
+  // The UI itself keeps its login JWT in the token cookie (see middleware.ts)
+  const cookie = (request.headers.get('cookie') || '')
+    .split(';')
+    .map((part) => part.trim())
+    .find((part) => part.startsWith('token='))
+  const token = cookie ? decodeURIComponent(cookie.slice('token='.length)) : ''
+  return token ? { Authorization: `Bearer ${token}` } : {}
+}
@@ -0,0 +1,279 @@
+import { promises as fs } from 'fs'
+import path from 'path'
+
+import { JSDOM } from 'jsdom'
+
+export const LIBRARY_URL = 'https://ollama.com/library'
+export const CATALOG_VERSION = 1
+
+export interface LibraryModel {
+  name: string
+  description: string
+  parameterSizes: string[]
+  capabilities: string[]
+  pullCount: string
+  tagCount: string
+  lastUpdated: string
+}
+
+export interface CatalogIndex {
+  /** Lower-cased name tokens (e.g. "llama3", "2", "vision") to model positions */
+  names: Record<string, number[]>
+  /** Lower-cased capabilities (e.g. "tools", "embedding") to model positions */
+  capabilities: Record<string, number[]>
+}
+
+export interface CatalogSnapshot {
+  version: number
+  /** When the catalog content last changed (ms since epoch) */
+  builtAt: number
+  /** When the library was last checked, including 304 responses (ms since epoch) */
+  checkedAt: number
+  etag?: string
+  lastModified?: string
+  models: LibraryModel[]
+  index: CatalogIndex
+}
+
+export type CatalogState = 'fresh' | 'stale' | 'cold'
+
+/**
+ * Parses the ollama.com/library page into LibraryModel records
+ * @param html The library page HTML
+ * @returns The models in page order
+ */
+export function parseLibraryHtml(html: string): LibraryModel[] {
+  const document = new JSDOM(html).window.document
+  const models: LibraryModel[] = []
+
+  document.querySelectorAll('li[x-test-model]').forEach((modelElement) => {
+    const text = (selector: string, fallback = '') =>
+      modelElement.querySelector(selector)?.textContent?.trim() || fallback
+    const texts = (selector: string) =>
+      Array.from(modelElement.querySelectorAll(selector)).map((element) => element.textContent?.trim() || '')
+
+    models.push({
+      name: modelElement.querySelector('[x-test-model-title]')?.getAttribute('title') || '',
+      description: text('.text-neutral-800'),
+      parameterSizes: texts('[x-test-size]'),
+      capabilities: texts('[x-test-capability]'),
+      pullCount: text('[x-test-pull-count]', '0'),
+      tagCount: text('[x-test-tag-count]', '0'),
+      lastUpdated: text('[x-test-updated]'),
+    })
+  })
+
+  return models
+}
+
+function tokenize(value: string): string[] {
+  const lower = value.toLowerCase()
+  return Array.from(new Set([lower, ...lower.split(/[^a-z0-9]+/)])).filter(Boolean)
+}
+
+function addToIndex(index: Record<string, number[]>, key: string, position: number) {
+  const positions = index[key] || (index[key] = [])
+  if (positions[positions.length - 1] !== position) {
+    positions.push(position)
+  }
+}
+
+/**
+ * Builds the name and capability search index for a list of models
+ */
+export function buildIndex(models: LibraryModel[]): CatalogIndex {
+  const index: CatalogIndex = { names: {}, capabilities: {} }
+  models.forEach((model, position) => {
+    tokenize(model.name).forEach((token) => addToIndex(index.names, token, position))
+    model.capabilities.forEach((capability) => addToIndex(index.capabilities, capability.toLowerCase(), position))
+  })
+  return index
+}
+
+export function buildSnapshot(
+  models: LibraryModel[],
+  validators: { etag?: string; lastModified?: string } = {},
+  now = Date.now()
+): CatalogSnapshot {
+  return {
+    version: CATALOG_VERSION,
+    builtAt: now,
+    checkedAt: now,
+    etag: validators.etag,
+    lastModified: validators.lastModified,
+    models,
+    index: buildIndex(models),
+  }
+}
+
+/**
+ * Finds models whose name tokens start with every query token and that have the capability, in catalog order
+ */
+export function searchCatalog(snapshot: CatalogSnapshot, query = '', capability = ''): LibraryModel[] {
+  const filters: Set<number>[] = query.toLowerCase().split(/[^a-z0-9]+/).filter(Boolean).map((token) => {
+    const positions = new Set<number>()
+    for (const [name, found] of Object.entries(snapshot.index.names)) {
+      if (name.startsWith(token)) {
+        found.forEach((position) => positions.add(position))
+      }
+    }
+    return positions
+  })
+  if (capability) {
+    filters.push(new Set(snapshot.index.capabilities[capability.toLowerCase()] || []))
+  }
+
+  if (filters.length === 0) {
+    return snapshot.models
+  }
+  return snapshot.models.filter((_, position) => filters.every((positions) => positions.has(position)))
+}
+
+/**
+ * Fetches the library, sending the snapshot's validators so an unchanged page costs a 304
+ * @returns The refreshed snapshot (the same models with a new checkedAt after a 304)
+ */
+export async function refreshSnapshot(current: CatalogSnapshot | null, now = Date.now()): Promise<CatalogSnapshot> {
+  const headers: Record<string, string> = { 'Accept': 'text/html' }
+  if (current?.etag) {
+    headers['If-None-Match'] = current.etag
+  }
+  if (current?.lastModified) {
+    headers['If-Modified-Since'] = current.lastModified
+  }
+
+  const response = await fetch(LIBRARY_URL, { method: 'GET', headers })
+  if (!response.ok && !(response.status === 304 && current)) {
+    throw new Error('Failed to fetch models from library')
+  }
+  if (response.status === 304 && current) {
+    return { ...current, checkedAt: now }
+  }
+
+  const models = parseLibraryHtml(await response.text())
+  return buildSnapshot(models, {
+    etag: response.headers?.get('etag') || undefined,
+    lastModified: response.headers?.get('last-modified') || undefined,
+  }, now)
+}
+
+/**
+ * Where snapshots are persisted between restarts; unset in tests unless CATALOG_SNAPSHOT_PATH is given
+ */
+export function snapshotPath(): string | null {
+  if (process.env.CATALOG_SNAPSHOT_PATH) {
+    return process.env.CATALOG_SNAPSHOT_PATH
+  }
+  return process.env.NODE_ENV === 'test' ? null : path.join(process.cwd(), '.catalog', 'library.json')
+}
+
+export async function loadSnapshot(file: string | null = snapshotPath()): Promise<CatalogSnapshot | null> {
+  if (!file) {
+    return null
+  }
+  try {
+    const snapshot: CatalogSnapshot = JSON.parse(await fs.readFile(file, 'utf8'))
+    return snapshot.version === CATALOG_VERSION ? snapshot : null
+  } catch {
+    return null
+  }
+}
+
+export async function saveSnapshot(snapshot: CatalogSnapshot, file: string | null = snapshotPath()): Promise<void> {
+  if (!file) {
+    return
+  }
+  try {
+    await fs.mkdir(path.dirname(file), { recursive: true })
+    // Write then rename so a crash never leaves a truncated snapshot
+    await fs.writeFile(`${file}.tmp`, JSON.stringify(snapshot))
+    await fs.rename(`${file}.tmp`, file)
+  } catch (error) {
+    console.error('Error saving catalog snapshot:', error)
+  }
+}
+
+function maxAgeMs(): number {
+  return Number(process.env.CATALOG_MAX_AGE_SECONDS || 3600) * 1000
+}
+
+function retryMs(): number {
+  return Number(process.env.CATALOG_RETRY_SECONDS || 60) * 1000
+}
+
+let memorySnapshot: CatalogSnapshot | null = null
+let loadedFromDisk = false
+let refreshing: Promise<CatalogSnapshot> | null = null
+/** When a refresh was last started, successful or not (ms since epoch) */
+let lastAttemptAt = 0
+
+function startRefresh(now: number): Promise<CatalogSnapshot> {
+  if (!refreshing) {
+    lastAttemptAt = now
+    refreshing = refreshSnapshot(memorySnapshot, now)
+      .then(async (snapshot) => {
+        memorySnapshot = snapshot
+        await saveSnapshot(snapshot)
+        return snapshot
+      })
+      .finally(() => {
+        refreshing = null
+      })
+  }
+  return refreshing
+}
+
+/**
+ * Returns the catalog with stale-while-revalidate semantics
+ *
+ * A fresh snapshot is served as is. A stale one is served immediately while a single
+ * conditional refresh runs in the background; if that refresh fails (e.g. offline),
+ * the stale snapshot keeps being served and the next attempt waits CATALOG_RETRY_SECONDS
+ * (or maxAge, if shorter). Only without any snapshot does the caller wait for the
+ * library, and then fetch errors are thrown.
+ */
+export async function getCatalog(
+  maxAge = maxAgeMs(),
+  now = Date.now()
+): Promise<{ snapshot: CatalogSnapshot; state: CatalogState }> {
+  if (!memorySnapshot && !loadedFromDisk) {
+    loadedFromDisk = true
+    memorySnapshot = await loadSnapshot()
+  }
+  if (!memorySnapshot) {
+    return { snapshot: await startRefresh(now), state: 'cold' }
+  }
+  if (now - memorySnapshot.checkedAt <= maxAge) {
+    return { snapshot: memorySnapshot, state: 'fresh' }
+  }
+  if (now - lastAttemptAt >= Math.min(maxAge, retryMs())) {
+    startRefresh(now).catch((error) => {
+      console.error('Error refreshing model catalog, serving stale snapshot:', error)
+    })
+  }
+  return { snapshot: memorySnapshot, state: 'stale' }
+}
+
+/**
+ * Waits for a background refresh started by getCatalog, if any
+ */
+export async function waitForRefresh(): Promise<void> {
+  await refreshing?.catch(() => undefined)
+}
+
+/**
+ * Forgets the in-memory snapshot so the next request reloads it
+ */
+export function resetCatalog(): void {
+  memorySnapshot = null
+  loadedFromDisk = false
+  refreshing = null
+  lastAttemptAt = 0
+}
+
+/**
+ * A validator for the catalog as served by the UI: changes only when the content does
+ */
+export function catalogEtag(snapshot: CatalogSnapshot): string {
+  return `W/"catalog-${snapshot.builtAt}-${snapshot.models.length}"`
+}
@@ -0,0 +1,27 @@
+// src/lib/options.ts
+
+// Sampling parameters the chat UI sends at the top level of a request (see AdvancedParameters.tsx)
+const OPTION_KEYS = [
+  'num_keep', 'seed', 'num_predict', 'top_k', 'top_p', 'min_p', 'typical_p', 'repeat_last_n', 'temperature',
+  'repeat_penalty', 'presence_penalty', 'frequency_penalty', 'mirostat', 'mirostat_tau', 'mirostat_eta',
+  'penalize_newline', 'stop',
+]
+
+/**
+ * Builds Ollama's `options` for a UI request from its top-level sampling parameters and any `options` object,
+ * which wins on conflicts. Forwarding them makes Ollama honour the user's settings, and lets a response cache
+ * in front of Ollama recognise deterministic requests (temperature 0 or a fixed seed).
+ * @returns The options, or undefined when the request sets none
+ */
+export function ollamaOptions(body: Record<string, unknown>): Record<string, unknown> | undefined {
+  const options: Record<string, unknown> = {}
+  for (const key of OPTION_KEYS) {
+    if (body[key] !== undefined && body[key] !== null) {
+      options[key] = body[key]
+    }
+  }
+  if (body.options && typeof body.options === 'object' && !Array.isArray(body.options)) {
+    Object.assign(options, body.options)
+  }
+  return Object.keys(options).length > 0 ? options : undefined
+}
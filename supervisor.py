@@ -0,0 +1,324 @@
+# /ollama-ui/supervisor.py
+#!/usr/bin/env python3
+"""Multi-worker supervisor for the Next.js standalone server.
+
+Starts N `node .next/standalone/server.js` processes on consecutive ports,
+health-checks each through /api/health, restarts failed workers with
+backoff, performs rolling restarts on SIGHUP and spreads incoming TCP
+connections across healthy workers from a single entry port.
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import aiohttp
+from aiohttp import web
+
+@dataclass
+class Worker:
+    """One supervised server process."""
+    index: int
+    port: int
+    process: Optional[asyncio.subprocess.Process] = None
+    started_at: float = 0.0
+    healthy: bool = False
+    draining: bool = False
+    restarts: int = 0
+    failures: int = 0
+    backoff: float = 1.0
+    active: int = 0
+    connections: int = 0
+    healthy_seconds: float = 0.0
+    last_exit: Optional[int] = None
+    restart_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def available(self) -> bool:
+        return self.healthy and not self.draining and self.process is not None and self.process.returncode is None
+
+class Supervisor:
+    """Run and monitor a pool of standalone server workers behind one port."""
+
+    def __init__(self, workers: int, port: int, base_port: int, server_js: str = ".next/standalone/server.js",
+                 host: str = "0.0.0.0", health_interval: float = 2.0, max_failures: int = 3,
+                 max_backoff: float = 30.0, status_port: Optional[int] = None, startup_timeout: float = 120.0):
+        self.server_js = server_js
+        self.host = host
+        self.port = port
+        self.health_interval = health_interval
+        self.max_failures = max_failures
+        self.max_backoff = max_backoff
+        self.status_port = status_port
+        self.startup_timeout = startup_timeout
+        self.workers = [Worker(index=i, port=base_port + i) for i in range(workers)]
+        self.started = time.monotonic()
+        self.rolling = False
+        self.stopping = asyncio.Event()
+        self.ready = asyncio.Event()
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    # Worker lifecycle
+
+    async def spawn(self, worker: Worker):
+        env = {**os.environ, "PORT": str(worker.port), "HOSTNAME": "127.0.0.1"}
+        worker.process = await asyncio.create_subprocess_exec("node", self.server_js, env=env)
+        worker.started_at = time.monotonic()
+        worker.healthy = False
+        worker.failures = 0
+        print(f"Worker {worker.index} started on port {worker.port} (pid {worker.process.pid})")
+
+    async def terminate(self, worker: Worker, grace: float = 10.0):
+        process = worker.process
+        if process is None or process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=grace)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    async def restart(self, worker: Worker, reason: str):
+        """Restart a failed worker after its current backoff delay."""
+        async with worker.restart_lock:
+            worker.healthy = False
+            worker.last_exit = worker.process.returncode if worker.process else None
+            await self.terminate(worker)
+            print(f"Worker {worker.index} {reason}; restarting in {worker.backoff:.0f}s")
+            await asyncio.sleep(worker.backoff)
+            worker.backoff = min(worker.backoff * 2, self.max_backoff)
+            worker.restarts += 1
+            if not self.stopping.is_set():
+                await self.spawn(worker)
+
+    async def check_health(self, worker: Worker) -> bool:
+        try:
+            async with self.session.get(f"http://127.0.0.1:{worker.port}/api/health") as response:
+                data = await response.json(content_type=None)
+                return response.status == 200 and data.get("status") == "healthy"
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return False
+
+    async def monitor(self, worker: Worker):
+        """Health-check a worker forever, restarting it when it dies or stops responding."""
+        last = time.monotonic()
+        while not self.stopping.is_set():
+            await asyncio.sleep(self.health_interval if worker.healthy else 0.25)
+            now = time.monotonic()
+            if worker.healthy:
+                worker.healthy_seconds += now - last
+            last = now
+            if worker.draining or worker.restart_lock.locked():
+                continue
+            if worker.process is None or worker.process.returncode is not None:
+                code = worker.process.returncode if worker.process else None
+                await self.restart(worker, f"exited with code {code}")
+                continue
+            if await self.check_health(worker):
+                if not worker.healthy:
+                    print(f"Worker {worker.index} healthy after {time.monotonic() - worker.started_at:.2f}s")
+                worker.healthy = True
+                worker.failures = 0
+                # Reset the backoff once a worker has stayed up for a while
+                if time.monotonic() - worker.started_at > 60:
+                    worker.backoff = 1.0
+                if not self.ready.is_set() and all(w.healthy for w in self.workers):
+                    self.ready.set()
+            elif worker.healthy or time.monotonic() - worker.started_at > 60:
+                worker.failures += 1
+                if worker.failures >= self.max_failures:
+                    await self.restart(worker, f"failed {worker.failures} health checks")
+
+    async def rolling_restart(self):
+        """Restart workers one at a time, waiting for each replacement to be healthy."""
+        if self.rolling:
+            return
+        self.rolling = True
+        print("Rolling restart started")
+        try:
+            for worker in self.workers:
+                if self.stopping.is_set():
+                    break
+                async with worker.restart_lock:
+                    worker.draining = True
+                    deadline = time.monotonic() + 30
+                    while worker.active and time.monotonic() < deadline:
+                        await asyncio.sleep(0.1)
+                    await self.terminate(worker)
+                    worker.restarts += 1
+                    await self.spawn(worker)
+                    healthy = await self.check_health(worker)
+                    while not healthy and time.monotonic() - worker.started_at < 120:
+                        await asyncio.sleep(0.25)
+                        healthy = await self.check_health(worker)
+                    worker.healthy = healthy
+                    worker.draining = False
+                if not healthy:
+                    # Leave it to monitor() to crash-restart, and keep the old build on the remaining workers
+                    print(f"Worker {worker.index} not healthy 120s after restart; rolling restart aborted")
+                    return
+                print(f"Worker {worker.index} restarted")
+        finally:
+            self.rolling = False
+        print("Rolling restart finished")
+
+    # Entry point
+
+    def pick_worker(self) -> Optional[Worker]:
+        candidates = [w for w in self.workers if w.available]
+        return min(candidates, key=lambda w: (w.active, w.connections)) if candidates else None
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Forward a client connection to the least busy healthy worker."""
+        worker = self.pick_worker()
+        if worker is None:
+            writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+            writer.close()
+            return
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", worker.port)
+        except OSError:
+            writer.close()
+            return
+        worker.active += 1
+        worker.connections += 1
+        try:
+            await asyncio.gather(pipe(reader, upstream_writer), pipe(upstream_reader, writer))
+        finally:
+            worker.active -= 1
+            upstream_writer.close()
+            writer.close()
+
+    # Metrics
+
+    def status(self) -> dict:
+        now = time.monotonic()
+        elapsed = now - self.started
+        workers = []
+        for w in self.workers:
+            running = w.process is not None and w.process.returncode is None
+            workers.append({
+                "index": w.index,
+                "port": w.port,
+                "pid": w.process.pid if running else None,
+                "healthy": w.healthy,
+                "draining": w.draining,
+                "uptime": now - w.started_at if running else 0.0,
+                "restarts": w.restarts,
+                "last_exit": w.last_exit,
+                "active_connections": w.active,
+                "total_connections": w.connections,
+                "availability": w.healthy_seconds / elapsed if elapsed > 0 else 0.0,
+            })
+        return {
+            "uptime": elapsed,
+            "workers": len(self.workers),
+            "healthy_workers": sum(1 for w in self.workers if w.available),
+            "restarts": sum(w.restarts for w in self.workers),
+            "availability": sum(w["availability"] for w in workers) / len(workers) if workers else 0.0,
+            "rolling_restart": self.rolling,
+            "worker_status": workers,
+        }
+
+    async def start_status_server(self) -> Optional[web.AppRunner]:
+        if not self.status_port:
+            return None
+        app = web.Application()
+        app.router.add_get("/status", lambda request: web.json_response(self.status()))
+        runner = web.AppRunner(app)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", self.status_port).start()
+        print(f"Supervisor status at http://127.0.0.1:{self.status_port}/status")
+        return runner
+
+    async def run(self, on_ready: Optional[Callable[[], bool]] = None) -> int:
+        """Run until SIGINT/SIGTERM. `on_ready` runs in a thread once all workers are healthy.
+
+        Fails with exit code 1 if any worker is still unhealthy `startup_timeout` seconds after start.
+        """
+        loop = asyncio.get_running_loop()
+        loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.ensure_future(self.rolling_restart()))
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stopping.set)
+
+        exit_code = 0
+        self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=5))
+        status_runner = await self.start_status_server()
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        print(f"Supervisor listening on {self.host}:{self.port} with {len(self.workers)} workers")
+        try:
+            await asyncio.gather(*(self.spawn(w) for w in self.workers))
+            monitors = [asyncio.create_task(self.monitor(w)) for w in self.workers]
+            ready = asyncio.create_task(self.ready.wait())
+            stopping = asyncio.create_task(self.stopping.wait())
+            await asyncio.wait({ready, stopping}, timeout=self.startup_timeout, return_when=asyncio.FIRST_COMPLETED)
+            ready.cancel()
+            stopping.cancel()
+            if self.ready.is_set():
+                print(f"All {len(self.workers)} workers healthy after {time.monotonic() - self.started:.2f}s")
+                if on_ready is not None and not await loop.run_in_executor(None, on_ready):
+                    exit_code = 1
+                    self.stopping.set()
+            elif not self.stopping.is_set():
+                unhealthy = ", ".join(f"{w.index} (port {w.port}, {w.restarts} restarts)"
+                                      for w in self.workers if not w.healthy)
+                print(f"Error: workers not healthy {self.startup_timeout:.0f}s after start: {unhealthy}")
+                exit_code = 1
+                self.stopping.set()
+            await self.stopping.wait()
+            for task in monitors:
+                task.cancel()
+        finally:
+            print("Stopping workers...")
+            server.close()
+            await asyncio.gather(*(self.terminate(w) for w in self.workers))
+            await self.session.close()
+            if status_runner:
+                await status_runner.cleanup()
+        return exit_code
+
+async def pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    """Copy bytes from reader to writer, half-closing the writer at EOF."""
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+    except (ConnectionError, RuntimeError):
+        pass
+
+def run_supervisor(workers: int, port: int, base_port: Optional[int] = None, status_port: Optional[int] = None,
+                   server_js: str = ".next/standalone/server.js",
+                   on_ready: Optional[Callable[[], bool]] = None, startup_timeout: float = 120.0) -> int:
+    """Run a supervisor until interrupted and return its exit code."""
+    supervisor = Supervisor(workers, port, base_port or port + 1, server_js=server_js, status_port=status_port,
+                            startup_timeout=startup_timeout)
+    return asyncio.run(supervisor.run(on_ready))
+
+def main():
+    parser = argparse.ArgumentParser(description="Supervise multiple Next.js standalone workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Number of worker processes")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "3000")), help="Entry port")
+    parser.add_argument("--base-port", type=int, help="First worker port (default: port + 1)")
+    parser.add_argument("--status-port", type=int, help="Serve supervisor metrics at /status on this port")
+    parser.add_argument("--server-js", default=".next/standalone/server.js", help="Standalone server entry")
+    parser.add_argument("--startup-timeout", type=float, default=120.0,
+                        help="Seconds for every worker to become healthy before the supervisor gives up")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.server_js):
+        print(f"Error: {args.server_js} not found; run 'npm run build' first")
+        sys.exit(1)
+    sys.exit(run_supervisor(args.workers, args.port, args.base_port, args.status_port, args.server_js,
+                            startup_timeout=args.startup_timeout))
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,60 @@
+import asyncio
 import requests
 import subprocess
 import time
 import sys
 import os
 import socket
-import psutil
-import signal
 import json
 
+from build_cache import ensure_build, print_build_result
+from fault_proxy import start_background
+from import_model import import_models, load_model
+from resource_profiler import ResourceProfiler, print_summary, summarize
+
 # Model configuration
 MODEL_NAME = "llama3.2:1b"  # Use the llama3.2 1b model
 
+# Local GGUF build of the model, imported through the blob API by create_model()
+MODEL_GGUF = os.environ.get("MODEL_GGUF", "models/llama3.2-1b-instruct-q4_k_m.gguf")
+MODELFILE_CONTENT = f"""FROM {os.path.abspath(MODEL_GGUF)}
+PARAMETER temperature 0.7
+PARAMETER top_p 0.1
+PARAMETER top_k 20
+PARAMETER repeat_penalty 1.3
+"""
+
+# Link conditions exercised by the offline test, applied by fault_proxy.py
+# between the UI server and Ollama
+FAULT_PROXY_PORT = 11439
+FAULT_PROXY_URL = f"http://127.0.0.1:{FAULT_PROXY_PORT}"
+UI_URL = "http://localhost:3000"
+FAULT_SCENARIOS = [
+    ("baseline", {}),
+    ("slow link", {"latency": 0.2, "jitter": 0.05, "bandwidth": 32 * 1024}),
+    ("flaky link", {"drop_rate": 0.02}),
+    ("partition", {"partition": True}),
+]
+
+# Resource samples of the UI server and Ollama, see resource_profiler.py
+RESOURCE_PROFILE = "offline-resources.npz"
+RESOURCE_SAMPLE_INTERVAL = 0.5
+
+def build_chat_payload(content="Say hello", model=MODEL_NAME):
+    """Build a chat payload matching the TypeScript implementation's parameters"""
+    return {
+        "model": model,
+        "messages": [{"role": "user", "content": content}],
+        "format": None,  # No format specified in TypeScript
+        "tools": [],    # Empty tools array in TypeScript
+        "temperature": 0.7,
+        "top_p": 0.1,
+        "num_predict": 1024,
+        "top_k": 20,
+        "repeat_penalty": 1.3,
+        "presence_penalty": 0.2
+    }
+
 def is_port_in_use(port):
     """Check if a port is in use"""
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -46,8 +90,8 @@ def cleanup_existing_processes():
     else:
         run_command("pkill -f 'google-chrome.*remote-debugging-port=9222'", check=False)
 
-def start_services():
-    """Start the application and Ollama server"""
+def start_services(ollama_host="http://localhost:11434"):
+    """Start the application, talking to Ollama at ollama_host"""
     print("Starting services...")
     
     # Clean up existing processes first
@@ -55,19 +99,14 @@ def start_services():
     
     # Set environment variables for testing
     os.environ["NODE_ENV"] = "test"
-    os.environ["OLLAMA_API_HOST"] = "http://localhost:11434"
+    os.environ["OLLAMA_API_HOST"] = ollama_host
     
-    # Start Next.js app
+    # Start Next.js app, reusing a cached build when the sources are unchanged
     print("Building Next.js app...")
-    # First, try to fix TypeScript errors
-    print("Fixing TypeScript errors...")
-    run_command("npm run lint -- --fix", check=False)
-    
-    # Now try to build
-    build_process = subprocess.Popen(["npm", "run", "build"])
-    build_process.wait()
+    build = ensure_build(lint=True)
+    print_build_result(build)
     
-    if build_process.returncode != 0:
+    if not build.ok:
         print("Build failed, but continuing with test...")
         # Don't return False, just continue
     
@@ -122,22 +161,24 @@ def create_modelfile():
         return False
 
 def create_model():
-    """Create the model using the Modelfile"""
+    """Create the model from the Modelfile, uploading only blobs Ollama does not have yet"""
     print("Creating model from Modelfile...")
     try:
-        result = subprocess.run(
-            ['ollama', 'create', MODEL_NAME, '-f', 'Modelfile'],
-            capture_output=True,
-            text=True
-        )
-        if result.returncode == 0:
+        model = load_model(MODEL_NAME, 'Modelfile')
+        if not model.blobs:
+            print(f"GGUF file not found: {MODEL_GGUF}")
+            return False
+        hashing, uploading = asyncio.run(import_models([model], ["http://localhost:11434"]))
+        print(f"Hashed {hashing.bytes} bytes in {hashing.seconds:.2f}s, "
+              f"uploaded {uploading.bytes} bytes in {uploading.seconds:.2f}s")
+        result = model.results.get("http://localhost:11434")
+        if result == "success":
             print("Model created successfully")
             return True
-        else:
-            print(f"Error creating model: {result.stderr}")
-            return False
+        print(f"Error creating model: {result}")
+        return False
     except Exception as e:
-        print(f"Error running ollama create: {e}")
+        print(f"Error importing model: {e}")
         return False
 
 def pull_model():
@@ -252,8 +293,42 @@ def delete_model():
         print("Could not connect to Ollama server")
         return False
 
-def test_offline():
-    """Test offline functionality"""
+def measure_stream(url, payload, timeout=120):
+    """Stream an NDJSON response and time the first line and the whole stream"""
+    started = time.time()
+    result = {"ok": False, "lines": 0, "first": None, "total": None, "error": None}
+    try:
+        with requests.post(url, json=payload, stream=True, timeout=timeout) as response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                if result["first"] is None:
+                    result["first"] = time.time() - started
+                result["lines"] += 1
+                data = json.loads(line)
+                if data.get("error"):
+                    result["error"] = data["error"]
+            result["ok"] = response.status_code == 200 and result["error"] is None
+    except (requests.exceptions.RequestException, ValueError) as e:
+        result["error"] = type(e).__name__
+    result["total"] = time.time() - started
+    return result
+
+def print_stream_results(results):
+    """Print chat and pull stream timings for each fault scenario"""
+    def cell(result):
+        if result is None:
+            return f"{'-':>28}"
+        if not result["ok"]:
+            return f"{'failed: ' + str(result['error'])[:18]:>28}"
+        return f"{result['first']:>8.2f}s {result['total']:>8.2f}s {result['lines']:>6} lines"
+
+    print(f"\n{'scenario':<14}{'chat first / total':>28}{'pull first / total':>28}")
+    for name, chat, pull in results:
+        print(f"{name:<14}{cell(chat)}{cell(pull)}")
+
+def test_offline(proxy):
+    """Test offline functionality, degrading the UI's link to Ollama through proxy"""
     print("Testing offline functionality...")
     
     # First delete the model to ensure a clean state
@@ -284,51 +359,28 @@ def test_offline():
     except Exception as e:
         print(f"Error in pre-offline test: {e}")
     
-    # Disable network
-    if sys.platform == "darwin":  # macOS
-        run_command("sudo ifconfig en0 down")
-    else:  # Linux
-        run_command("sudo ifconfig eth0 down")
-    
-    time.sleep(2)  # Wait for network to be disabled
-    
-    # Try to use the model
-    try:
-        print(f"Sending chat request to {MODEL_NAME}...")
-        
-        # Match the TypeScript implementation's parameters
-        payload = {
-            "model": MODEL_NAME,
-            "messages": [{"role": "user", "content": "Say hello"}],
-            "format": None,  # No format specified in TypeScript
-            "tools": [],    # Empty tools array in TypeScript
-            "temperature": 0.7,
-            "top_p": 0.1,
-            "num_predict": 1024,
-            "top_k": 20,
-            "repeat_penalty": 1.3,
-            "presence_penalty": 0.2
-        }
-        
-        print("Request payload:", json.dumps(payload, indent=2))
-        
-        response = requests.post(
-            "http://localhost:11434/api/chat",
-            json=payload
-        )
-        print(f"Response status code: {response.status_code}")
-        print(f"Response headers: {response.headers}")
-        print(f"Response body: {response.text}")
-    except requests.exceptions.ConnectionError:
-        print("Connection error - offline mode working as expected")
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-    
-    # Re-enable network
-    if sys.platform == "darwin":  # macOS
-        run_command("sudo ifconfig en0 up")
-    else:  # Linux
-        run_command("sudo ifconfig eth0 up")
+    if not wait_for_service(3000):
+        print("UI server not ready. Exiting...")
+        return
+
+    # Degrade the link between the UI and Ollama, measuring through the UI's own routes.
+    # The model is installed, so models/pull answers after checking /api/tags through the proxy.
+    results = []
+    for name, faults in FAULT_SCENARIOS:
+        proxy.configure(**faults)
+        chat = measure_stream(f"{UI_URL}/api/chat/stream", build_chat_payload())
+        pull = measure_stream(f"{UI_URL}/api/models/pull", {"name": MODEL_NAME})
+        results.append((name, chat, pull))
+        if faults.get("partition") and chat["error"]:
+            print("Connection error - offline mode working as expected")
+
+    # The link is healthy again: the UI must answer without a restart
+    proxy.configure()
+    recovery = measure_stream(f"{UI_URL}/api/chat/stream", build_chat_payload())
+    results.append(("recovered", recovery, None))
+    print(f"Fault proxy stats: {proxy.stats()}")
+
+    print_stream_results(results)
 
 def cleanup():
     """Clean up processes"""
@@ -336,16 +388,26 @@ def cleanup():
     cleanup_existing_processes()
 
 def main():
+    profiler = None
+    # The proxy must be up before the UI is built and started against it
+    proxy = start_background(FAULT_PROXY_PORT, 11434)
     try:
-        if not start_services():
+        if not start_services(FAULT_PROXY_URL):
             print("Failed to start services. Exiting...")
             return
         
-        test_offline()  # Now includes pull and verify
+        # Sample the UI server and Ollama for memory growth while the test runs
+        profiler = ResourceProfiler(RESOURCE_SAMPLE_INTERVAL).start()
+        test_offline(proxy)  # Now includes pull and verify
         
     except KeyboardInterrupt:
         print("\nTest interrupted by user")
     finally:
+        if profiler:
+            profiler.stop()
+            profiler.save(RESOURCE_PROFILE)
+            print_summary(summarize(profiler.arrays()))
+        proxy.stop()
         cleanup()
 
 if __name__ == "__main__":
@@ -0,0 +1,173 @@
+# /ollama-ui/traffic_capture.py
+#!/usr/bin/env python3
+"""Recording proxy for the UI's /api/* routes.
+
+Run it in front of the Next.js server and send traffic through it. Every
+/api/* request is forwarded unchanged and appended to a JSONL capture as one
+compact record: arrival time, method, route, payload, status, time to first
+byte, duration and response size. The capture rotates by size like a log
+file. Non-API requests (pages, assets) are proxied but not recorded.
+Credentials are never written. Play captures back with traffic_replay.py.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import time
+from typing import Optional
+
+import aiohttp
+from aiohttp import web
+
+from ollama_proxy import UpstreamProxy, client_session, relay, upstream_unavailable
+
+# Request headers kept in the capture; credentials and cookies are left out
+RECORDED_HEADERS = ("content-type", "accept", "x-priority")
+# Headers not forwarded hop by hop
+HOP_HEADERS = ("host", "content-length", "transfer-encoding", "connection", "keep-alive")
+
+class RotatingWriter:
+    """Append lines to a file, rotating it to .1, .2, ... once it exceeds max_bytes."""
+
+    def __init__(self, path: str, max_bytes: int, backups: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.file = open(path, "a", encoding="utf-8")
+        self.rotations = 0
+
+    def write(self, line: str):
+        self.file.write(line + "\n")
+        self.file.flush()
+        if self.max_bytes and self.file.tell() >= self.max_bytes:
+            self.rotate()
+
+    def rotate(self):
+        self.file.close()
+        for index in range(self.backups - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.file = open(self.path, "a", encoding="utf-8")
+        self.rotations += 1
+
+    def close(self):
+        self.file.close()
+
+def encode_body(body: bytes, content_type: str):
+    """Store JSON payloads as JSON, other text as a string and binary data as base64."""
+    if not body:
+        return None
+    if "json" in content_type:
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    try:
+        return body.decode()
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(body).decode()}
+
+class TrafficRecorder(UpstreamProxy):
+    """aiohttp proxy that streams requests to the UI and records /api/* calls."""
+
+    def __init__(self, upstream: str, writer: RotatingWriter, prefix: str = "/api/"):
+        super().__init__(upstream)
+        self.writer = writer
+        self.prefix = prefix
+        self.recorded = 0
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        arrived = time.time()
+        started = time.monotonic()
+        body = await request.read()
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in HOP_HEADERS}
+        record = request.path.startswith(self.prefix)
+        status, ttfb, size, error = 502, None, 0, None
+
+        def measure(chunk: bytes):
+            nonlocal ttfb, size
+            if ttfb is None:
+                ttfb = time.monotonic() - started
+            size += len(chunk)
+
+        try:
+            async with self.session.request(request.method, f"{self.upstream}{request.path_qs}",
+                                            data=body or None, headers=headers, allow_redirects=False) as upstream:
+                status = upstream.status
+                response, failure = await relay(request, upstream, {
+                    k: v for k, v in upstream.headers.items() if k.lower() not in HOP_HEADERS}, measure)
+                if failure is not None:
+                    error = str(failure) or type(failure).__name__
+                return response
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = str(e) or type(e).__name__
+            return upstream_unavailable(e)
+        except (ConnectionResetError, asyncio.CancelledError):
+            error = "client disconnected"
+            raise
+        finally:
+            if record:
+                self.write_record(request, body, arrived, status, ttfb, time.monotonic() - started, size, error)
+
+    def write_record(self, request: web.Request, body: bytes, arrived: float, status: int, ttfb: Optional[float],
+                     duration: float, size: int, error: Optional[str]):
+        entry = {
+            "ts": round(arrived, 6),
+            "method": request.method,
+            "path": request.path_qs,
+            "headers": {k.lower(): v for k, v in request.headers.items() if k.lower() in RECORDED_HEADERS},
+            "body": encode_body(body, request.content_type),
+            "status": status,
+            "ttfb_ms": None if ttfb is None else round(ttfb * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+            "bytes": size,
+        }
+        if error:
+            entry["error"] = error
+        self.writer.write(json.dumps(entry, separators=(",", ":")))
+        self.recorded += 1
+
+    async def on_startup(self, app: web.Application):
+        # Pass compressed bodies through as they are, with their Content-Encoding
+        self.session = client_session(auto_decompress=False)
+
+    async def on_cleanup(self, app: web.Application):
+        await super().on_cleanup(app)
+        self.writer.close()
+        print(f"Recorded {self.recorded} requests ({self.writer.rotations} rotations)")
+
+def create_app(recorder: TrafficRecorder) -> web.Application:
+    app = web.Application(client_max_size=1024 ** 3)
+    app.on_startup.append(recorder.on_startup)
+    app.on_cleanup.append(recorder.on_cleanup)
+    app.router.add_route("*", "/{path:.*}", recorder.handle)
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Proxy the UI and record its /api/* traffic as JSONL")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=3001, help="Port to listen on")
+    parser.add_argument("--upstream", default="http://localhost:3000", help="UI to forward to")
+    parser.add_argument("--output", default=os.path.join("captures", "traffic.jsonl"), help="Capture file")
+    parser.add_argument("--max-mb", type=float, default=100.0, help="Rotate the capture after this many MB")
+    parser.add_argument("--backups", type=int, default=5, help="Rotated captures to keep")
+    parser.add_argument("--prefix", default="/api/", help="Only record paths starting with this")
+    args = parser.parse_args()
+
+    writer = RotatingWriter(args.output, int(args.max_mb * 1024 * 1024), args.backups)
+    recorder = TrafficRecorder(args.upstream, writer, args.prefix)
+    print(f"Recording {args.prefix}* traffic for {args.upstream} on http://{args.host}:{args.port} to {args.output}")
+    web.run_app(create_app(recorder), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
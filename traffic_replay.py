@@ -0,0 +1,239 @@
+# /ollama-ui/traffic_replay.py
+#!/usr/bin/env python3
+"""Replay a traffic capture against any deployment and compare latencies.
+
+Reads JSONL captures written by traffic_capture.py, including rotated
+files, and sends every request again in arrival order. At `--speed 1`
+requests start at their original offsets, so inter-arrival gaps and the
+concurrency they produce are kept. `--speed N` compresses the gaps N times,
+and `--speed max` sends them back to back at the capture's peak concurrency.
+Time to first byte and duration distributions are compared per route
+against the capture or against an earlier replay report.
+"""
+
+import argparse
+import asyncio
+import base64
+import glob
+import json
+import sys
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import aiohttp
+import numpy as np
+
+from load_test import summarize
+
+@dataclass
+class ReplayResult:
+    """Timings of one replayed request."""
+    route: str
+    ok: bool
+    status: int = 0
+    error: Optional[str] = None
+    lag: float = 0.0
+    ttfb: Optional[float] = None
+    duration: float = 0.0
+    bytes: int = 0
+
+def capture_files(path: str) -> list[str]:
+    """Return a capture and its rotated files, oldest first."""
+    rotated = sorted(glob.glob(f"{glob.escape(path)}.[0-9]*"), key=lambda p: int(p.rsplit(".", 1)[1]), reverse=True)
+    return rotated + [path]
+
+def load_capture(paths: list[str], prefix: str = "") -> list[dict]:
+    records = []
+    for path in paths:
+        for name in capture_files(path):
+            with open(name, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        if record["path"].startswith(prefix):
+                            records.append(record)
+    return sorted(records, key=lambda r: r["ts"])
+
+def route_of(record: dict) -> str:
+    return f"{record['method']} {record['path'].split('?', 1)[0]}"
+
+def decode_body(body) -> Optional[bytes]:
+    if body is None:
+        return None
+    if isinstance(body, str):
+        return body.encode()
+    if isinstance(body, dict) and set(body) == {"base64"}:
+        return base64.b64decode(body["base64"])
+    return json.dumps(body).encode()
+
+def peak_concurrency(records: list[dict]) -> int:
+    """Most requests that were in flight at once while the capture was recorded."""
+    events = []
+    for r in records:
+        events.append((r["ts"], 1))
+        events.append((r["ts"] + r["duration_ms"] / 1000, -1))
+    peak = current = 0
+    for _, change in sorted(events):
+        current += change
+        peak = max(peak, current)
+    return max(peak, 1)
+
+async def send(session: aiohttp.ClientSession, target: str, record: dict, headers: dict,
+               scheduled: float, started_at: float) -> ReplayResult:
+    result = ReplayResult(route_of(record), ok=False)
+    started = time.monotonic()
+    result.lag = started - started_at - scheduled
+    try:
+        async with session.request(record["method"], f"{target}{record['path']}", data=decode_body(record.get("body")),
+                                   headers={**record.get("headers", {}), **headers}) as response:
+            result.status = response.status
+            async for chunk in response.content.iter_any():
+                if result.ttfb is None:
+                    result.ttfb = time.monotonic() - started
+                result.bytes += len(chunk)
+            result.ok = response.status < 500
+            if not result.ok:
+                result.error = f"HTTP {response.status}"
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        result.error = str(e) or type(e).__name__
+    result.duration = time.monotonic() - started
+    return result
+
+async def replay(records: list[dict], target: str, speed: Optional[float], concurrency: int,
+                 headers: dict, timeout: float) -> tuple[list[ReplayResult], float]:
+    """Replay records on their (scaled) schedule, or back to back when speed is None."""
+    first = records[0]["ts"]
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        started_at = time.monotonic()
+        if speed is None:
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(record: dict) -> ReplayResult:
+                async with semaphore:
+                    return await send(session, target, record, headers, time.monotonic() - started_at, started_at)
+
+            results = await asyncio.gather(*(bounded(r) for r in records))
+        else:
+            tasks = []
+            for record in records:
+                scheduled = (record["ts"] - first) / speed
+                delay = started_at + scheduled - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(send(session, target, record, headers, scheduled, started_at)))
+            results = await asyncio.gather(*tasks)
+        wall = time.monotonic() - started_at
+    return list(results), wall
+
+def distributions(samples: list[tuple[str, bool, Optional[float], float]]) -> dict:
+    """Group (route, ok, ttfb seconds, duration seconds) samples into per-route millisecond lists."""
+    routes: dict[str, dict] = {}
+    for route, ok, ttfb, duration in samples:
+        for key in (route, "all"):
+            entry = routes.setdefault(key, {"requests": 0, "errors": 0, "ttfb_ms": [], "duration_ms": []})
+            entry["requests"] += 1
+            if not ok:
+                entry["errors"] += 1
+                continue
+            if ttfb is not None:
+                entry["ttfb_ms"].append(ttfb * 1000)
+            entry["duration_ms"].append(duration * 1000)
+    return routes
+
+def capture_distributions(records: list[dict]) -> dict:
+    return distributions([(route_of(r), r["status"] < 500 and "error" not in r,
+                           None if r["ttfb_ms"] is None else r["ttfb_ms"] / 1000, r["duration_ms"] / 1000)
+                          for r in records])
+
+def ks_statistic(a: list[float], b: list[float]) -> Optional[float]:
+    """Two-sample Kolmogorov-Smirnov distance: 0 for identical distributions, 1 for disjoint ones."""
+    if not a or not b:
+        return None
+    a_sorted, b_sorted = np.sort(a), np.sort(b)
+    points = np.concatenate([a_sorted, b_sorted])
+    cdf_a = np.searchsorted(a_sorted, points, side="right") / len(a_sorted)
+    cdf_b = np.searchsorted(b_sorted, points, side="right") / len(b_sorted)
+    return float(np.max(np.abs(cdf_a - cdf_b)))
+
+def format_ms(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+def print_comparison(before: dict, after: dict, before_label: str, metric: str):
+    """Print p50/p95/p99 of one metric per route for both runs, with the KS distance between them."""
+    print(f"\n{metric.replace('_ms', '')} (ms): {before_label} -> replay")
+    print(f"{'route':<34}{'n':>6}{'p50':>18}{'p95':>18}{'p99':>18}{'KS':>7}{'errors':>10}")
+    print("-" * 111)
+    for route in sorted(after, key=lambda r: (r == "all", r)):
+        old, new = before.get(route, {}), after[route]
+        old_stats, new_stats = summarize(old.get(metric, [])), summarize(new[metric])
+        cells = "".join(f"{format_ms(old_stats[p]) + ' -> ' + format_ms(new_stats[p]):>18}" for p in ("p50", "p95", "p99"))
+        ks = ks_statistic(old.get(metric, []), new[metric])
+        print(f"{route[:33]:<34}{new['requests']:>6}{cells}{'-' if ks is None else f'{ks:.2f}':>7}"
+              f"{str(old.get('errors', '-')) + ' -> ' + str(new['errors']):>10}")
+
+def parse_headers(values: list[str]) -> dict:
+    headers = {}
+    for value in values:
+        name, _, content = value.partition(":")
+        headers[name.strip()] = content.strip()
+    return headers
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured UI traffic and compare latency distributions")
+    parser.add_argument("captures", nargs="+", help="Capture files from traffic_capture.py (rotated files are included)")
+    parser.add_argument("--target", default="http://localhost:3000", help="Deployment to replay against")
+    parser.add_argument("--speed", default="1", help="Time scale: 1 for real time, N for N times faster, or 'max'")
+    parser.add_argument("--concurrency", type=int, help="In-flight requests at --speed max (default: capture's peak)")
+    parser.add_argument("--prefix", default="", help="Only replay paths starting with this, e.g. /api/chat")
+    parser.add_argument("--limit", type=int, help="Replay only the first N requests")
+    parser.add_argument("--header", action="append", default=[], help="Extra 'Name: value' header, e.g. Authorization")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-request timeout in seconds")
+    parser.add_argument("--compare", metavar="REPORT", help="Compare against an earlier --json report instead of the capture")
+    parser.add_argument("--json", dest="json_path", help="Write the replay's distributions to this file")
+    args = parser.parse_args()
+
+    records = load_capture(args.captures, args.prefix)[:args.limit]
+    if not records:
+        print("No requests found in the capture")
+        sys.exit(1)
+    speed = None if args.speed == "max" else float(args.speed)
+    if speed is not None and speed <= 0:
+        parser.error("--speed must be positive or 'max'")
+    concurrency = args.concurrency or peak_concurrency(records)
+    span = records[-1]["ts"] - records[0]["ts"]
+    mode = f"at {concurrency} concurrent" if speed is None else f"at {speed:g}x ({span / speed:.1f}s schedule)"
+    print(f"Replaying {len(records)} requests spanning {span:.1f}s against {args.target} {mode}")
+
+    results, wall = asyncio.run(replay(records, args.target.rstrip("/"), speed, concurrency,
+                                       parse_headers(args.header), args.timeout))
+    after = distributions([(r.route, r.ok, r.ttfb, r.duration) for r in results])
+    if args.compare:
+        with open(args.compare) as f:
+            before, before_label = json.load(f)["routes"], args.compare
+    else:
+        before, before_label = capture_distributions(records), "capture"
+
+    print(f"Finished in {wall:.1f}s")
+    if speed is not None:
+        # How late requests started against their schedule; large values mean the replayer could not keep up
+        lags = summarize([r.lag * 1000 for r in results])
+        print(f"Start lag: p50 {format_ms(lags['p50'])} ms, p99 {format_ms(lags['p99'])} ms")
+    for metric in ("ttfb_ms", "duration_ms"):
+        print_comparison(before, after, before_label, metric)
+    errors: dict[str, int] = {}
+    for r in results:
+        if not r.ok:
+            errors[r.error or "unknown"] = errors.get(r.error or "unknown", 0) + 1
+    for error, count in errors.items():
+        print(f"Error: {error} x{count}")
+
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump({"target": args.target, "speed": args.speed, "concurrency": concurrency, "wall_time": wall,
+                       "routes": after}, f)
+        print(f"Report written to {args.json_path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# /ollama-ui/vector_search.py
+#!/usr/bin/env python3
+"""Top-k cosine similarity search over embeddings produced by embed_corpus.py.
+
+The corpus is loaded into one contiguous float32 array with L2-normalised
+rows, so cosine similarity is a matrix multiply. Exact search scores query
+batches block by block and selects with argpartition; the optional IVF index
+clusters rows with spherical k-means and only scans the `nprobe` closest
+clusters per query.
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Optional
+
+import numpy as np
+import requests
+
+from embed_corpus import load_vectors
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    """Return a contiguous float32 copy of vectors with unit-length rows."""
+    vectors = np.array(vectors, dtype=np.float32, order="C", copy=True, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
+
+def top_k(scores: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the k best (scores, column indices) per row, best first."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(scores.dtype), empty.astype(np.int64)
+    idx = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    best = np.take_along_axis(scores, idx, axis=1)
+    order = np.argsort(-best, axis=1, kind="stable")
+    return np.take_along_axis(best, order, axis=1), np.take_along_axis(idx, order, axis=1)
+
+class ExactIndex:
+    """Brute-force cosine search over normalised rows."""
+
+    def __init__(self, vectors: np.ndarray, block_rows: int = 65536):
+        self.vectors = normalize(vectors)
+        self.block_rows = block_rows
+
+    def search(self, queries: np.ndarray, k: int = 10) -> tuple[np.ndarray, np.ndarray]:
+        """Return (scores, row indices) of shape (len(queries), k)."""
+        queries = normalize(queries)
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        # Score the corpus in blocks so the score matrix stays bounded
+        for start in range(0, len(self.vectors), self.block_rows):
+            block = self.vectors[start:start + self.block_rows]
+            scores, rows = top_k(queries @ block.T, k)
+            best_scores, picks = top_k(np.hstack([best_scores, scores]), k)
+            best_rows = np.take_along_axis(np.hstack([best_rows, rows + start]), picks, axis=1)
+        return best_scores, best_rows
+
+class IVFIndex:
+    """Inverted-file index: a spherical k-means coarse quantiser over normalised rows.
+
+    Rows are stored grouped by cluster so each probed list is a contiguous slice.
+    """
+
+    def __init__(self, vectors: np.ndarray, nlist: Optional[int] = None, nprobe: int = 8,
+                 iterations: int = 10, sample_per_list: int = 64, seed: int = 0):
+        vectors = normalize(vectors)
+        n = len(vectors)
+        self.nlist = max(1, min(nlist or int(4 * np.sqrt(n)), n))
+        self.nprobe = nprobe
+        rng = np.random.default_rng(seed)
+
+        sample_size = min(n, self.nlist * sample_per_list)
+        sample = vectors[rng.choice(n, sample_size, replace=False)]
+        self.centroids = self._train(sample, iterations, rng)
+
+        assignments = self._assign(vectors)
+        order = np.argsort(assignments, kind="stable")
+        self.rows = order
+        self.vectors = np.ascontiguousarray(vectors[order])
+        counts = np.bincount(assignments, minlength=self.nlist)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    def _train(self, sample: np.ndarray, iterations: int, rng: np.random.Generator) -> np.ndarray:
+        centroids = sample[rng.choice(len(sample), self.nlist, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            counts = np.bincount(assignments, minlength=self.nlist)
+            empty = counts == 0
+            # Re-seed empty clusters from random sample rows
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = normalize(sums)
+        return centroids
+
+    def _assign(self, vectors: np.ndarray, block_rows: int = 65536) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), block_rows):
+            block = vectors[start:start + block_rows]
+            assignments[start:start + block_rows] = np.argmax(block @ self.centroids.T, axis=1)
+        return assignments
+
+    def search(self, queries: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> tuple[np.ndarray, np.ndarray]:
+        """Return approximate (scores, row indices), padding with -inf/-1 when fewer than k rows are probed."""
+        queries = normalize(queries)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        _, lists = top_k(queries @ self.centroids.T, nprobe)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        rows = np.full((len(queries), k), -1, dtype=np.int64)
+        for q, probe in enumerate(lists):
+            candidates = np.concatenate([np.arange(self.offsets[c], self.offsets[c + 1]) for c in probe])
+            if not len(candidates):
+                continue
+            best, picks = top_k((self.vectors[candidates] @ queries[q])[None, :], k)
+            scores[q, :best.shape[1]] = best[0]
+            rows[q, :best.shape[1]] = self.rows[candidates[picks[0]]]
+        return scores, rows
+
+def recall_at_k(exact_rows: np.ndarray, approx_rows: np.ndarray) -> float:
+    """Fraction of exact top-k rows that the approximate search also returned."""
+    hits = sum(len(np.intersect1d(e, a)) for e, a in zip(exact_rows, approx_rows))
+    return hits / exact_rows.size if exact_rows.size else 1.0
+
+def time_queries(search, queries: np.ndarray, batch: int) -> np.ndarray:
+    """Return per-query latency in seconds, running queries in batches."""
+    latencies = []
+    for start in range(0, len(queries), batch):
+        chunk = queries[start:start + batch]
+        started = time.perf_counter()
+        search(chunk)
+        latencies.extend([(time.perf_counter() - started) / len(chunk)] * len(chunk))
+    return np.array(latencies)
+
+def benchmark(vectors: np.ndarray, queries: int, k: int, batch: int, nlist: Optional[int],
+              nprobes: list[int], seed: int = 0) -> list[dict]:
+    """Measure exact and IVF query latency and IVF recall@k against exact search."""
+    rng = np.random.default_rng(seed)
+    picks = rng.choice(len(vectors), min(queries, len(vectors)), replace=False)
+    # Perturb corpus rows so queries look like new text close to existing chunks
+    sample = normalize(vectors[picks])
+    sample += rng.normal(0, 0.05, sample.shape).astype(np.float32)
+
+    results = []
+    exact = ExactIndex(vectors)
+    _, truth = exact.search(sample, k)
+    for size in sorted({1, batch}):
+        latencies = time_queries(lambda q: exact.search(q, k), sample, size)
+        results.append({"index": "exact", "batch": size, "nprobe": None, "recall": 1.0,
+                        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+                        "p99_ms": float(np.percentile(latencies, 99) * 1000)})
+
+    started = time.perf_counter()
+    ivf = IVFIndex(vectors, nlist=nlist, seed=seed)
+    build_seconds = time.perf_counter() - started
+    for nprobe in nprobes:
+        _, approx = ivf.search(sample, k, nprobe)
+        latencies = time_queries(lambda q: ivf.search(q, k, nprobe), sample, 1)
+        results.append({"index": f"ivf{ivf.nlist}", "batch": 1, "nprobe": nprobe,
+                        "recall": recall_at_k(truth, approx),
+                        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+                        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+                        "build_seconds": build_seconds})
+    return results
+
+def embed_query(text: str, model: str, url: str) -> np.ndarray:
+    """Embed query text with the same model the store was built with."""
+    response = requests.post(url, json={"model": model, "prompt": text}, timeout=60)
+    response.raise_for_status()
+    return np.array(response.json()["embedding"], dtype=np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-k cosine search over an embeddings store")
+    parser.add_argument("store", nargs="?", help="Directory written by embed_corpus.py")
+    parser.add_argument("--query", action="append", default=[], help="Text to search for (repeatable)")
+    parser.add_argument("--url", default="http://localhost:11434/api/embeddings",
+                        help="Embeddings endpoint used to embed --query text")
+    parser.add_argument("-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--ivf", action="store_true", help="Search with the IVF index instead of exactly")
+    parser.add_argument("--nlist", type=int, help="IVF clusters (default: 4 * sqrt(rows))")
+    parser.add_argument("--nprobe", type=int, default=8, help="IVF clusters scanned per query")
+    parser.add_argument("--benchmark", action="store_true", help="Benchmark latency and recall@k")
+    parser.add_argument("--queries", type=int, default=200, help="Queries used by --benchmark")
+    parser.add_argument("--batch", type=int, default=32, help="Batch size for batched exact queries")
+    parser.add_argument("--synthetic", type=int, help="Benchmark a random corpus with this many rows")
+    parser.add_argument("--dim", type=int, default=768, help="Dimension of the --synthetic corpus")
+    parser.add_argument("--json", dest="json_path", help="Write benchmark results to this file")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        # Clustered random data behaves more like real embeddings than uniform noise
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(max(args.synthetic // 1000, 8), args.dim)).astype(np.float32)
+        vectors = centers[rng.integers(len(centers), size=args.synthetic)]
+        vectors += rng.normal(0, 0.5, vectors.shape).astype(np.float32)
+        ids, meta = [str(i) for i in range(args.synthetic)], {"model": None}
+    elif args.store:
+        vectors, ids, meta = load_vectors(args.store)
+    else:
+        parser.error("a store directory or --synthetic is required")
+
+    started = time.perf_counter()
+    print(f"Loaded {len(vectors)} x {vectors.shape[1]} vectors")
+
+    if args.benchmark:
+        nprobes = sorted({1, 4, args.nprobe, 16, 32})
+        results = benchmark(vectors, args.queries, args.k, args.batch, args.nlist, nprobes)
+        print(f"\n{'index':<12}{'batch':>6}{'nprobe':>8}{f'recall@{args.k}':>12}{'p50 ms':>10}{'p99 ms':>10}")
+        for r in results:
+            nprobe = "-" if r["nprobe"] is None else str(r["nprobe"])
+            print(f"{r['index']:<12}{r['batch']:>6}{nprobe:>8}{r['recall']:>12.3f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+        if args.json_path:
+            with open(args.json_path, "w") as f:
+                json.dump(results, f, indent=2)
+        return
+
+    if not args.query:
+        parser.error("pass --query text or --benchmark")
+    if not meta.get("model"):
+        parser.error("the store has no model recorded; cannot embed queries")
+    index = IVFIndex(vectors, nlist=args.nlist, nprobe=args.nprobe) if args.ivf else ExactIndex(vectors)
+    print(f"Index ready in {time.perf_counter() - started:.2f}s")
+    queries = np.stack([embed_query(text, meta["model"], args.url) for text in args.query])
+    started = time.perf_counter()
+    scores, rows = index.search(queries, args.k)
+    elapsed = time.perf_counter() - started
+    for text, row_scores, row_ids in zip(args.query, scores, rows):
+        print(f"\n{text}")
+        for score, row in zip(row_scores, row_ids):
+            if row >= 0:
+                print(f"  {score:.4f}  {ids[row]}")
+    print(f"\nSearched {len(queries)} queries in {elapsed * 1000:.2f} ms", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()